@@ -0,0 +1,35 @@
+import os
+import json
+
+
+def write_report(path, report):
+    if os.path.dirname(path) != '':
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, 'w') as file:
+        json.dump(report, file, indent=2, sort_keys=True)
+
+
+def read_report(path):
+    with open(path, 'r') as file:
+        return json.load(file)
+
+
+def format_duration(seconds):
+    if seconds >= 1:
+        return '{0:.3f} s'.format(seconds)
+
+    if seconds >= 1e-3:
+        return '{0:.3f} ms'.format(seconds * 1e3)
+
+    return '{0:.3f} us'.format(seconds * 1e6)
+
+
+def format_size(size):
+    for unit in ['B', 'KB', 'MB']:
+        if size < 1024:
+            return '{0:.1f} {1}'.format(size, unit)
+
+        size /= 1024
+
+    return '{0:.1f} GB'.format(size)
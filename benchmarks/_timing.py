@@ -0,0 +1,63 @@
+import time
+import statistics
+
+MAX_REPEAT = 1 << 20
+
+
+# Best of several rounds, the minimum is the least disturbed by whatever else the machine is doing
+def time_per_call(function, repeat, rounds=5):
+    return min(_time_rounds(function, repeat, rounds))
+
+
+# Calibrates the number of calls so that every round lasts at least min_time, whatever the operation costs
+def measure(function, min_time=0.2, rounds=5):
+    repeat = _calibrate_repeat(function, min_time)
+    timings = _time_rounds(function, repeat, rounds)
+
+    return {
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'repeat': repeat,
+        'rounds': rounds
+    }
+
+
+def _calibrate_repeat(function, min_time):
+    repeat = 1
+
+    while repeat < MAX_REPEAT:
+        elapsed = _time_rounds(function, repeat, 1)[0] * repeat
+
+        if elapsed >= min_time:
+            break
+
+        if elapsed == 0:
+            repeat *= 10
+        else:
+            repeat = max(repeat * 2, int(repeat * min_time / elapsed) + 1)
+
+    return min(repeat, MAX_REPEAT)
+
+
+def _time_rounds(function, repeat, rounds):
+    timings = []
+
+    for _ in range(rounds):
+        start = time.perf_counter()
+
+        for _ in range(repeat):
+            function()
+
+        timings.append((time.perf_counter() - start) / repeat)
+
+    return timings
+
+
+def percentiles(samples, points=(50, 90, 99)):
+    ordered = sorted(samples)
+    result = {'p{0}'.format(point): ordered[min(len(ordered) - 1, int(len(ordered) * point / 100))]
+              for point in points}
+    result['max'] = ordered[-1]
+    result['mean'] = statistics.mean(ordered)
+
+    return result
@@ -0,0 +1,150 @@
+import os
+import sys
+import time
+import argparse
+import platform
+
+from blimey.agile_keychain import _crypto as crypto
+from blimey.agile_keychain import _crypto_backend as crypto_backend
+from blimey.agile_keychain.agile_keychain_item import AgileKeychainItem
+from benchmarks._timing import measure
+from benchmarks._report import write_report, read_report, format_duration
+
+# Microbenchmarks for the AgileKeychain crypto primitives, written as JSON so runs can be compared.
+#
+#   python -m benchmarks.crypto run --backend pycrypto --output pycrypto.json
+#   python -m benchmarks.crypto run --output current.json
+#   python -m benchmarks.crypto compare pycrypto.json current.json --threshold 0.1
+#
+# compare exits with status 1 when any benchmark got slower than the threshold allows.
+
+RESULTS_FOLDER = os.path.join(os.path.dirname(__file__), 'results')
+ITERATION_COUNTS = [1000, 10000, 25000]
+KEY_ITERATIONS = 25000
+PAYLOAD_SIZES = [100, 1000, 10000, 100000, 1000000]
+PADDING_SIZES = [100, 10000, 1000000]
+PASSWORD = 'masterpassword123'
+
+
+def collect_benchmarks(quick=False):
+    iteration_counts = ITERATION_COUNTS[:1] if quick else ITERATION_COUNTS
+    key_iterations = 1000 if quick else KEY_ITERATIONS
+    payload_sizes = PAYLOAD_SIZES[:3] if quick else PAYLOAD_SIZES
+
+    encrypted_key = crypto.create_key(PASSWORD, 'SL5', key_iterations)
+    decrypted_key = crypto.decrypt_key(encrypted_key, PASSWORD)
+
+    benchmarks = {}
+
+    for iterations in iteration_counts:
+        key = crypto.create_key(PASSWORD, 'SL5', iterations)
+        benchmarks['derive_key_from_password[{0}]'.format(iterations)] = \
+            _bind(crypto._derive_key_from_password, key, PASSWORD)
+
+    benchmarks['decrypt_key[{0}]'.format(key_iterations)] = _bind(crypto.decrypt_key, encrypted_key, PASSWORD)
+    benchmarks['encrypt_key[{0}]'.format(key_iterations)] = _bind(crypto.encrypt_key, decrypted_key, PASSWORD)
+    benchmarks['create_key[{0}]'.format(key_iterations)] = _bind(crypto.create_key, PASSWORD, 'SL5', key_iterations)
+
+    for size in payload_sizes:
+        item = AgileKeychainItem({'uuid': 'ABC', 'encrypted': {'notesPlain': 'x' * size}})
+        encrypted_item = crypto.encrypt_item(item, decrypted_key)
+
+        benchmarks['encrypt_item[{0}B]'.format(size)] = _bind(crypto.encrypt_item, item, decrypted_key)
+        benchmarks['decrypt_item[{0}B]'.format(size)] = _bind(crypto.decrypt_item, encrypted_item, decrypted_key)
+
+    for size in PADDING_SIZES:
+        # One byte short of a block boundary, so there always is padding to add and strip
+        data = os.urandom(size - size % 16 + 15)
+        padded_data = crypto.byte_pad(data, 16)
+
+        benchmarks['byte_pad[{0}B]'.format(size)] = _bind(crypto.byte_pad, data, 16)
+        benchmarks['strip_byte_padding[{0}B]'.format(size)] = _bind(crypto.strip_byte_padding, padded_data, 16)
+
+    return benchmarks
+
+
+def run(backend_name=None, quick=False, min_time=0.2, only=None):
+    backend = crypto_backend.set_backend(backend_name)
+    results = {}
+
+    for name, function in collect_benchmarks(quick).items():
+        if only is not None and only not in name:
+            continue
+
+        results[name] = measure(function, min_time)
+        print('{0:<36} {1}'.format(name, format_duration(results[name]['min'])), file=sys.stderr)
+
+    return {
+        'backend': backend.name,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'created': int(time.time()),
+        'results': results
+    }
+
+
+def compare(baseline, current, threshold):
+    regressions = []
+
+    print('{0:<36} {1:>12} {2:>12} {3:>8}'.format('benchmark', baseline['backend'], current['backend'], 'ratio'))
+
+    for name in sorted(set(baseline['results']) & set(current['results'])):
+        baseline_time = baseline['results'][name]['min']
+        current_time = current['results'][name]['min']
+        ratio = current_time / baseline_time
+        is_regression = ratio > 1 + threshold
+
+        if is_regression:
+            regressions.append(name)
+
+        print('{0:<36} {1:>12} {2:>12} {3:>7.2f}x{4}'.format(
+            name, format_duration(baseline_time), format_duration(current_time), ratio,
+            '  REGRESSION' if is_regression else ''))
+
+    return regressions
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description='AgileKeychain crypto microbenchmarks')
+    commands = parser.add_subparsers(dest='command')
+
+    run_parser = commands.add_parser('run', help='run the benchmarks and store the results as JSON')
+    run_parser.add_argument('--backend', choices=crypto_backend.get_available_backend_names())
+    run_parser.add_argument('--output', help='defaults to benchmarks/results/crypto-<backend>-<time>.json')
+    run_parser.add_argument('--min-time', type=float, default=0.2, help='minimum seconds per measurement round')
+    run_parser.add_argument('--only', help='only run benchmarks whose name contains this text')
+    run_parser.add_argument('--quick', action='store_true', help='fewer iteration counts and payload sizes')
+
+    compare_parser = commands.add_parser('compare', help='compare two result files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.1,
+                                help='allowed slowdown before failing, 0.1 means 10%%')
+
+    arguments = parser.parse_args(arguments)
+
+    if arguments.command == 'run':
+        report = run(arguments.backend, arguments.quick, arguments.min_time, arguments.only)
+        output = arguments.output or _default_output_path(report)
+        write_report(output, report)
+        print(output)
+        return 0
+
+    if arguments.command == 'compare':
+        regressions = compare(read_report(arguments.baseline), read_report(arguments.current), arguments.threshold)
+        return 1 if len(regressions) > 0 else 0
+
+    parser.print_help()
+    return 2
+
+
+def _bind(function, *arguments):
+    return lambda: function(*arguments)
+
+
+def _default_output_path(report):
+    return os.path.join(RESULTS_FOLDER, 'crypto-{0}-{1}.json'.format(report['backend'], report['created']))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+from blimey.agile_keychain import _crypto as crypto
+from blimey.agile_keychain._manager import FileSystemManager, KeyManager
+from blimey.agile_keychain.agile_keychain_item import AgileKeychainItem
+
+# Builds a real AgileKeychain with any number of synthetic items, unlockable with the given password.
+# Items are encrypted and written directly and contents.js is written once, so large vaults build quickly.
+#
+#   python -m benchmarks.generate_keychain path/to/new.agilekeychain --items 10000
+
+DEFAULT_PASSWORD = 'benchmarkpassword'
+DEFAULT_ITERATIONS = 1000
+TYPE_NAMES = ['webforms.WebForm', 'passwords.Password', 'securenotes.SecureNote', 'wallet.financial.CreditCard']
+FOLDER_COUNT = 20
+
+
+def generate_keychain(path, item_count, password=DEFAULT_PASSWORD, iterations=DEFAULT_ITERATIONS, seed=0):
+    FileSystemManager(path).initialise()
+    key_manager = KeyManager(path)
+    keys = {}
+
+    for level in ['SL3', 'SL5']:
+        encrypted_key = crypto.create_key(password, level, iterations)
+        key_manager.save_key(encrypted_key)
+        keys[level] = crypto.decrypt_key(encrypted_key, password)
+
+    randomiser = random.Random(seed)
+    folders = ['{0:032X}'.format(randomiser.getrandbits(128)) for _ in range(FOLDER_COUNT)]
+    contents = []
+
+    for index in range(item_count):
+        item = create_item(index, randomiser, folders, keys)
+        save_item_file(path, item)
+        contents.append([item['uuid'], item['typeName'], item['title'], item['locationKey'], item['folderUuid'],
+                         0, 'N'])
+
+    with open(os.path.join(path, 'data', 'default', 'contents.js'), 'w') as file:
+        json.dump(contents, file)
+
+    return [row[0] for row in contents]
+
+
+def create_item(index, randomiser, folders, keys):
+    now = int(time.time())
+    domain = 'site{0}.example.com'.format(index)
+    level = 'SL3' if index % 10 == 0 else 'SL5'
+    created_at = now - randomiser.randint(0, 5 * 365 * 24 * 3600)
+
+    item = AgileKeychainItem({
+        'uuid': '{0:032X}'.format(randomiser.getrandbits(128)),
+        'typeName': randomiser.choice(TYPE_NAMES),
+        'title': 'Item {0} {1}'.format(index, domain),
+        'location': 'https://{0}/login'.format(domain),
+        'locationKey': domain,
+        'folderUuid': randomiser.choice(folders),
+        'createdAt': created_at,
+        'updatedAt': randomiser.randint(created_at, now),
+        'keyID': keys[level].identifier,
+        'openContents': {'securityLevel': level, 'tags': ['generated']},
+        'encrypted': {
+            'fields': [
+                {'name': 'username', 'designation': 'username', 'type': 'T', 'value': 'user{0}'.format(index)},
+                {'name': 'password', 'designation': 'password', 'type': 'P',
+                 'value': '{0:x}'.format(randomiser.getrandbits(96))}
+            ],
+            'notesPlain': 'note ' * randomiser.randint(0, 40)
+        }
+    })
+
+    return crypto.encrypt_item(item, keys[level])
+
+
+def save_item_file(path, item):
+    with open(os.path.join(path, 'data', 'default', '{0}.1password'.format(item['uuid'])), 'w') as file:
+        json.dump(item, file)
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description='Generate a synthetic AgileKeychain')
+    parser.add_argument('path')
+    parser.add_argument('--items', type=int, default=1000)
+    parser.add_argument('--password', default=DEFAULT_PASSWORD)
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument('--seed', type=int, default=0)
+    arguments = parser.parse_args(arguments)
+
+    start = time.perf_counter()
+    generate_keychain(arguments.path, arguments.items, arguments.password, arguments.iterations, arguments.seed)
+    print('{0} items generated in {1:.1f} s'.format(arguments.items, time.perf_counter() - start))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,45 @@
+import os
+import argparse
+
+from blimey.agile_keychain import _crypto as crypto
+from blimey.agile_keychain._key import DecryptedKey
+from blimey.agile_keychain.agile_keychain_item import AgileKeychainItem
+from benchmarks._timing import time_per_call
+
+# Measures the per-item cost of decrypt_item and encrypt_item with the active crypto backend.
+#
+#   python -m benchmarks.item_crypto --sizes 100 1000 10000 --repeat 2000
+
+
+def create_item(payload_size):
+    return AgileKeychainItem({
+        'uuid': '9E7673CCBB5B4AC9A7A8838835CB7E83',
+        'title': 'Some Website',
+        'typeName': 'webforms.WebForm',
+        'encrypted': {'notesPlain': 'x' * payload_size}
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-item encryption and decryption')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=2000)
+    arguments = parser.parse_args()
+
+    key = DecryptedKey({'identifier': 'ABC', 'level': 'SL5', 'iterations': 1000, 'key': os.urandom(1024)})
+
+    print('backend: {0}'.format(crypto.get_backend().name))
+
+    for size in arguments.sizes:
+        item = create_item(size)
+        encrypted_item = crypto.encrypt_item(item, key)
+
+        encrypt_time = time_per_call(lambda: crypto.encrypt_item(item, key), arguments.repeat)
+        decrypt_time = time_per_call(lambda: crypto.decrypt_item(encrypted_item, key), arguments.repeat)
+
+        print('{0:>8d} B  encrypt {1:8.2f} us/item  decrypt {2:8.2f} us/item'.format(
+            size, encrypt_time * 1e6, decrypt_time * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+import os
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from unittest.mock import patch
+
+from blimey.agile_keychain._manager._item_manager import ItemManager
+
+# Measures ItemManager.get_all_items with and without read-ahead, on a file system where every open
+# takes a fixed amount of extra time, like the network mounts and sync folders vaults often live on.
+#
+#   python -m benchmarks.item_read_ahead --items 500 --latency 0.005 --workers 4 16
+
+
+def create_item_files(path, count):
+    data_path = os.path.join(path, 'data', 'default')
+    os.makedirs(data_path)
+
+    for index in range(count):
+        item_id = '{0:032X}'.format(index)
+
+        with open(os.path.join(data_path, item_id + '.1password'), 'w') as file:
+            json.dump({'uuid': item_id, 'typeName': 'passwords.Password', 'title': 'Item {0}'.format(index),
+                       'encrypted': 'U2FsdGVkX1' + 'A' * 200}, file)
+
+
+def open_with_latency(latency):
+    def slow_open(*args, **kwargs):
+        time.sleep(latency)
+        return open(*args, **kwargs)
+
+    return slow_open
+
+
+def time_get_all_items(path, latency, workers=None):
+    config = None if workers is None else {'read_ahead_workers': workers}
+    item_manager = ItemManager(path, config)
+
+    with patch('blimey.agile_keychain._manager._item_manager.open', open_with_latency(latency), create=True):
+        start = time.perf_counter()
+        items = item_manager.get_all_items()
+        elapsed = time.perf_counter() - start
+
+    return elapsed, len(items)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark item read-ahead under simulated per-open latency')
+    parser.add_argument('--items', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.005, help='seconds added to every open')
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4, 8, 16])
+    arguments = parser.parse_args()
+
+    path = tempfile.mkdtemp(suffix='.agilekeychain')
+
+    try:
+        create_item_files(path, arguments.items)
+        serial_time, count = time_get_all_items(path, arguments.latency)
+        print('{0} items, {1:.1f} ms per open'.format(count, arguments.latency * 1000))
+        print('serial:                {0:8.3f} s'.format(serial_time))
+
+        for workers in arguments.workers:
+            elapsed, _ = time_get_all_items(path, arguments.latency, workers)
+            print('read-ahead {0:3d} workers: {1:8.3f} s  ({2:.1f}x)'.format(workers, elapsed, serial_time / elapsed))
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+import sys
+import random
+import argparse
+from itertools import cycle
+
+from blimey.agile_keychain import _crypto as crypto
+from blimey.agile_keychain import _json_codec as json_codec
+from benchmarks._timing import measure
+from benchmarks._report import write_report, format_duration
+from benchmarks.generate_keychain import create_item, FOLDER_COUNT
+
+# Compares the JSON codecs on item files, decrypted payloads and contents.js shaped like the generated keychains.
+#
+#   python -m benchmarks.json_codec --rows 1000 10000 --output json_codec.json
+#
+# Each codec encodes and decodes the same documents, decrypt_item and encrypt_item are timed end to end.
+
+DEFAULT_ROWS = [1000, 10000]
+ITEM_SAMPLES = 100
+PASSWORD = 'benchmarkpassword'
+
+
+def create_documents(row_counts, seed=0):
+    randomiser = random.Random(seed)
+    key = crypto.decrypt_key(crypto.create_key(PASSWORD, 'SL5', 1000), PASSWORD)
+    keys = {'SL3': key, 'SL5': key}
+    folders = ['{0:032X}'.format(randomiser.getrandbits(128)) for _ in range(FOLDER_COUNT)]
+    items = [create_item(index, randomiser, folders, keys) for index in range(max(row_counts + [ITEM_SAMPLES]))]
+
+    documents = {
+        'item_file': [dict(item) for item in items[:ITEM_SAMPLES]],
+        'payload': [crypto.decrypt_item(item, key)['encrypted'] for item in items[:ITEM_SAMPLES]]
+    }
+
+    for row_count in row_counts:
+        documents['contents[{0}]'.format(row_count)] = [[
+            item['uuid'], item['typeName'], item['title'], item['locationKey'], item['folderUuid'], 0, 'N'
+        ] for item in items[:row_count]]
+
+    return documents, items[:ITEM_SAMPLES], key
+
+
+def collect_benchmarks(codec, documents, items, key):
+    benchmarks = {}
+
+    for name, values in documents.items():
+        # Item files and payloads are many small documents, contents.js one large one
+        values = values if name in ['item_file', 'payload'] else [values]
+        encoded_values = [codec.dumps(value) for value in values]
+
+        benchmarks['dumps[{0}]'.format(name)] = _bind_each(codec.dumps, values)
+        benchmarks['loads[{0}]'.format(name)] = _bind_each(codec.loads, encoded_values)
+
+    decrypted_items = [crypto.decrypt_item(item, key) for item in items]
+
+    benchmarks['decrypt_item'] = _bind_each(lambda item: crypto.decrypt_item(item, key), items)
+    benchmarks['encrypt_item'] = _bind_each(lambda item: crypto.encrypt_item(item, key), decrypted_items)
+
+    return benchmarks
+
+
+def run(row_counts, codec_names, min_time=0.2):
+    documents, items, key = create_documents(row_counts)
+    results = {}
+
+    for codec_name in codec_names:
+        codec = json_codec.set_codec(codec_name)
+        results[codec_name] = {}
+
+        for name, function in collect_benchmarks(codec, documents, items, key).items():
+            results[codec_name][name] = measure(function, min_time)
+
+    json_codec.set_codec()
+
+    return results
+
+
+def print_results(results):
+    codec_names = list(results)
+    names = list(results[codec_names[0]])
+
+    print('{0:<24}'.format('benchmark') + ''.join('{0:>14}'.format(name) for name in codec_names) +
+          ('{0:>10}'.format('speedup') if len(codec_names) > 1 else ''))
+
+    for name in names:
+        timings = [results[codec_name][name]['min'] for codec_name in codec_names]
+        line = '{0:<24}'.format(name) + ''.join('{0:>14}'.format(format_duration(timing)) for timing in timings)
+
+        if len(codec_names) > 1:
+            line += '{0:>9.2f}x'.format(timings[-1] / timings[0])
+
+        print(line)
+
+
+def main(arguments=None):
+    available_codec_names = json_codec.get_available_codec_names()
+
+    parser = argparse.ArgumentParser(description='Compare the JSON codecs on keychain shaped documents')
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS, help='contents.js sizes to time')
+    parser.add_argument('--codecs', nargs='+', choices=available_codec_names, default=available_codec_names)
+    parser.add_argument('--min-time', type=float, default=0.2, help='minimum seconds per measurement round')
+    parser.add_argument('--output', help='also store the results as JSON')
+    arguments = parser.parse_args(arguments)
+
+    results = run(arguments.rows, arguments.codecs, arguments.min_time)
+    print_results(results)
+
+    if arguments.output is not None:
+        write_report(arguments.output, results)
+
+    return 0
+
+
+# Timed per document, so item files and payloads read as the cost of one item
+def _bind_each(function, values):
+    iterator = cycle(values)
+    return lambda: function(next(iterator))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
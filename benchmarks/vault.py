@@ -0,0 +1,155 @@
+import os
+import sys
+import time
+import shutil
+import random
+import json
+import argparse
+import platform
+import resource
+import tempfile
+import tracemalloc
+
+from blimey import AgileKeychain
+from benchmarks.generate_keychain import generate_keychain, DEFAULT_PASSWORD
+from benchmarks._timing import percentiles
+from benchmarks._report import write_report, format_duration, format_size
+
+# Times and memory-profiles keychain operations on synthetic vaults of increasing size.
+#
+#   python -m benchmarks.vault --sizes 1000 10000 100000 --output vault.json
+#
+# Latencies are reported as percentiles over the samples of every operation, peak memory as the tracemalloc
+# peak of one extra traced run of the operation, and peak RSS as the process high-water mark after it.
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_SAMPLES = {
+    'unlock': 5,
+    'get_item_by_id': 200,
+    'iterate': 1,
+    'save_item': 20,
+    'create_item': 50
+}
+
+
+class VaultBenchmark:
+    def __init__(self, path, item_ids, config=None, seed=0):
+        self._keychain = AgileKeychain(path, config)
+        self._item_ids = item_ids
+        self._randomiser = random.Random(seed)
+
+    def unlock(self):
+        self._keychain.lock()
+        self._keychain.unlock(DEFAULT_PASSWORD)
+
+    def get_item_by_id(self):
+        return self._keychain[self._randomiser.choice(self._item_ids)]
+
+    def iterate(self):
+        for _ in self._keychain:
+            pass
+
+    def save_item(self):
+        item = self.get_item_by_id()
+        item['title'] = 'Saved {0}'.format(self._randomiser.getrandbits(32))
+
+        # Fetching the item is not part of the measurement
+        start = time.perf_counter()
+        self._keychain.save_item(item)
+        return time.perf_counter() - start
+
+    def create_item(self):
+        return self._keychain.create_item({'title': 'Created'})
+
+    def measure(self, operation, samples):
+        function = getattr(self, operation)
+        latencies = [self._time(function) for _ in range(samples)]
+
+        tracemalloc.start()
+        function()
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        result = percentiles(latencies)
+        result['samples'] = samples
+        result['peak_memory'] = peak_memory
+        result['peak_rss'] = _get_peak_rss()
+
+        return result
+
+    # Operations with setup that should not be measured time themselves and return the elapsed time
+    def _time(self, function):
+        start = time.perf_counter()
+        elapsed = function()
+
+        if isinstance(elapsed, float):
+            return elapsed
+
+        return time.perf_counter() - start
+
+
+def run(sizes, operations, samples, config=None):
+    results = {}
+
+    for size in sizes:
+        path = os.path.join(tempfile.mkdtemp(), 'vault.agilekeychain')
+
+        try:
+            start = time.perf_counter()
+            item_ids = generate_keychain(path, size)
+            print('{0} items generated in {1:.1f} s'.format(size, time.perf_counter() - start), file=sys.stderr)
+
+            benchmark = VaultBenchmark(path, item_ids, config)
+            benchmark.unlock()
+            results[str(size)] = {}
+
+            for operation in operations:
+                result = benchmark.measure(operation, samples[operation])
+                results[str(size)][operation] = result
+                _print_result(size, operation, result)
+        finally:
+            shutil.rmtree(os.path.dirname(path))
+
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'created': int(time.time()),
+        'config': config,
+        'results': results
+    }
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description='Benchmark keychain operations at vault scale')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--operations', nargs='+', choices=list(DEFAULT_SAMPLES), default=list(DEFAULT_SAMPLES))
+    parser.add_argument('--samples', type=int, help='samples per operation, overrides the per-operation defaults')
+    parser.add_argument('--config', type=json.loads, help='keychain configuration as a JSON object')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    arguments = parser.parse_args(arguments)
+
+    samples = {operation: arguments.samples or default for operation, default in DEFAULT_SAMPLES.items()}
+    report = run(arguments.sizes, arguments.operations, samples, arguments.config)
+
+    if arguments.output is not None:
+        write_report(arguments.output, report)
+
+    return 0
+
+
+def _print_result(size, operation, result):
+    print('{0:>7d} items  {1:<15} p50 {2:>11}  p90 {3:>11}  p99 {4:>11}  max {5:>11}  peak {6:>9}  rss {7:>9}'.format(
+        size, operation, format_duration(result['p50']), format_duration(result['p90']),
+        format_duration(result['p99']), format_duration(result['max']), format_size(result['peak_memory']),
+        format_size(result['peak_rss'])))
+
+
+def _get_peak_rss():
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports kilobytes, macOS bytes
+    return peak_rss if sys.platform == 'darwin' else peak_rss * 1024
+
+
+if __name__ == '__main__':
+    sys.exit(main())
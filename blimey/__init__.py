@@ -1 +1,2 @@
 from blimey.agile_keychain.agile_keychain import AgileKeychain
+from blimey._async_keychain import AsyncKeychain
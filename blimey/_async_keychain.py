@@ -0,0 +1,169 @@
+import asyncio
+from contextlib import asynccontextmanager
+from functools import partial
+from itertools import islice
+
+from blimey.exceptions import KeychainLockedException
+
+# Items decrypted per trip to the executor while iterating
+ITERATION_CHUNK_SIZE = 64
+
+
+# Runs a keychain's blocking work off the event loop. Key derivation, encryption and decryption go to the given
+# executor, calls that only touch the file system go to the loop's default one. Process pools can not be used,
+# the keys only live in this process, set the decryption_workers option to decrypt in other processes instead.
+class AsyncKeychain:
+    def __init__(self, keychain, executor=None):
+        self._keychain = keychain
+        self._executor = executor
+        self._lock = _ReadWriteLock()
+
+    async def unlock(self, password):
+        async with self._lock.writing():
+            await self._run_cpu_bound(self._keychain.unlock, password)
+
+    async def lock(self):
+        async with self._lock.writing():
+            await self._run_io_bound(self._keychain.lock)
+
+    def is_locked(self):
+        return self._keychain.is_locked()
+
+    async def initialise(self, password, config=None):
+        async with self._lock.writing():
+            await self._run_cpu_bound(self._keychain.initialise, password, config)
+
+    async def is_initialised(self):
+        return await self._run_io_bound(self._keychain.is_initialised)
+
+    async def set_password(self, password, config=None):
+        async with self._lock.writing():
+            await self._run_cpu_bound(self._keychain.set_password, password, config)
+
+    async def create_item(self, data=None):
+        async with self._lock.reading():
+            return await self._run_io_bound(self._keychain.create_item, data)
+
+    async def get(self, item_id):
+        async with self._lock.reading():
+            return await self._run_cpu_bound(self._keychain.__getitem__, item_id)
+
+    async def save_item(self, item):
+        async with self._lock.writing():
+            await self._run_cpu_bound(self._keychain.save_item, item)
+
+    async def save_items(self, items):
+        async with self._lock.writing():
+            await self._run_cpu_bound(self._keychain.save_items, items)
+
+    async def delete_items(self, item_ids):
+        async with self._lock.writing():
+            # Every deleted item is replaced by an encrypted tombstone
+            await self._run_cpu_bound(self._keychain.delete_items, item_ids)
+
+    async def list(self, order_by='updatedAt', offset=0, limit=None, folder=None, type=None, reverse=False):
+        async with self._lock.reading():
+            return await self._run_cpu_bound(self._keychain.list, order_by, offset, limit, folder, type, reverse)
+
+    async def list_summaries(self):
+        async with self._lock.reading():
+            return await self._run_io_bound(self._keychain.list_summaries)
+
+    async def search(self, query, fields=None, folder=None):
+        async with self._lock.reading():
+            return await self._run_io_bound(self._keychain.search, query, fields, folder)
+
+    async def search_contents(self, query, folder=None):
+        async with self._lock.reading():
+            return await self._run_cpu_bound(self._keychain.search_contents, query, folder)
+
+    # Items are fetched a chunk at a time. The keychain may be locked between chunks, iterating on after that
+    # throws like any other call made while locked.
+    async def __aiter__(self):
+        async with self._lock.reading():
+            items = await self._run_io_bound(iter, self._keychain)
+
+        while True:
+            async with self._lock.reading():
+                if self._keychain.is_locked():
+                    raise KeychainLockedException
+
+                chunk = await self._run_cpu_bound(_take, items, ITERATION_CHUNK_SIZE)
+
+            if len(chunk) == 0:
+                return
+
+            for item in chunk:
+                yield item
+
+    def _run_cpu_bound(self, function, *args):
+        return self._run(self._executor, function, *args)
+
+    def _run_io_bound(self, function, *args):
+        return self._run(None, function, *args)
+
+    async def _run(self, executor, function, *args):
+        future = asyncio.get_running_loop().run_in_executor(executor, partial(function, *args))
+
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # A running call can not be stopped, the caller's lock is only released once it is done
+            await asyncio.wait([future])
+            raise
+
+
+# Reads run concurrently, writes on their own. Waiting writers go first, so a lock is not held up by a stream
+# of reads.
+class _ReadWriteLock:
+    def __init__(self):
+        self._created_condition = None
+        self._readers = 0
+        self._waiting_writers = 0
+        self._is_writing = False
+
+    # Created on first use, before Python 3.10 it is bound to the event loop current at creation
+    @property
+    def _condition(self):
+        if self._created_condition is None:
+            self._created_condition = asyncio.Condition()
+
+        return self._created_condition
+
+    @asynccontextmanager
+    async def reading(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self._is_writing and self._waiting_writers == 0)
+            self._readers += 1
+
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._readers -= 1
+                self._condition.notify_all()
+
+    @asynccontextmanager
+    async def writing(self):
+        async with self._condition:
+            self._waiting_writers += 1
+
+            try:
+                await self._condition.wait_for(lambda: not self._is_writing and self._readers == 0)
+            finally:
+                # Reads held up by a writer that gave up waiting can go ahead
+                self._waiting_writers -= 1
+                self._condition.notify_all()
+
+            self._is_writing = True
+
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._is_writing = False
+                self._condition.notify_all()
+
+
+def _take(items, count):
+    return list(islice(items, count))
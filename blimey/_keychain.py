@@ -23,9 +23,9 @@ class Keychain(object):
     def is_initialised(self):
         return self._data_source.is_initialised()
 
-    def set_password(self, password):
+    def set_password(self, password, config=None):
         self._assert_unlocked()
-        self._data_source.set_password(password)
+        self._data_source.set_password(password, config)
 
     def create_item(self, data=None):
         self._assert_unlocked()
@@ -37,6 +37,37 @@ class Keychain(object):
         except UnauthenticatedDataSourceException:
             raise KeychainLockedException
 
+    def save_items(self, items):
+        try:
+            self._data_source.save_items(items)
+        except UnauthenticatedDataSourceException:
+            raise KeychainLockedException
+
+    def delete_items(self, item_ids):
+        try:
+            self._data_source.delete_items(item_ids)
+        except UnauthenticatedDataSourceException:
+            raise KeychainLockedException
+
+    # Pages through items ordered by updatedAt, createdAt or title, decrypting only the items on the page
+    def list(self, order_by='updatedAt', offset=0, limit=None, folder=None, type=None, reverse=False):
+        self._assert_unlocked()
+        return self._data_source.list_items(order_by, offset, limit, folder, type, reverse)
+
+    def list_summaries(self):
+        self._assert_initialised()
+        return self._data_source.list_summaries()
+
+    def search(self, query, fields=None, folder=None):
+        self._assert_initialised()
+        return self._data_source.search(query, fields, folder)
+
+    # Decrypts every item on each call unless the data source keeps a content index, see the content_search
+    # option of AgileKeychain
+    def search_contents(self, query, folder=None):
+        self._assert_unlocked()
+        return self._data_source.search_contents(query, folder)
+
     def _assert_unlocked(self):
         if self.is_locked() is True:
             raise KeychainLockedException
@@ -55,4 +86,11 @@ class Keychain(object):
 
     def __iter__(self):
         self._assert_unlocked()
-        return iter(self._data_source.get_all_items())
+        return self._iter_items(self._data_source.iter_items())
+
+    # Items are decrypted as they are iterated over, so the keychain may be locked part way through
+    def _iter_items(self, items):
+        try:
+            yield from items
+        except UnauthenticatedDataSourceException:
+            raise KeychainLockedException
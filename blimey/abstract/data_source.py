@@ -23,13 +23,21 @@ class DataSource(metaclass=ABCMeta):
         return NotImplemented
 
     @abstractmethod
-    def set_password(self, password):
+    def set_password(self, password, config=None):
         return NotImplemented
 
     @abstractmethod
     def save_item(self, item):
         return NotImplemented
 
+    @abstractmethod
+    def save_items(self, items):
+        return NotImplemented
+
+    @abstractmethod
+    def delete_items(self, item_ids):
+        return NotImplemented
+
     @abstractmethod
     def get_item_by_id(self, item):
         return NotImplemented
@@ -37,3 +45,23 @@ class DataSource(metaclass=ABCMeta):
     @abstractmethod
     def get_all_items(self):
         return NotImplemented
+
+    @abstractmethod
+    def iter_items(self):
+        return NotImplemented
+
+    @abstractmethod
+    def list_items(self, order_by='updatedAt', offset=0, limit=None, folder=None, type_name=None, reverse=False):
+        return NotImplemented
+
+    @abstractmethod
+    def list_summaries(self):
+        return NotImplemented
+
+    @abstractmethod
+    def search(self, query, fields=None, folder=None):
+        return NotImplemented
+
+    @abstractmethod
+    def search_contents(self, query, folder=None):
+        return NotImplemented
@@ -1 +1,5 @@
 from blimey.agile_keychain.data_source import DataSource
+from blimey.agile_keychain._crypto_backend import set_backend as set_crypto_backend
+from blimey.agile_keychain._json_codec import set_codec as set_json_codec
+from blimey.agile_keychain._manager._item_layout import migrate_to_sharded_layout, migrate_to_flat_layout, \
+    export_to_flat_layout
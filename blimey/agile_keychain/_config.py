@@ -0,0 +1,6 @@
+# Options come from the config handed to AgileKeychain, a missing config or option reads as the default
+def read_option(config, name, default=None):
+    try:
+        return config[name]
+    except (KeyError, TypeError):
+        return default
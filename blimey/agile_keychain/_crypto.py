@@ -1,18 +1,50 @@
 import os
-from pbkdf2 import PBKDF2
-from Crypto.Cipher import AES
-from Crypto.Hash import MD5
+import hmac
+import time
+import hashlib
 from base64 import b64encode, b64decode
-from math import fmod
-import json
 
-from blimey.exceptions import IncorrectPasswordException
+from blimey.exceptions import IncorrectPasswordException, InvalidEncryptedDataException
 from blimey.agile_keychain._key import EncryptedKey, DecryptedKey
+from blimey.agile_keychain import _json_codec as json_codec
+from blimey.agile_keychain._crypto_backend import get_backend
 from blimey.agile_keychain.agile_keychain_item import EncryptedAgileKeychainItem, AgileKeychainItem
 
+MINIMUM_ITERATIONS = 1000
+CALIBRATION_TIME = 0.05
+
 
 def generate_id():
-    return MD5.new(os.urandom(32)).hexdigest().upper()
+    return get_backend().md5(os.urandom(32)).hexdigest().upper()
+
+
+def kdf_releases_gil():
+    return get_backend().releases_gil
+
+
+# Measures the active backend on this machine to find the iteration count a single derivation takes target_time with
+def calibrate_iterations(target_time):
+    seconds_per_iteration = _measure_seconds_per_iteration()
+    iterations = round(target_time / seconds_per_iteration) // MINIMUM_ITERATIONS * MINIMUM_ITERATIONS
+
+    return max(MINIMUM_ITERATIONS, iterations)
+
+
+def _measure_seconds_per_iteration():
+    password = os.urandom(16)
+    salt = os.urandom(8)
+    iterations = MINIMUM_ITERATIONS
+
+    # Grow the sample until timer resolution and call overhead stop mattering
+    while True:
+        start = time.perf_counter()
+        get_backend().pbkdf2(password, salt, iterations)
+        elapsed = time.perf_counter() - start
+
+        if elapsed >= CALIBRATION_TIME:
+            return elapsed / iterations
+
+        iterations *= 2
 
 
 def decrypt_key(encrypted_key, password):
@@ -40,7 +72,7 @@ def encrypt_key(decrypted_key, password, iterations=None):
     master_salt = os.urandom(8)
     master_key = decrypted_key.key
 
-    master_key_iv = PBKDF2(password, master_salt, iterations).read(32)
+    master_key_iv = get_backend().pbkdf2(password, master_salt, iterations)
     encrypted_master_key = _aes_encrypt(master_key_iv[0:16], master_key_iv[16:], master_key)
 
     validation_salt = os.urandom(8)
@@ -63,7 +95,7 @@ def create_key(password, level, iterations):
     master_salt = os.urandom(8)
     master_key = os.urandom(1024)
 
-    master_key_iv = PBKDF2(password, master_salt, iterations).read(32)
+    master_key_iv = get_backend().pbkdf2(password, master_salt, iterations)
     encrypted_master_key = _aes_encrypt(master_key_iv[0:16], master_key_iv[16:], master_key)
 
     validation_salt = os.urandom(8)
@@ -83,12 +115,10 @@ def create_key(password, level, iterations):
 
 
 def decrypt_item(item, decrypted_key):
-    encrypted = b64decode(item['encrypted'])
-    init_vector = encrypted[8:16]
-    derived_key = _derive_openssl_key(decrypted_key.key, init_vector)
+    encrypted = memoryview(b64decode(item['encrypted']))
+    derived_key = _derive_item_key(decrypted_key, encrypted[8:16])
     decrypted = _aes_decrypt(derived_key[0:16], derived_key[16:], encrypted[16:])
-    decrypted = strip_byte_padding(decrypted)
-    decrypted_data = json.loads(decrypted.decode('utf8'))
+    decrypted_data = json_codec.loads(strip_byte_padding(decrypted))
 
     decrypted_item = AgileKeychainItem(item)
     decrypted_item['encrypted'] = decrypted_data
@@ -98,10 +128,9 @@ def decrypt_item(item, decrypted_key):
 
 def encrypt_item(item, decrypted_key):
     init_vector = os.urandom(8)
-    derived_key = _derive_openssl_key(decrypted_key.key, init_vector)
+    derived_key = _derive_item_key(decrypted_key, init_vector)
 
-    data = json.dumps(item['encrypted'])
-    data = byte_pad(data.encode('utf8'), 16)
+    data = byte_pad(json_codec.dumps(item['encrypted']), 16)
     data = _aes_encrypt(derived_key[0:16], derived_key[16:], data)
 
     encrypted_data = b64encode(b'Salted__' + init_vector + data).decode('ascii')
@@ -112,31 +141,82 @@ def encrypt_item(item, decrypted_key):
     return encrypted_item
 
 
+# Data kept next to the keychain, such as the search index, is encrypted and authenticated with keys derived
+# from a master key for that purpose alone
+def encrypt_data(data, decrypted_key, purpose):
+    encryption_key, authentication_key = _derive_purpose_keys(decrypted_key, purpose)
+    init_vector = os.urandom(16)
+
+    # Unlike byte_pad, always pads, so the padding can be stripped unambiguously
+    padding_length = 16 - len(data) % 16
+    padded_data = data + bytes([padding_length]) * padding_length
+    encrypted_data = init_vector + _aes_encrypt(encryption_key, init_vector, padded_data)
+
+    return encrypted_data + hmac.new(authentication_key, encrypted_data, hashlib.sha256).digest()
+
+
+def decrypt_data(data, decrypted_key, purpose):
+    encryption_key, authentication_key = _derive_purpose_keys(decrypted_key, purpose)
+    encrypted_data, signature = data[0:-32], data[-32:]
+
+    if len(encrypted_data) < 32 or len(encrypted_data) % 16 != 0:
+        raise InvalidEncryptedDataException()
+
+    if not hmac.compare_digest(hmac.new(authentication_key, encrypted_data, hashlib.sha256).digest(), signature):
+        raise InvalidEncryptedDataException()
+
+    decrypted_data = _aes_decrypt(encryption_key, encrypted_data[0:16], encrypted_data[16:])
+
+    return decrypted_data[0:-decrypted_data[-1]]
+
+
+def _derive_purpose_keys(decrypted_key, purpose):
+    digest = hmac.new(decrypted_key.key, purpose.encode('utf8'), hashlib.sha512).digest()
+
+    return digest[0:32], digest[32:]
+
+
 def _derive_key_from_password(key, password):
-    return PBKDF2(password, key.data[8:16], key.iterations).read(32)
+    return get_backend().pbkdf2(password, key.data[8:16], key.iterations)
 
 
 def _derive_validation_key(key, encryption_key):
     return _derive_openssl_key(encryption_key, key.validation[8:16])
 
 
+# Same derivation as _derive_openssl_key, but the key is hashed only once per decrypted key and then reused
+def _derive_item_key(decrypted_key, salt):
+    if decrypted_key.hash_context is None:
+        decrypted_key.hash_context = get_backend().md5(memoryview(decrypted_key.key)[0:-16])
+
+    first_hash = decrypted_key.hash_context.copy()
+    first_hash.update(salt)
+    first_digest = first_hash.digest()
+
+    second_hash = get_backend().md5(first_digest)
+    second_hash.update(memoryview(decrypted_key.key)[0:-16])
+    second_hash.update(salt)
+
+    return first_digest + second_hash.digest()
+
+
 def _derive_openssl_key(key, salt):
     key = key[0:-16]
     openssl_key = bytes()
     prev = bytes()
     while len(openssl_key) < 32:
-        prev = MD5.new(prev + key + salt).digest()
+        prev = get_backend().md5(prev + key + salt).digest()
         openssl_key += prev
 
     return openssl_key
 
 
 def _aes_encrypt(key, init_vector, data):
-    return AES.new(key, AES.MODE_CBC, init_vector).encrypt(data)
+    return get_backend().aes_encrypt(key, init_vector, data)
 
 
 def _aes_decrypt(key, init_vector, data):
-    return AES.new(key, AES.MODE_CBC, init_vector).decrypt(data)
+    return get_backend().aes_decrypt(key, init_vector, data)
 
 
 def byte_pad(input_bytes, length=16):
@@ -144,24 +224,19 @@ def byte_pad(input_bytes, length=16):
         raise ValueError("Maximum padding length is 256")
 
     # Modulo input bytes length with padding length to see how many bytes to pad with
-    bytes_to_pad = length - int(fmod(len(input_bytes), length))
-
-    if bytes_to_pad == length:
-        bytes_to_pad = 0
+    bytes_to_pad = -len(input_bytes) % length
 
     # Pad input bytes with a sequence of bytes containing the number of padded bytes
-    input_bytes += bytes([bytes_to_pad] * bytes_to_pad)
-
-    return input_bytes
+    return input_bytes + bytes([bytes_to_pad]) * bytes_to_pad
 
 
 def strip_byte_padding(input_bytes, length=16):
     _assert_bytes_length_divisible_by(input_bytes, length)
 
-    if input_bytes == b'':
+    if len(input_bytes) == 0:
         return input_bytes
 
-    last_byte_value = ord(input_bytes[-1:].decode())
+    last_byte_value = input_bytes[-1]
 
     if last_byte_value > length:
         return input_bytes
@@ -172,10 +247,12 @@ def strip_byte_padding(input_bytes, length=16):
 
 
 def _assert_bytes_length_divisible_by(input_bytes, length):
-    if fmod(len(input_bytes), length) != 0:
+    if len(input_bytes) % length != 0:
         raise ValueError("Input byte length is not divisible by %s " % length)
 
 
 def _assert_last_byte_value_indicates_padding_size(input_bytes, byte_value):
-    if list(set(input_bytes[-byte_value:])) != [byte_value]:
+    padding = input_bytes[-byte_value:]
+
+    if padding.count(byte_value) != len(padding):
         raise ValueError("Invalid padding")
@@ -0,0 +1,116 @@
+import hashlib
+
+from blimey.agile_keychain import _selection as selection
+from blimey.exceptions import UnavailableCryptoBackendException
+
+try:
+    from pbkdf2 import PBKDF2
+except ImportError:
+    PBKDF2 = None
+
+try:
+    from Crypto.Cipher import AES
+    from Crypto.Hash import MD5
+except ImportError:
+    AES = None
+    MD5 = None
+
+try:
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+except ImportError:
+    Cipher = None
+
+BACKEND_ENVIRONMENT_VARIABLE = 'BLIMEY_CRYPTO_BACKEND'
+
+
+# The original implementation, every other backend must produce byte-identical output to it
+class PyCryptoBackend:
+    name = 'pycrypto'
+    releases_gil = False
+
+    @staticmethod
+    def is_available():
+        return PBKDF2 is not None and AES is not None
+
+    def pbkdf2(self, password, salt, iterations, length=32):
+        return PBKDF2(password, salt, iterations).read(length)
+
+    def md5(self, data=b''):
+        return MD5.new(data)
+
+    def aes_encrypt(self, key, init_vector, data):
+        return AES.new(key, AES.MODE_CBC, init_vector).encrypt(data)
+
+    def aes_decrypt(self, key, init_vector, data):
+        return AES.new(key, AES.MODE_CBC, init_vector).decrypt(data)
+
+
+# OpenSSL backed PBKDF2 and MD5 from the standard library, AES from pycrypto
+class HashlibBackend(PyCryptoBackend):
+    name = 'hashlib'
+    releases_gil = True
+
+    @staticmethod
+    def is_available():
+        return AES is not None
+
+    def pbkdf2(self, password, salt, iterations, length=32):
+        if isinstance(password, str):
+            password = password.encode('utf8')
+
+        return hashlib.pbkdf2_hmac('sha1', password, salt, iterations, length)
+
+    def md5(self, data=b''):
+        return hashlib.md5(data)
+
+
+# Standard library PBKDF2 and MD5, AES from the OpenSSL bindings of the cryptography package
+class CryptographyBackend(HashlibBackend):
+    name = 'cryptography'
+    releases_gil = True
+
+    @staticmethod
+    def is_available():
+        return Cipher is not None
+
+    def aes_encrypt(self, key, init_vector, data):
+        encryptor = self._cipher(key, init_vector).encryptor()
+        return encryptor.update(data) + encryptor.finalize()
+
+    def aes_decrypt(self, key, init_vector, data):
+        decryptor = self._cipher(key, init_vector).decryptor()
+        return decryptor.update(data) + decryptor.finalize()
+
+    def _cipher(self, key, init_vector):
+        return Cipher(algorithms.AES(bytes(key)), modes.CBC(bytes(init_vector)), backend=default_backend())
+
+
+# OpenSSL AES is several times faster than pycrypto's, and PBKDF2 from hashlib releases the GIL
+BACKENDS = [CryptographyBackend, HashlibBackend, PyCryptoBackend]
+
+_active_backend = None
+
+
+def get_available_backend_names():
+    return selection.get_available_names(BACKENDS)
+
+
+def create_backend(name):
+    return selection.create(BACKENDS, name, UnavailableCryptoBackendException)
+
+
+# BLIMEY_CRYPTO_BACKEND pins the backend without changing code, the decryption workers are handed the same one
+def set_backend(name=None):
+    global _active_backend
+
+    _active_backend = create_backend(selection.select_name(BACKENDS, BACKEND_ENVIRONMENT_VARIABLE, name))
+
+    return _active_backend
+
+
+def get_backend():
+    return _active_backend
+
+
+set_backend()
@@ -0,0 +1,77 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from blimey.agile_keychain import _crypto as crypto
+from blimey.agile_keychain import _crypto_backend as crypto_backend
+from blimey.agile_keychain import _json_codec as json_codec
+
+DEFAULT_CHUNK_SIZE = 64
+
+# Decrypted keys of the worker process, handed over by the parent through the pool initialiser
+_worker_keys = []
+
+
+class DecryptionPool:
+    def __init__(self, workers, chunk_size=None):
+        self._workers = workers
+        self._chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+
+    def decrypt_items(self, items, item_keys):
+        if len(items) == 0:
+            return []
+
+        return list(self.iter_decrypted_items(zip(items, item_keys), self._get_unique_keys(item_keys)))
+
+    def iter_decrypted_items(self, keyed_items, keys):
+        key_indexes = {id(key): index for index, key in enumerate(keys)}
+        jobs = ((dict(item), key_indexes[id(key)]) for item, key in keyed_items)
+
+        # Key material travels to the workers over the pool's pipes, never through the file system
+        with ProcessPoolExecutor(max_workers=self._workers, initializer=_initialise_worker,
+                                 initargs=(crypto_backend.get_backend().name, json_codec.get_codec().name,
+                                           keys)) as executor:
+            pending = deque()
+
+            # Only a bounded number of chunks is in flight, so items stream through without piling up
+            for chunk in self._split_into_chunks(jobs):
+                pending.append(executor.submit(_decrypt_chunk, chunk))
+
+                if len(pending) > self._workers * 2:
+                    yield from pending.popleft().result()
+
+            while len(pending) > 0:
+                yield from pending.popleft().result()
+
+    def _split_into_chunks(self, jobs):
+        chunk = []
+
+        for job in jobs:
+            chunk.append(job)
+
+            if len(chunk) == self._chunk_size:
+                yield chunk
+                chunk = []
+
+        if len(chunk) > 0:
+            yield chunk
+
+    def _get_unique_keys(self, item_keys):
+        keys = {}
+
+        for key in item_keys:
+            keys.setdefault(id(key), key)
+
+        return list(keys.values())
+
+
+def _initialise_worker(backend_name, codec_name, keys):
+    global _worker_keys
+
+    crypto_backend.set_backend(backend_name)
+    json_codec.set_codec(codec_name)
+    _worker_keys = keys
+
+
+# Items cross process boundaries as plain dictionaries, the item classes can not be unpickled
+def _decrypt_chunk(jobs):
+    return [dict(crypto.decrypt_item(item, _worker_keys[key_index])) for item, key_index in jobs]
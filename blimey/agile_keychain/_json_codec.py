@@ -0,0 +1,91 @@
+import json
+
+from blimey.agile_keychain import _selection as selection
+from blimey.exceptions import UnavailableJsonCodecException
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+CODEC_ENVIRONMENT_VARIABLE = 'BLIMEY_JSON_CODEC'
+
+
+# The standard library, writing exactly what blimey always wrote. Every codec encodes to UTF-8 bytes and decodes
+# UTF-8 bytes or text, and reads what any other codec wrote.
+class StandardCodec:
+    name = 'json'
+
+    @staticmethod
+    def is_available():
+        return True
+
+    def dumps(self, value):
+        return json.dumps(value).encode('utf8')
+
+    def loads(self, data):
+        if not isinstance(data, str):
+            data = bytes(data).decode('utf8')
+
+        return json.loads(data)
+
+
+# Compact output, with characters outside ASCII written as UTF-8 rather than escaped. What orjson can not encode,
+# such as integers beyond 64 bits or lone surrogates, or decode, such as NaN, is handed to the standard library.
+# Integers beyond 64 bits are read as floats, as JavaScript reads them, 1Password never writes any.
+class OrjsonCodec(StandardCodec):
+    name = 'orjson'
+
+    @staticmethod
+    def is_available():
+        return orjson is not None
+
+    def dumps(self, value):
+        try:
+            return orjson.dumps(value)
+        except TypeError:
+            return super(OrjsonCodec, self).dumps(value)
+
+    def loads(self, data):
+        try:
+            return orjson.loads(data)
+        except ValueError:
+            return super(OrjsonCodec, self).loads(data)
+
+
+# orjson whenever it is installed, the standard library is always there to fall back to
+CODECS = [OrjsonCodec, StandardCodec]
+
+_active_codec = None
+
+
+def get_available_codec_names():
+    return selection.get_available_names(CODECS)
+
+
+def create_codec(name):
+    return selection.create(CODECS, name, UnavailableJsonCodecException)
+
+
+# BLIMEY_JSON_CODEC=json keeps files byte for byte as older versions of blimey wrote them
+def set_codec(name=None):
+    global _active_codec
+
+    _active_codec = create_codec(selection.select_name(CODECS, CODEC_ENVIRONMENT_VARIABLE, name))
+
+    return _active_codec
+
+
+def get_codec():
+    return _active_codec
+
+
+def dumps(value):
+    return _active_codec.dumps(value)
+
+
+def loads(data):
+    return _active_codec.loads(data)
+
+
+set_codec()
@@ -16,3 +16,11 @@ class DecryptedKey():
         self.level = key['level']
         self.iterations = key['iterations']
         self.key = key['key']
+        self.hash_context = None
+
+    # Hash contexts can not be pickled, they are rebuilt from the key when needed
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['hash_context'] = None
+
+        return state
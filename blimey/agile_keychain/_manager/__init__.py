@@ -1,3 +1,5 @@
 from blimey.agile_keychain._manager._file_system_manager import FileSystemManager
 from blimey.agile_keychain._manager._key_manager import KeyManager
 from blimey.agile_keychain._manager._item_manager import ItemManager
+from blimey.agile_keychain._manager._index_manager import IndexManager
+from blimey.agile_keychain._manager._content_index_manager import ContentIndexManager
@@ -0,0 +1,64 @@
+import os
+from threading import Lock
+
+from blimey.agile_keychain._manager._item_layout import FlatLayout
+from blimey.agile_keychain._manager._file_stamp import get_file_stamp
+
+CONTENTS_FILE_NAME = 'contents.js'
+KEYS_FILE_NAME = '1password.keys'
+
+
+# Reports the items added, changed and removed since the previous call, by comparing snapshots of the names,
+# modification times, sizes and inodes of the item files. A snapshot is one os.scandir pass over every folder of
+# the layout, no file is opened. The first call reports every item as added.
+class ChangeFeed:
+    def __init__(self, path, layout=None):
+        self._folder_path = os.path.join(path, 'data', 'default')
+        self._layout = layout or FlatLayout(path)
+        self._snapshot = None
+        self._lock = Lock()
+
+    def get_changes(self):
+        with self._lock:
+            previous_snapshot = self._snapshot or {'items': {}, 'contents': None, 'keys': None}
+            self._snapshot = self.take_snapshot()
+
+            return _compare_snapshots(previous_snapshot, self._snapshot)
+
+    # Takes the snapshot the next call compares with, unless there is one already
+    def start(self):
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = self.take_snapshot()
+
+    def take_snapshot(self):
+        try:
+            item_stamps = self._layout.get_item_file_stamps()
+        except FileNotFoundError:
+            item_stamps = {}
+
+        return {
+            'items': item_stamps,
+            'contents': self._get_file_stamp(CONTENTS_FILE_NAME),
+            'keys': self._get_file_stamp(KEYS_FILE_NAME)
+        }
+
+    def _get_file_stamp(self, file_name):
+        return get_file_stamp(os.path.join(self._folder_path, file_name))
+
+
+def has_changes(changes):
+    return any(changes.values())
+
+
+def _compare_snapshots(previous_snapshot, snapshot):
+    previous_items, items = previous_snapshot['items'], snapshot['items']
+
+    return {
+        'added': sorted(item_id for item_id in items if item_id not in previous_items),
+        'changed': sorted(item_id for item_id, stamp in items.items()
+                          if item_id in previous_items and previous_items[item_id] != stamp),
+        'removed': sorted(item_id for item_id in previous_items if item_id not in items),
+        'contents_changed': previous_snapshot['contents'] != snapshot['contents'],
+        'keys_changed': previous_snapshot['keys'] != snapshot['keys']
+    }
@@ -0,0 +1,108 @@
+import os
+import sys
+import time
+import select
+import ctypes
+import ctypes.util
+
+from blimey.agile_keychain._manager._change_feed import has_changes
+
+DEFAULT_POLL_INTERVAL = 1.0
+
+# inotify events that can mean a file in the folder changed, or that the folder itself went away
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | \
+    IN_MOVE_SELF
+
+
+# Waits for changes reported by get_changes. On Linux it sleeps until inotify reports activity in the item
+# folders, elsewhere, or when inotify is unavailable, they are polled. Changes are always worked out by get_changes,
+# events only say when to look, so a lost or coalesced event never hides a change.
+class ChangeWatcher:
+    def __init__(self, get_changes, get_folder_paths, poll_interval=None):
+        self._get_changes = get_changes
+        self._get_folder_paths = get_folder_paths
+        self._poll_interval = poll_interval or DEFAULT_POLL_INTERVAL
+        self._libc, self._inotify_descriptor = _create_inotify()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        self.close()
+
+    def is_using_inotify(self):
+        return self._inotify_descriptor is not None
+
+    # Returns the next changes, or None when there were none within timeout seconds
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            # Watched before looking, so nothing can change unnoticed in between. Folders added since the last
+            # look, such as new shards, are picked up here too.
+            self._watch_folders()
+            changes = self._get_changes()
+
+            if has_changes(changes):
+                return changes
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+
+            if remaining is not None and remaining <= 0:
+                return None
+
+            self._wait_for_activity(remaining)
+
+    def close(self):
+        if self._inotify_descriptor is not None:
+            os.close(self._inotify_descriptor)
+            self._inotify_descriptor = None
+
+    # Watching a folder twice is harmless, inotify keeps a single watch per folder
+    def _watch_folders(self):
+        if self._inotify_descriptor is None:
+            return
+
+        for folder_path in self._get_folder_paths():
+            self._libc.inotify_add_watch(self._inotify_descriptor, os.fsencode(folder_path), WATCH_MASK)
+
+    def _wait_for_activity(self, timeout):
+        if self._inotify_descriptor is None:
+            time.sleep(self._poll_interval if timeout is None else min(self._poll_interval, timeout))
+            return
+
+        readable, _, _ = select.select([self._inotify_descriptor], [], [], timeout)
+
+        if len(readable) > 0:
+            self._drain_events()
+
+    def _drain_events(self):
+        try:
+            while len(os.read(self._inotify_descriptor, 65536)) > 0:
+                pass
+        except BlockingIOError:
+            pass
+
+
+def _create_inotify():
+    if not sys.platform.startswith('linux'):
+        return None, None
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        descriptor = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        return None, None
+
+    if descriptor < 0:
+        return None, None
+
+    return libc, descriptor
@@ -0,0 +1,218 @@
+from threading import Lock
+
+from blimey.exceptions import ItemNotFoundException, InvalidEncryptedDataException
+from blimey.agile_keychain import _crypto as crypto
+from blimey.agile_keychain import _json_codec as json_codec
+from blimey.agile_keychain._config import read_option
+from blimey.agile_keychain._search_index import SearchIndex
+from blimey.agile_keychain.agile_keychain_item import is_deleted
+
+CONTENT_SEARCH_FIELDS = ['contents']
+CONTENT_INDEX_VERSION = 2
+CONTENT_INDEX_PURPOSE = 'content search index'
+
+# Values never indexed for content search, along with web form fields of type 'P' and section fields of kind
+# 'concealed', which is how 1Password 4 stores passwords added to any item
+CONCEALED_KEYS = ['password', 'passwordHistory', 'cvv', 'pin']
+
+# The kind, internal name and label of section fields say nothing about what the item holds
+SECTION_FIELD_METADATA_KEYS = ['k', 'n', 't']
+
+
+# Builds and keeps the index of the decrypted item contents searched by search_contents, persisted encrypted
+# through the IndexManager when the persistent_content_search option is set. Items are decrypted with
+# decrypt_items and the persisted index encrypted with the key get_key returns, so it only works while unlocked.
+class ContentIndexManager:
+    def __init__(self, item_manager, index_manager, decrypt_items, get_key, config=None):
+        self._item_manager = item_manager
+        self._index_manager = index_manager
+        self._decrypt_items = decrypt_items
+        self._get_key = get_key
+        self._config = config
+        self._index = None
+        self._stamp = None
+        self._versions = None
+        self._is_changed = False
+        self._lock = Lock()
+
+    def is_built(self):
+        return self._index is not None
+
+    # The index is only kept between searches when the content_search option is set. Without it, every search
+    # decrypts the whole keychain.
+    def search(self, query, folder=None):
+        # Searches wait for a running build rather than starting one of their own
+        with self._lock:
+            stamp = self._item_manager.get_item_files_stamp()
+
+            if self._index is None or self._stamp != stamp:
+                self._prepare(stamp)
+
+            index = self._index
+
+            if read_option(self._config, 'content_search', False) is False and not self._is_persistent():
+                self._clear()
+
+            results = index.search(query, folder=folder)
+
+        for result in results:
+            del result['contents']
+
+        return results
+
+    # Brings the index up to date with items just saved, decrypted_items holding those that are not tombstones
+    def update(self, encrypted_items, decrypted_items, previous_stamp):
+        with self._lock:
+            if self._index is None:
+                return
+
+            for item in encrypted_items:
+                self._index.remove(item['uuid'])
+
+                # The stamp of the new file is unknown, the next refresh compares updatedAt instead
+                self._versions[item['uuid']] = [None if is_deleted(item) else item['updatedAt']]
+
+            for item in decrypted_items:
+                self._index.add(_summarise_contents(item))
+
+            self._is_changed = True
+
+            # An index that missed changes made by someone else is refreshed on the next search instead
+            if self._stamp == previous_stamp:
+                self._stamp = self._item_manager.get_item_files_stamp()
+
+    # Changes made since the persisted index was last written are saved, which takes the key, so only while
+    # is_authenticated says it is still there
+    def save_changes(self, is_authenticated):
+        with self._lock:
+            if self._is_changed and self._is_persistent() and is_authenticated():
+                self._save()
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    # Starts from the index in memory, or the persisted one, and only decrypts items that changed since
+    def _prepare(self, stamp):
+        if self._index is None and self._is_persistent():
+            self._load()
+
+        if self._index is None:
+            self._index = SearchIndex(fields=CONTENT_SEARCH_FIELDS)
+            self._versions = {}
+
+        # A persisted index saved while the folder looked the same needs no checking at all. The new stamp is saved
+        # even when no item changed, so the next unlock can skip the check.
+        if self._stamp != stamp:
+            self._refresh()
+            self._stamp = stamp
+            self._is_changed = True
+
+        if self._is_changed and self._is_persistent():
+            self._save()
+
+    # Versions hold updatedAt followed by the stamp of the item file, when it is known
+    def _refresh(self):
+        stamps = self._item_manager.get_item_file_stamps()
+        versions = self._versions
+
+        for item_id in [item_id for item_id in versions if item_id not in stamps]:
+            self._index.remove(item_id)
+            del versions[item_id]
+            self._is_changed = True
+
+        changed_items = []
+
+        for item_id, stamp in stamps.items():
+            version = versions.get(item_id)
+            stamp = list(stamp)
+
+            if version is not None and version[1:] == stamp:
+                continue
+
+            try:
+                item = self._item_manager.get_by_id(item_id)
+            except ItemNotFoundException:
+                # Tombstones keep their version too, so they are not read again on every refresh
+                self._index.remove(item_id)
+                versions[item_id] = [None] + stamp
+                self._is_changed = True
+                continue
+
+            if version is None or version[0] != item['updatedAt']:
+                changed_items.append(item)
+
+            versions[item_id] = [item['updatedAt']] + stamp
+            self._is_changed = True
+
+        for item in self._decrypt_items(changed_items):
+            self._index.add(_summarise_contents(item))
+
+    def _load(self):
+        data = self._index_manager.load_index()
+
+        if data is None:
+            return
+
+        try:
+            state = json_codec.loads(crypto.decrypt_data(data, self._get_key(), CONTENT_INDEX_PURPOSE))
+        except (InvalidEncryptedDataException, ValueError):
+            return
+
+        if state.get('version') != CONTENT_INDEX_VERSION:
+            return
+
+        self._index = SearchIndex.from_state(state['index'])
+        self._stamp = None if state['stamp'] is None else tuple(state['stamp'])
+        self._versions = state['versions']
+        self._is_changed = False
+
+    # Not compressed, decompressing took longer than reading and decrypting the whole file
+    def _save(self):
+        state = {
+            'version': CONTENT_INDEX_VERSION,
+            'stamp': self._stamp,
+            'versions': self._versions,
+            'index': self._index.get_state()
+        }
+
+        data = json_codec.dumps(state)
+        self._index_manager.save_index(crypto.encrypt_data(data, self._get_key(), CONTENT_INDEX_PURPOSE))
+        self._is_changed = False
+
+    def _is_persistent(self):
+        return read_option(self._config, 'persistent_content_search', False) is True
+
+    def _clear(self):
+        self._index = None
+        self._stamp = None
+        self._versions = None
+        self._is_changed = False
+
+
+def _summarise_contents(item):
+    return {
+        'uuid': item['uuid'],
+        'typeName': item['typeName'],
+        'title': item['title'],
+        'locationKey': item['locationKey'],
+        'folderUuid': item['folderUuid'],
+        'trashed': item['trashed'] is True,
+        'contents': '\n'.join(_get_searchable_text(item['encrypted']))
+    }
+
+
+# Every string in the decrypted contents, except for the values of concealed fields such as passwords
+def _get_searchable_text(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        if value.get('type') == 'P' or value.get('designation') == 'password' or value.get('k') == 'concealed':
+            return
+
+        for key, nested_value in value.items():
+            if key not in CONCEALED_KEYS and key not in SECTION_FIELD_METADATA_KEYS:
+                yield from _get_searchable_text(nested_value)
+    elif isinstance(value, list):
+        for nested_value in value:
+            yield from _get_searchable_text(nested_value)
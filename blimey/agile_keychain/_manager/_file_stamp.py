@@ -0,0 +1,13 @@
+import os
+
+
+# Tells whether a file changed without opening it, files are replaced by renaming so the inode changes too
+def get_stamp(stat):
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+def get_file_stamp(path):
+    try:
+        return get_stamp(os.stat(path))
+    except FileNotFoundError:
+        return None
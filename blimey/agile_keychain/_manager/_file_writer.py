@@ -0,0 +1,110 @@
+import os
+import stat
+from threading import Lock, Timer
+
+from blimey.exceptions import UnknownDurabilityException
+
+# Files are always replaced atomically, durability only decides when they are forced to disk:
+#
+# none   never, the operating system writes them back in its own time
+# fsync  before every write returns
+# group  their data before every write returns, like fsync, only the directory syncs that make the renames durable
+#        are shared: one sync of every directory written to within group_commit_window seconds of the first write
+DURABILITY_LEVELS = ['none', 'fsync', 'group']
+DEFAULT_DURABILITY = 'none'
+DEFAULT_GROUP_COMMIT_WINDOW = 0.1
+TEMPORARY_FILE_EXTENSION = '.tmp'
+
+
+class FileWriter:
+    def __init__(self, durability=None, group_commit_window=None):
+        self._durability = durability or DEFAULT_DURABILITY
+        self._group_commit_window = group_commit_window or DEFAULT_GROUP_COMMIT_WINDOW
+        self._pending_directories = set()
+        self._pending_lock = Lock()
+        self._timer = None
+
+        if self._durability not in DURABILITY_LEVELS:
+            raise UnknownDurabilityException(self._durability)
+
+    # The data goes to a temporary file next to the target first, so a crash never leaves a partial file behind
+    def write(self, path, data):
+        if isinstance(data, str):
+            data = data.encode('utf8')
+
+        temporary_path = '{0}.{1}{2}'.format(path, os.urandom(4).hex(), TEMPORARY_FILE_EXTENSION)
+
+        try:
+            with open(temporary_path, 'xb') as file:
+                file.write(data)
+
+                # A rename may reach the disk before the data it points to, so the data always goes first
+                if self._durability in ['fsync', 'group']:
+                    file.flush()
+                    os.fsync(file.fileno())
+
+            self._copy_permissions(path, temporary_path)
+            os.replace(temporary_path, path)
+        except BaseException:
+            self._remove_if_present(temporary_path)
+            raise
+
+        if self._durability == 'fsync':
+            self._fsync_directory(os.path.dirname(path))
+        elif self._durability == 'group':
+            self._add_pending_directory(os.path.dirname(path))
+
+    # Forces every rename of the current group commit window to disk right away
+    def flush(self):
+        with self._pending_lock:
+            directories = self._pending_directories
+            self._pending_directories = set()
+
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        for directory in directories:
+            self._fsync_directory(directory)
+
+    def _add_pending_directory(self, directory):
+        with self._pending_lock:
+            self._pending_directories.add(directory)
+
+            # Not a daemon thread, so the interpreter commits the last window before it exits
+            if self._timer is None:
+                self._timer = Timer(self._group_commit_window, self.flush)
+                self._timer.start()
+
+    def _fsync_file(self, path):
+        try:
+            file_descriptor = os.open(path, os.O_RDONLY)
+        except FileNotFoundError:
+            return
+
+        try:
+            os.fsync(file_descriptor)
+        finally:
+            os.close(file_descriptor)
+
+    # Makes the rename itself durable, directories can not be opened for this on Windows
+    def _fsync_directory(self, directory):
+        if os.name == 'nt':
+            return
+
+        self._fsync_file(directory or '.')
+
+    # Replacing a file must not loosen the permissions someone has set on it
+    def _copy_permissions(self, path, temporary_path):
+        try:
+            mode = os.stat(path).st_mode
+        except FileNotFoundError:
+            return
+
+        os.chmod(temporary_path, stat.S_IMODE(mode))
+
+    def _remove_if_present(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
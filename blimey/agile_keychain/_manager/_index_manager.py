@@ -0,0 +1,28 @@
+import os
+
+from blimey.agile_keychain._config import read_option
+from blimey.agile_keychain._manager._file_writer import FileWriter
+
+INDEX_FILE_NAME = 'blimey.index'
+
+
+# Reads and writes the encrypted search index. It lives in the keychain's root folder rather than next to the
+# item files, so writing it never looks like a change to the items.
+class IndexManager:
+    def __init__(self, path, config=None):
+        self._index_file_path = os.path.join(path, INDEX_FILE_NAME)
+        self._file_writer = FileWriter(read_option(config, 'durability'),
+                                       read_option(config, 'group_commit_window'))
+
+    def load_index(self):
+        try:
+            with open(self._index_file_path, 'rb') as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def save_index(self, data):
+        self._file_writer.write(self._index_file_path, data)
+
+    def flush(self):
+        self._file_writer.flush()
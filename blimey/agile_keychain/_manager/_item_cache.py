@@ -0,0 +1,89 @@
+from threading import Lock
+from collections import OrderedDict
+
+
+# Least recently used cache of parsed item files, bounded by entry count and by the size of the files
+class ItemCache:
+    def __init__(self, max_entries=None, max_bytes=None):
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = Lock()
+
+    # Entries are only valid for the exact file they were read from, identified by its stamp
+    def get(self, item_id, stamp):
+        with self._lock:
+            try:
+                entry_stamp, item, size = self._entries[item_id]
+            except KeyError:
+                self._misses += 1
+                return None
+
+            if entry_stamp != stamp:
+                self._remove(item_id)
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(item_id)
+            self._hits += 1
+
+            return _copy(item)
+
+    def put(self, item_id, stamp, item, size):
+        with self._lock:
+            self._remove(item_id)
+
+            if self._max_bytes is not None and size > self._max_bytes:
+                return
+
+            self._entries[item_id] = (stamp, _copy(item), size)
+            self._size += size
+
+            while self._is_full():
+                self._remove(next(iter(self._entries)))
+
+    def discard(self, item_id):
+        with self._lock:
+            self._remove(item_id)
+
+    def get_statistics(self):
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'entries': len(self._entries),
+                'bytes': self._size
+            }
+
+    def _remove(self, item_id):
+        entry = self._entries.pop(item_id, None)
+
+        if entry is not None:
+            self._size -= entry[2]
+
+    def _is_full(self):
+        if self._max_entries is not None and len(self._entries) > self._max_entries:
+            return True
+
+        return self._max_bytes is not None and self._size > self._max_bytes
+
+
+# Callers own the items they get, so nothing they change may leak into the cached copy
+def _copy(value):
+    if isinstance(value, dict):
+        copy = value.copy()
+
+        for key, nested_value in copy.items():
+            if isinstance(nested_value, (dict, list)):
+                copy[key] = _copy(nested_value)
+
+        return copy
+
+    if isinstance(value, list):
+        return [_copy(nested_value) if isinstance(nested_value, (dict, list)) else nested_value
+                for nested_value in value]
+
+    return value
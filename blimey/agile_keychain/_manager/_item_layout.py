@@ -0,0 +1,243 @@
+import os
+import shutil
+import string
+
+from blimey.exceptions import UnknownLayoutException, MismatchedLayoutException
+from blimey.agile_keychain._manager._index_manager import INDEX_FILE_NAME
+from blimey.agile_keychain._manager._file_writer import FileWriter, TEMPORARY_FILE_EXTENSION
+from blimey.agile_keychain._manager._file_stamp import get_stamp
+
+ITEM_FILE_EXTENSION = '.1password'
+SHARD_NAME_LENGTH = 2
+LAYOUTS = ['flat', 'sharded']
+DEFAULT_LAYOUT = 'flat'
+
+# Written by the migrations, in the keychain's root folder like the search index
+LAYOUT_FILE_NAME = 'blimey.layout'
+
+# Tombstones being vacuumed are renamed to this extension before they are removed
+VACUUMED_FILE_EXTENSION = '.vacuum'
+
+
+# Without a layout, the one the keychain is in is used. A layout that does not match it is refused, items
+# written through it would be invisible to everyone using the other one.
+def create_layout(path, layout=None):
+    if layout is not None and layout not in LAYOUTS:
+        raise UnknownLayoutException(layout)
+
+    detected_layout = detect_layout(path)
+
+    if layout is not None and detected_layout is not None and layout != detected_layout:
+        raise MismatchedLayoutException(detected_layout)
+
+    layout = layout or detected_layout or DEFAULT_LAYOUT
+
+    if layout == 'sharded':
+        return ShardedLayout(path)
+
+    return FlatLayout(path)
+
+
+# The layout recorded by the last migration. Keychains never migrated are sharded when they have shards, which
+# blimey creates as soon as it writes an item, and flat when they have item files, None when they have neither.
+def detect_layout(path):
+    try:
+        with open(os.path.join(path, LAYOUT_FILE_NAME), 'r') as file:
+            return file.read().strip()
+    except FileNotFoundError:
+        pass
+
+    has_item_files = False
+
+    try:
+        with os.scandir(os.path.join(path, 'data', 'default')) as entries:
+            for entry in entries:
+                if is_shard_name(entry.name) and entry.is_dir():
+                    return 'sharded'
+
+                has_item_files = has_item_files or entry.name.endswith(ITEM_FILE_EXTENSION)
+    except FileNotFoundError:
+        return None
+
+    return 'flat' if has_item_files else None
+
+
+# Moves every item file into shards. Like the other migrations, it is meant to run while no one else has the
+# keychain open, and it can be run again to finish a migration that was interrupted. The new layout is recorded
+# once every item file is in it.
+def migrate_to_sharded_layout(path):
+    _move_item_files(FlatLayout(path), ShardedLayout(path))
+    _write_layout(path, 'sharded')
+
+
+def migrate_to_flat_layout(path):
+    sharded_layout = ShardedLayout(path)
+    _move_item_files(sharded_layout, FlatLayout(path))
+
+    for folder_path in sharded_layout.get_item_folder_paths()[1:]:
+        try:
+            os.rmdir(folder_path)
+        except OSError:
+            # Still holds something that is not an item file, such as a temporary file left by a crash
+            continue
+
+    _write_layout(path, 'flat')
+
+
+# Copies the keychain to destination_path in the flat layout, the only one other clients understand, whatever
+# layout it is in. The copy leaves out the search index, the recorded layout, temporary files and tombstones being
+# vacuumed.
+def export_to_flat_layout(path, destination_path):
+    folder_path = os.path.join(path, 'data', 'default')
+
+    def ignore(directory, names):
+        return [name for name in names if name.endswith((TEMPORARY_FILE_EXTENSION, VACUUMED_FILE_EXTENSION)) or
+                (directory == path and name in [INDEX_FILE_NAME, LAYOUT_FILE_NAME]) or
+                (directory == folder_path and is_shard_name(name))]
+
+    shutil.copytree(path, destination_path, ignore=ignore)
+    flat_layout = FlatLayout(destination_path)
+    sharded_layout = ShardedLayout(path)
+
+    for item_id in sharded_layout.get_item_ids():
+        shutil.copy2(sharded_layout.get_item_file_path(item_id), flat_layout.get_item_file_path(item_id))
+
+
+def is_shard_name(name):
+    return len(name) == SHARD_NAME_LENGTH and all(character in string.hexdigits for character in name)
+
+
+# The stock layout, every item file directly in data/default
+class FlatLayout:
+    def __init__(self, path):
+        self._folder_path = os.path.join(path, 'data', 'default')
+
+    def get_item_file_path(self, item_id):
+        return os.path.join(self._folder_path, item_id + ITEM_FILE_EXTENSION)
+
+    # Nothing to create, data/default exists as long as the keychain does
+    def get_item_file_path_for_writing(self, item_id):
+        return self.get_item_file_path(item_id)
+
+    def get_item_folder_paths(self):
+        return [self._folder_path]
+
+    def get_item_ids(self):
+        try:
+            file_names = os.listdir(self._folder_path)
+        except FileNotFoundError:
+            return []
+
+        return sorted(_get_item_ids(file_names))
+
+    def get_item_file_stamps(self):
+        return dict(_get_item_file_stamps(self._folder_path))
+
+    # Item files are replaced by renaming, by this manager and by sync clients, which changes the folder's stamp
+    def get_item_files_stamp(self):
+        return get_stamp(os.stat(self._folder_path))
+
+
+# Item files in subfolders of data/default named after the first two characters of their uuid, so no folder
+# holds more than a few hundred files even in very large keychains. Only blimey understands this layout,
+# export_to_flat_layout makes a copy other clients can read.
+class ShardedLayout:
+    def __init__(self, path):
+        self._folder_path = os.path.join(path, 'data', 'default')
+        self._created_shard_names = set()
+
+    def get_item_file_path(self, item_id):
+        return os.path.join(self._folder_path, item_id[:SHARD_NAME_LENGTH], item_id + ITEM_FILE_EXTENSION)
+
+    # Shards are created on first use
+    def get_item_file_path_for_writing(self, item_id):
+        shard_name = item_id[:SHARD_NAME_LENGTH]
+
+        if shard_name not in self._created_shard_names:
+            os.makedirs(os.path.join(self._folder_path, shard_name), exist_ok=True)
+            self._created_shard_names.add(shard_name)
+
+        return self.get_item_file_path(item_id)
+
+    def get_item_folder_paths(self):
+        return [self._folder_path] + [os.path.join(self._folder_path, name) for name in self._get_shard_names()]
+
+    def get_item_ids(self):
+        item_ids = []
+
+        for shard_name in self._get_shard_names():
+            try:
+                item_ids.extend(_get_item_ids(os.listdir(os.path.join(self._folder_path, shard_name))))
+            except FileNotFoundError:
+                continue
+
+        return sorted(item_ids)
+
+    def get_item_file_stamps(self):
+        stamps = {}
+
+        for shard_name in self._get_shard_names():
+            try:
+                stamps.update(_get_item_file_stamps(os.path.join(self._folder_path, shard_name)))
+            except FileNotFoundError:
+                continue
+
+        return stamps
+
+    # Renames only change the stamp of the shard holding the file, so the stamp covers every shard. It is kept a
+    # flat tuple of numbers, like the flat layout's, so it survives a round trip through JSON.
+    def get_item_files_stamp(self):
+        stamp = get_stamp(os.stat(self._folder_path))
+
+        for shard_name in self._get_shard_names():
+            try:
+                stamp += get_stamp(os.stat(os.path.join(self._folder_path, shard_name)))
+            except FileNotFoundError:
+                continue
+
+        return stamp
+
+    def _get_shard_names(self):
+        try:
+            with os.scandir(self._folder_path) as entries:
+                return sorted(entry.name for entry in entries if is_shard_name(entry.name) and entry.is_dir())
+        except FileNotFoundError:
+            return []
+
+
+# When an item is in both layouts, the newer file wins. That only happens when the keychain was used between an
+# interrupted migration and the next run.
+def _move_item_files(source_layout, target_layout):
+    for item_id in source_layout.get_item_ids():
+        source_path = source_layout.get_item_file_path(item_id)
+        target_path = target_layout.get_item_file_path_for_writing(item_id)
+
+        try:
+            if os.stat(target_path).st_mtime_ns > os.stat(source_path).st_mtime_ns:
+                os.remove(source_path)
+                continue
+        except FileNotFoundError:
+            pass
+
+        os.replace(source_path, target_path)
+
+
+def _write_layout(path, layout):
+    FileWriter().write(os.path.join(path, LAYOUT_FILE_NAME), layout)
+
+
+def _get_item_ids(file_names):
+    return (file_name[:-len(ITEM_FILE_EXTENSION)] for file_name in file_names
+            if file_name.endswith(ITEM_FILE_EXTENSION))
+
+
+def _get_item_file_stamps(folder_path):
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            if not entry.name.endswith(ITEM_FILE_EXTENSION):
+                continue
+
+            try:
+                yield entry.name[:-len(ITEM_FILE_EXTENSION)], get_stamp(entry.stat())
+            except FileNotFoundError:
+                continue
@@ -0,0 +1,85 @@
+from bisect import bisect_left, insort
+from collections import OrderedDict
+
+from blimey.exceptions import UnknownListingOrderException
+
+LISTING_ORDERS = ['updatedAt', 'createdAt', 'title']
+
+# Every kept ordering is updated on every save, the least recently used ones are dropped beyond this
+DEFAULT_MAX_ORDERS = 8
+
+
+# The open fields items are ordered and filtered by, for every item, so a page can be picked without opening any
+# item file. Each ordering is sorted once and then kept sorted as items are added and removed.
+class ItemListing:
+    def __init__(self, max_orders=None):
+        self._rows = {}
+        self._orders = OrderedDict()
+        self._max_orders = max_orders or DEFAULT_MAX_ORDERS
+
+    def add(self, item):
+        row = {
+            'updatedAt': _as_number(item['updatedAt']),
+            'createdAt': _as_number(item['createdAt']),
+            'title': item['title'] if isinstance(item['title'], str) else '',
+            'typeName': item['typeName'],
+            'folderUuid': item['folderUuid'] or None
+        }
+
+        self.remove(item['uuid'])
+        self._rows[item['uuid']] = row
+
+        for (order_by, folder, type_name), entries in self._orders.items():
+            if _matches(row, folder, type_name):
+                insort(entries, _get_entry(item['uuid'], row, order_by))
+
+    def remove(self, item_id):
+        row = self._rows.pop(item_id, None)
+
+        if row is None:
+            return
+
+        for (order_by, folder, type_name), entries in self._orders.items():
+            if _matches(row, folder, type_name):
+                del entries[bisect_left(entries, _get_entry(item_id, row, order_by))]
+
+    # Ties are broken by uuid, so pages never overlap or skip items while nothing changes
+    def get_page(self, order_by='updatedAt', offset=0, limit=None, folder=None, type_name=None, reverse=False):
+        if order_by not in LISTING_ORDERS:
+            raise UnknownListingOrderException(order_by)
+
+        key = (order_by, folder, type_name)
+
+        if key in self._orders:
+            self._orders.move_to_end(key)
+        else:
+            self._orders[key] = sorted(_get_entry(item_id, row, order_by) for item_id, row in self._rows.items()
+                                       if _matches(row, folder, type_name))
+
+            if len(self._orders) > self._max_orders:
+                self._orders.popitem(last=False)
+
+        entries = self._orders[key]
+
+        if reverse:
+            end = max(len(entries) - offset, 0)
+            entries = entries[0 if limit is None else max(end - limit, 0):end][::-1]
+        else:
+            entries = entries[offset:None if limit is None else offset + limit]
+
+        return [item_id for _, item_id in entries]
+
+
+def _get_entry(item_id, row, order_by):
+    if order_by == 'title':
+        return row['title'].casefold(), item_id
+
+    return row[order_by], item_id
+
+
+def _matches(row, folder, type_name):
+    return (folder is None or row['folderUuid'] == folder) and (type_name is None or row['typeName'] == type_name)
+
+
+def _as_number(value):
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else 0
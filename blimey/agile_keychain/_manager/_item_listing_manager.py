@@ -0,0 +1,123 @@
+from threading import Lock
+
+from blimey.agile_keychain.agile_keychain_item import is_deleted
+from blimey.agile_keychain._manager._item_listing import ItemListing
+
+
+# Keeps an ItemListing up to date with the item files, opening only those that changed since the previous call.
+# The first time, items are listed from contents.js where its rows carry updatedAt, only ordering by createdAt then
+# opens their item files. get_item returns None for items that are gone or deleted.
+class ItemListingManager:
+    def __init__(self, layout, get_item, load_contents_rows, get_contents_stamp):
+        self._layout = layout
+        self._get_item = get_item
+        self._load_contents_rows = load_contents_rows
+        self._get_contents_stamp = get_contents_stamp
+        self._listing = None
+        self._stamp = None
+        self._item_stamps = None
+        self._seeded_ids = None
+        self._lock = Lock()
+
+    def is_built(self):
+        return self._listing is not None
+
+    def list_item_ids(self, order_by='updatedAt', offset=0, limit=None, folder=None, type_name=None, reverse=False):
+        with self._lock:
+            self._refresh()
+
+            if order_by == 'createdAt':
+                self._read_seeded_items()
+
+            return self._listing.get_page(order_by, offset, limit, folder, type_name, reverse)
+
+    # Like the search index, only a listing that was up to date before this save is brought up to date here. The
+    # stamps of the new files are unknown, so they are read once more on the next refresh.
+    def update(self, items, previous_stamp):
+        with self._lock:
+            if self._listing is None or self._stamp != previous_stamp:
+                return
+
+            for item in items:
+                if is_deleted(item):
+                    self._listing.remove(item['uuid'])
+                else:
+                    self._listing.add(item)
+
+                self._item_stamps[item['uuid']] = None
+                self._seeded_ids.discard(item['uuid'])
+
+            self._stamp = self._layout.get_item_files_stamp()
+
+    def _refresh(self):
+        stamp = self._layout.get_item_files_stamp()
+
+        if self._listing is not None and self._stamp == stamp:
+            return
+
+        current_item_stamps = self._layout.get_item_file_stamps()
+
+        if self._listing is None:
+            self._listing = ItemListing()
+            self._item_stamps = {}
+            self._seeded_ids = set()
+            self._seed(current_item_stamps)
+
+        for item_id in [item_id for item_id in self._item_stamps if item_id not in current_item_stamps]:
+            self._listing.remove(item_id)
+            self._seeded_ids.discard(item_id)
+            del self._item_stamps[item_id]
+
+        for item_id, item_stamp in current_item_stamps.items():
+            if self._item_stamps.get(item_id) == item_stamp:
+                continue
+
+            self._add(item_id)
+            self._item_stamps[item_id] = item_stamp
+
+        self._stamp = stamp
+
+    # Rows written by 1Password carry updatedAt, along with the title, type and folder. A row is trusted when
+    # contents.js was written after its item file, as 1Password does, the item file is read otherwise.
+    def _seed(self, item_stamps):
+        contents_stamp = self._get_contents_stamp()
+
+        if contents_stamp is None:
+            return
+
+        for row in self._load_contents_rows():
+            item_stamp = item_stamps.get(row[0])
+
+            if len(row) <= 7 or not _is_number(row[4]) or row[1] == 'system.Tombstone' or item_stamp is None or \
+                    item_stamp[0] > contents_stamp[0]:
+                continue
+
+            self._listing.add({
+                'uuid': row[0],
+                'typeName': row[1],
+                'title': row[2],
+                'updatedAt': row[4],
+                'createdAt': None,
+                'folderUuid': row[5]
+            })
+            self._item_stamps[row[0]] = item_stamp
+            self._seeded_ids.add(row[0])
+
+    # contents.js has no createdAt, items listed from it are read the first time they are ordered by it
+    def _read_seeded_items(self):
+        for item_id in list(self._seeded_ids):
+            self._add(item_id)
+
+    def _add(self, item_id):
+        item = self._get_item(item_id)
+
+        if item is None:
+            self._listing.remove(item_id)
+        else:
+            self._listing.add(item)
+
+        self._seeded_ids.discard(item_id)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
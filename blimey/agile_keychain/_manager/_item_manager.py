@@ -1,80 +1,404 @@
 import os
-import json
-import glob
 import time
+from threading import Lock
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
-from blimey.agile_keychain.agile_keychain_item import EncryptedAgileKeychainItem
+from blimey.agile_keychain import _json_codec as json_codec
+from blimey.agile_keychain._config import read_option
+from blimey.agile_keychain.agile_keychain_item import EncryptedAgileKeychainItem, is_deleted
+from blimey.agile_keychain._manager._item_cache import ItemCache
+from blimey.agile_keychain._manager._file_stamp import get_stamp, get_file_stamp
+from blimey.agile_keychain._manager._file_writer import FileWriter
+from blimey.agile_keychain._manager._change_feed import ChangeFeed
+from blimey.agile_keychain._manager._item_layout import create_layout
+from blimey.agile_keychain._manager._item_listing_manager import ItemListingManager
+from blimey.agile_keychain._manager._vacuum import Vacuum
+from blimey.agile_keychain._manager._change_watcher import ChangeWatcher
+from blimey.agile_keychain._search_index import SearchIndex
 from blimey.exceptions import ItemNotFoundException
 
 
 class ItemManager:
-    def __init__(self, path):
+    def __init__(self, path, config=None):
         self._base_path = path
+        self._config = config
+        self._contents = None
+        self._contents_stamp = None
+        self._contents_lock = Lock()
+        self._deleted_item_ids = set()
+        self._item_ids = None
+        self._item_ids_lock = Lock()
+        self._search_index = None
+        self._search_index_stamp = None
+        self._search_index_lock = Lock()
+        self._item_cache = self._create_item_cache()
+        self._file_writer = FileWriter(read_option(config, 'durability'), read_option(config, 'group_commit_window'))
+        self._layout = create_layout(path, read_option(config, 'layout'))
+        self._change_feed = ChangeFeed(path, self._layout)
+        self._vacuum = Vacuum(path, self._layout)
+        self._item_listing_manager = ItemListingManager(self._layout, self._get_item_if_present,
+                                                        self._load_contents_rows, self._get_contents_file_stamp)
 
     def get_by_id(self, item_id):
-        item_path = os.path.join(self._base_path, "data", "default", item_id + ".1password")
+        if self._item_cache is None:
+            data = self._read_item_file(item_id)
+        else:
+            data = self._read_item_file_through_cache(item_id)
 
+        item = EncryptedAgileKeychainItem(data)
+
+        if is_deleted(item):
+            raise ItemNotFoundException
+
+        return item
+
+    # Changes whenever an item file is added, removed or replaced, see the layouts
+    def get_item_files_stamp(self):
+        return self._layout.get_item_files_stamp()
+
+    # Stamps of every item file, tombstones included, from one pass over the item folders
+    def get_item_file_stamps(self):
+        return self._layout.get_item_file_stamps()
+
+    # Items added, changed and removed since the previous call, by anyone including this manager. Cached items
+    # and what is known about deleted items are dropped for those, so they are read again on next use.
+    def get_changes(self):
+        changes = self._change_feed.get_changes()
+
+        for item_id in changes['added']:
+            self._add_item_id(item_id)
+
+        for item_id in changes['added'] + changes['changed'] + changes['removed']:
+            self._deleted_item_ids.discard(item_id)
+
+            if self._item_cache is not None:
+                self._item_cache.discard(item_id)
+
+        return changes
+
+    # Blocks until get_changes has something to report, see ChangeWatcher. Watching starts from the changes
+    # already reported, or from now when get_changes was never called.
+    def watch_changes(self):
+        self._change_feed.start()
+
+        return ChangeWatcher(self.get_changes, self._layout.get_item_folder_paths,
+                             read_option(self._config, 'change_poll_interval'))
+
+    def get_cache_statistics(self):
+        if self._item_cache is None:
+            return None
+
+        return self._item_cache.get_statistics()
+
+    def get_all_items(self):
+        return list(self.iter_items())
+
+    def iter_items(self):
+        item_ids = self._get_item_ids()
+        read_ahead_workers = read_option(self._config, 'read_ahead_workers')
+
+        if read_ahead_workers is None:
+            items = (self._get_item_if_present(item_id) for item_id in item_ids)
+        else:
+            items = self._read_ahead(item_ids, read_ahead_workers)
+
+        return (item for item in items if item is not None)
+
+    # Searches the unencrypted fields of the items, see SearchIndex for how queries match
+    def search(self, query, fields=None, folder=None):
+        stamp = self._get_search_index_stamp()
+
+        with self._search_index_lock:
+            if self._search_index is not None and self._search_index_stamp == stamp:
+                return self._search_index.search(query, fields, folder)
+
+        # The index is built from the summaries and rebuilt whenever someone else changed contents.js or added or
+        # removed item files, edits to item files are only seen through their contents.js row like in the summaries
+        index = SearchIndex(self.get_summaries())
+
+        with self._search_index_lock:
+            self._search_index = index
+            self._search_index_stamp = stamp
+
+            return index.search(query, fields, folder)
+
+    # Ids of a page of items ordered by one of their open fields, see ItemListing and ItemListingManager
+    def list_item_ids(self, order_by='updatedAt', offset=0, limit=None, folder=None, type_name=None, reverse=False):
+        return self._item_listing_manager.list_item_ids(order_by, offset, limit, folder, type_name, reverse)
+
+    # Lists the open fields of every item from contents.js, without opening or decrypting the item files
+    def get_summaries(self):
+        rows = self._load_contents_rows()
+        summaries = OrderedDict((row[0], self._decode_contents_row(row)) for row in rows
+                                if row[1] != 'system.Tombstone')
+        item_ids = set(self._get_item_ids())
+
+        # contents.js may be stale, items it does not know about yet are summarised from their item file
+        for item_id in item_ids.difference(summaries, self._deleted_item_ids):
+            item = self._get_item_if_present(item_id)
+
+            if item is None:
+                self._deleted_item_ids.add(item_id)
+            else:
+                summaries[item_id] = self._summarise_item(item)
+
+        return [summary for item_id, summary in summaries.items() if item_id in item_ids]
+
+    # Claims an id for a new item, unless an item file, tombstones included, or an earlier claim already uses it
+    def reserve_item_id(self, item_id):
+        with self._item_ids_lock:
+            if self._item_ids is None:
+                self._item_ids = set(self._get_item_ids())
+
+            if item_id in self._item_ids:
+                return False
+
+            self._item_ids.add(item_id)
+
+            return True
+
+    def _get_item_ids(self):
+        return self._layout.get_item_ids()
+
+    def _read_item_file(self, item_id):
         try:
-            with open(item_path, 'r') as file:
-                data = json.load(file)
+            with open(self._get_item_file_path(item_id), 'rb') as file:
+                return json_codec.loads(file.read())
         except FileNotFoundError:
             raise ItemNotFoundException
 
-        item = EncryptedAgileKeychainItem(data)
+    # A stat is enough to validate a cached item, the file is only opened when it changed
+    def _read_item_file_through_cache(self, item_id):
+        item_path = self._get_item_file_path(item_id)
 
-        if self._is_deleted(item):
+        try:
+            data = self._item_cache.get(item_id, get_stamp(os.stat(item_path)))
+
+            if data is not None:
+                return data
+
+            with open(item_path, 'rb') as file:
+                stamp = get_stamp(os.fstat(file.fileno()))
+                file_contents = file.read()
+        except FileNotFoundError:
+            self._item_cache.discard(item_id)
             raise ItemNotFoundException
 
-        return item
+        data = json_codec.loads(file_contents)
+        self._item_cache.put(item_id, stamp, data, len(file_contents))
 
-    def get_all_items(self):
-        item_paths = glob.glob(os.path.join(self._base_path, "data", "default", "*.1password"))
+        return data
+
+    def _get_item_file_path(self, item_id):
+        return self._layout.get_item_file_path(item_id)
+
+    def _get_item_if_present(self, item_id):
+        try:
+            return self.get_by_id(item_id)
+        except ItemNotFoundException:
+            return None
+
+    def _read_ahead(self, item_ids, workers):
+        # Keeps a bounded window of reads in flight and hands the results back in the order they were requested
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
 
-        items = []
-        for item_path in item_paths:
-            basename = os.path.basename(item_path)
-            item_id, _ = os.path.splitext(basename)
+            for item_id in item_ids:
+                pending.append(executor.submit(self._get_item_if_present, item_id))
 
-            try:
-                items.append(self.get_by_id(item_id))
-            except ItemNotFoundException:
-                continue
+                if len(pending) > workers * 2:
+                    yield pending.popleft().result()
 
-        return items
+            while len(pending) > 0:
+                yield pending.popleft().result()
 
     def save_item(self, item):
-        item['updatedAt'] = int(time.time())
+        self.save_items([item])
 
-        with open(os.path.join(self._base_path, "data", "default", "{0}.1password".format(item['uuid'])), "w") as file:
-            json.dump(item, file)
+    # Writes every item file first and updates contents.js once for the whole batch
+    def save_items(self, items):
+        items = list(items)
+        updated_at = int(time.time())
+        is_indexed = self._item_listing_manager.is_built() or self._search_index is not None
+        item_files_stamp = self.get_item_files_stamp() if is_indexed else None
 
-        self._update_contents_file()
+        for item in items:
+            item['updatedAt'] = updated_at
+            self._write_item_file(item)
+            self._add_item_id(item['uuid'])
 
-    def _update_contents_file(self):
-        item_paths = glob.glob(os.path.join(self._base_path, "data", "default", "*.1password"))
+            if is_deleted(item):
+                self._deleted_item_ids.add(item['uuid'])
+            else:
+                self._deleted_item_ids.discard(item['uuid'])
 
-        contents = []
-        for item_path in item_paths:
-            basename = os.path.basename(item_path)
-            item_id, _ = os.path.splitext(basename)
-            item = self.get_by_id(item_id)
+        self._update_contents_file(items, item_files_stamp)
 
-            contents.append([
-                item['uuid'],
-                item['typeName'],
-                item['title'],
-                item['locationKey'],
-                item['folderUuid'],
-                0,
-                'Y' if item['trashed'] is True else 'N'
-            ])
+        if item_files_stamp is not None:
+            self._item_listing_manager.update(items, item_files_stamp)
 
-        with open(os.path.join(self._base_path, "data", "default", "contents.js"), "w") as file:
-            json.dump(contents, file)
+    # Forces writes still waiting for their group commit to disk
+    def flush(self):
+        self._file_writer.flush()
 
-    def _is_deleted(self, item):
-        if item['uuid'] is None:
-            return True
+    # See Vacuum, the rows of the removed items are then dropped from contents.js in a single rewrite
+    def vacuum(self, retention=None, archive_path=None):
+        item_files_stamp = self.get_item_files_stamp()
+        report = self._vacuum.run(retention, archive_path)
+        self._forget_items(report['removed_item_ids'], item_files_stamp)
 
-        if item['typeName'] == 'system.Tombstone':
-            return True
+        return report
+
+    # Repairs contents.js by rebuilding it from the item files
+    def rebuild_contents_file(self):
+        with self._contents_lock:
+            self._contents = OrderedDict((item['uuid'], self._encode_contents_row(item)) for item in self.iter_items())
+            self._write_contents_file()
+
+    # Only an index that was up to date before this save can be brought up to date incrementally. Saves change the
+    # stamp of the item files whether or not contents.js changed, so the index is always stamped anew.
+    def _update_search_index(self, items, previous_stamp):
+        with self._search_index_lock:
+            if self._search_index is None or self._search_index_stamp != previous_stamp:
+                return
+
+            for item in items:
+                if is_deleted(item):
+                    self._search_index.remove(item['uuid'])
+                else:
+                    self._search_index.add(self._summarise_item(item))
+
+            self._search_index_stamp = self._get_search_index_stamp()
+
+    def _get_search_index_stamp(self):
+        return self._get_contents_file_stamp(), self.get_item_files_stamp()
+
+    # contents.js is written once for all vacuumed items, which only leaves caches to be brought up to date
+    def _forget_items(self, item_ids, previous_item_files_stamp):
+        with self._contents_lock:
+            contents = self._load_contents()
+            previous_stamp = self._contents_stamp, previous_item_files_stamp
+            removed_rows = [contents.pop(item_id) for item_id in item_ids if item_id in contents]
+
+            if len(removed_rows) > 0:
+                self._write_contents_file()
+
+            # Tombstones are never in the search index, so it stays as it is
+            self._update_search_index([], previous_stamp)
+
+        for item_id in item_ids:
+            self._deleted_item_ids.discard(item_id)
+
+            if self._item_cache is not None:
+                self._item_cache.discard(item_id)
+
+    def _add_item_id(self, item_id):
+        with self._item_ids_lock:
+            if self._item_ids is not None:
+                self._item_ids.add(item_id)
+
+    def _write_item_file(self, item):
+        self._file_writer.write(self._layout.get_item_file_path_for_writing(item['uuid']), json_codec.dumps(item))
+
+        if self._item_cache is not None:
+            self._item_cache.discard(item['uuid'])
+
+    def _update_contents_file(self, items, previous_item_files_stamp):
+        with self._contents_lock:
+            contents = self._load_contents()
+            previous_stamp = self._contents_stamp, previous_item_files_stamp
+            changed_items = []
+
+            for item in items:
+                row = None if is_deleted(item) else self._encode_contents_row(item)
+
+                # Most saves only touch encrypted fields, which leaves the row as it is
+                if contents.get(item['uuid']) == row:
+                    continue
+
+                if row is None:
+                    del contents[item['uuid']]
+                else:
+                    contents[item['uuid']] = row
+
+                changed_items.append(item)
+
+            if len(changed_items) > 0:
+                self._write_contents_file()
+
+            self._update_search_index(changed_items, previous_stamp)
+
+    def _load_contents_rows(self):
+        with self._contents_lock:
+            return json_codec.loads(b'[' + b','.join(self._load_contents().values()) + b']')
+
+    def _load_contents(self):
+        # Reloaded only when the file was changed by someone else since it was last read or written
+        if self._contents is not None and self._contents_stamp == self._get_contents_file_stamp():
+            return self._contents
+
+        try:
+            with open(self._get_contents_file_path(), "rb") as file:
+                rows = json_codec.loads(file.read())
+        except (FileNotFoundError, ValueError):
+            rows = []
+
+        # Rows are kept encoded, so writing the file back only has to join them
+        self._contents = OrderedDict((row[0], json_codec.dumps(row)) for row in rows)
+        self._contents_stamp = self._get_contents_file_stamp()
+
+        return self._contents
+
+    def _write_contents_file(self):
+        self._file_writer.write(self._get_contents_file_path(), b'[' + b','.join(self._contents.values()) + b']')
+
+        self._contents_stamp = self._get_contents_file_stamp()
+
+    def _get_contents_file_stamp(self):
+        return get_file_stamp(self._get_contents_file_path())
+
+    def _get_contents_file_path(self):
+        return os.path.join(self._base_path, "data", "default", "contents.js")
+
+    def _encode_contents_row(self, item):
+        return json_codec.dumps([
+            item['uuid'],
+            item['typeName'],
+            item['title'],
+            item['locationKey'],
+            item['folderUuid'],
+            0,
+            'Y' if item['trashed'] is True else 'N'
+        ])
+
+    # Rows written by 1Password have an additional column after the location key
+    def _decode_contents_row(self, row):
+        return {
+            'uuid': row[0],
+            'typeName': row[1],
+            'title': row[2],
+            'locationKey': row[3],
+            'folderUuid': row[5] if len(row) > 7 else row[4],
+            'trashed': row[-1] == 'Y'
+        }
+
+    def _summarise_item(self, item):
+        return {
+            'uuid': item['uuid'],
+            'typeName': item['typeName'],
+            'title': item['title'],
+            'locationKey': item['locationKey'],
+            'folderUuid': item['folderUuid'],
+            'trashed': item['trashed'] is True
+        }
+
+    # The cache is opt-in, enabled by bounding its number of entries, its size in bytes, or both
+    def _create_item_cache(self):
+        max_entries = read_option(self._config, 'item_cache_entries')
+        max_bytes = read_option(self._config, 'item_cache_bytes')
+
+        if max_entries is None and max_bytes is None:
+            return None
+
+        return ItemCache(max_entries, max_bytes)
@@ -6,6 +6,8 @@ from base64 import b64encode
 from xml.parsers.expat import ExpatError
 
 from blimey.agile_keychain._key import EncryptedKey
+from blimey.agile_keychain._config import read_option
+from blimey.agile_keychain._manager._file_writer import FileWriter
 from blimey.exceptions import KeyAlreadyExistsForLevelException, InvalidKeyFileException
 
 DEFAULT_ITERATIONS = 25000
@@ -25,9 +27,11 @@ else:
 
 
 class KeyManager:
-    def __init__(self, path):
+    def __init__(self, path, config=None):
         self._base_path = path
         self._keys_file_path = os.path.join(self._base_path, 'data', 'default', '1password.keys')
+        self._file_writer = FileWriter(read_option(config, 'durability'),
+                                       read_option(config, 'group_commit_window'))
 
     def get_keys(self):
         return self._read_keys_from_keys_plist()
@@ -90,8 +94,10 @@ class KeyManager:
         template = self._load_template()
         keys = [self._serialize_key(key) for key in keys]
 
-        with open(self._keys_file_path, 'w') as file:
-            file.write(template.render({'keys': keys}))
+        self._file_writer.write(self._keys_file_path, template.render({'keys': keys}))
+
+    def flush(self):
+        self._file_writer.flush()
 
     def _load_template(self):
         template_path = self._get_key_plist_template_path()
@@ -0,0 +1,110 @@
+import os
+import time
+import shutil
+
+from blimey.agile_keychain import _json_codec as json_codec
+from blimey.agile_keychain.agile_keychain_item import EncryptedAgileKeychainItem, is_deleted
+from blimey.agile_keychain._manager._file_stamp import get_stamp
+from blimey.agile_keychain._manager._file_writer import TEMPORARY_FILE_EXTENSION
+from blimey.agile_keychain._manager._item_layout import VACUUMED_FILE_EXTENSION
+
+# Tombstones tell sync clients an item was deleted, they are only vacuumed once every client had time to see them
+DEFAULT_TOMBSTONE_RETENTION = 90 * 24 * 60 * 60
+
+# Far longer than any write takes, younger temporary files may still be in use
+TEMPORARY_FILE_RETENTION = 60 * 60
+
+
+# Removes tombstones, and item files without a uuid, last updated more than retention seconds ago, along with
+# temporary files left behind by interrupted writes. With archive_path they are moved there instead. Safe on a
+# keychain in use, a file written again while it is being vacuumed is kept. Only files are touched, contents.js
+# and the caches are left to the item manager.
+class Vacuum:
+    def __init__(self, path, layout):
+        self._base_path = path
+        self._layout = layout
+
+    def run(self, retention=None, archive_path=None):
+        retention = DEFAULT_TOMBSTONE_RETENTION if retention is None else retention
+        removed_item_ids = []
+        reclaimed_bytes = 0
+
+        for item_id in sorted(self._layout.get_item_file_stamps()):
+            item_path = self._layout.get_item_file_path(item_id)
+
+            try:
+                with open(item_path, 'rb') as file:
+                    stamp = get_stamp(os.fstat(file.fileno()))
+                    item = EncryptedAgileKeychainItem(json_codec.loads(file.read()))
+            except (FileNotFoundError, ValueError):
+                continue
+
+            if not is_deleted(item) or self._get_age(item, stamp) <= retention:
+                continue
+
+            if self._remove_file(item_path, stamp, archive_path):
+                removed_item_ids.append(item_id)
+                reclaimed_bytes += stamp[1]
+
+        removed_temporary_files = 0
+
+        for path, stamp in self._get_temporary_files():
+            if time.time() - stamp[0] / 1e9 > TEMPORARY_FILE_RETENTION and self._remove_file(path, stamp, None):
+                removed_temporary_files += 1
+                reclaimed_bytes += stamp[1]
+
+        return {
+            'removed_item_ids': removed_item_ids,
+            'removed_temporary_files': removed_temporary_files,
+            'reclaimed_bytes': reclaimed_bytes
+        }
+
+    # Aged by updatedAt, which save_items sets on every item, tombstones included. When it is missing or not a
+    # number, as in files emptied by 1Password, the file's modification time is used instead.
+    def _get_age(self, item, stamp):
+        updated_at = item['updatedAt']
+
+        if not isinstance(updated_at, (int, float)):
+            updated_at = stamp[0] / 1e9
+
+        return time.time() - updated_at
+
+    # The file is renamed out of the way before anything else, so no one can write it again while it is removed.
+    # If it was replaced since it was read, the new file goes back, unless its name was taken again meanwhile.
+    def _remove_file(self, path, stamp, archive_path):
+        vacuumed_path = '{0}.{1}{2}'.format(path, os.urandom(4).hex(), VACUUMED_FILE_EXTENSION)
+
+        try:
+            os.rename(path, vacuumed_path)
+        except FileNotFoundError:
+            return False
+
+        if get_stamp(os.stat(vacuumed_path)) != stamp:
+            try:
+                os.link(vacuumed_path, path)
+            except FileExistsError:
+                pass
+
+            os.remove(vacuumed_path)
+            return False
+
+        if archive_path is None:
+            os.remove(vacuumed_path)
+        else:
+            os.makedirs(archive_path, exist_ok=True)
+            shutil.move(vacuumed_path, os.path.join(archive_path, os.path.basename(path)))
+
+        return True
+
+    # Left by writes, or vacuums, that never finished, in the keychain's folder or any folder holding items
+    def _get_temporary_files(self):
+        for folder_path in [self._base_path] + self._layout.get_item_folder_paths():
+            with os.scandir(folder_path) as entries:
+                for entry in entries:
+                    if not entry.name.endswith((TEMPORARY_FILE_EXTENSION, VACUUMED_FILE_EXTENSION)):
+                        continue
+
+                    try:
+                        yield entry.path, get_stamp(entry.stat())
+                    except FileNotFoundError:
+                        continue
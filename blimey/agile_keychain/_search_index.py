@@ -0,0 +1,168 @@
+import re
+import sys
+from array import array
+from itertools import repeat
+from base64 import b64encode, b64decode
+
+from blimey.exceptions import UnknownSearchFieldException
+
+SEARCH_FIELDS = ['title', 'locationKey', 'typeName']
+GRAM_LENGTH = 3
+
+# Short queries are matched against the start of words, which are indexed as grams padded with this character
+PADDING = '\x00'
+WORD_SEPARATOR = re.compile(r'\W+')
+
+
+# Trigram index over the unencrypted fields of item summaries. Queries of three characters or more match
+# anywhere in a field, shorter ones match the start of any word in it. Matching is case insensitive.
+class SearchIndex:
+    def __init__(self, summaries=(), fields=None):
+        self._fields = fields or SEARCH_FIELDS
+        self._summaries = {}
+        self._normalised_values = {}
+        self._document_numbers = {}
+        self._next_document_number = 0
+
+        # Postings are arrays rather than sets, they are far smaller and the garbage collector does not track them
+        self._postings = {field: {} for field in self._fields}
+
+        for summary in summaries:
+            self.add(summary)
+
+    # Plain data that can be stored as JSON, from_state turns it back into an index without re-indexing anything.
+    # Summaries all hold the same keys, so they are stored a column per key, which is much quicker to parse.
+    def get_state(self):
+        document_numbers = list(self._summaries)
+        keys = list(self._summaries[document_numbers[0]]) if len(document_numbers) > 0 else []
+
+        return {
+            'fields': self._fields,
+            'byte_order': sys.byteorder,
+            'next_document_number': self._next_document_number,
+            'document_numbers': document_numbers,
+            'summaries': {key: [self._summaries[document_number][key] for document_number in document_numbers]
+                          for key in keys},
+            'postings': {field: {gram: b64encode(document_numbers.tobytes()).decode('ascii')
+                                 for gram, document_numbers in postings.items()}
+                         for field, postings in self._postings.items()}
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        index = cls(fields=state['fields'])
+        index._next_document_number = state['next_document_number']
+        columns = state['summaries']
+        keys = list(columns)
+        summaries = map(dict, map(zip, repeat(keys), zip(*columns.values())))
+        normalised_values = zip(*([_normalise(value) for value in columns[field]] for field in index._fields))
+
+        for document_number, summary, values in zip(state['document_numbers'], summaries, normalised_values):
+            index._summaries[document_number] = summary
+            index._normalised_values[document_number] = values
+            index._document_numbers[summary['uuid']] = document_number
+
+        for field, postings in state['postings'].items():
+            for gram, encoded_document_numbers in postings.items():
+                document_numbers = array('i')
+                document_numbers.frombytes(b64decode(encoded_document_numbers))
+
+                if state['byte_order'] != sys.byteorder:
+                    document_numbers.byteswap()
+
+                index._postings[field][gram] = document_numbers
+
+        return index
+
+    def add(self, summary):
+        self.remove(summary['uuid'])
+
+        document_number = self._next_document_number
+        self._next_document_number += 1
+
+        normalised_values = tuple(_normalise(summary[field]) for field in self._fields)
+        self._summaries[document_number] = summary
+        self._normalised_values[document_number] = normalised_values
+        self._document_numbers[summary['uuid']] = document_number
+
+        for field, value in zip(self._fields, normalised_values):
+            postings = self._postings[field]
+
+            for gram in _get_indexed_grams(value):
+                try:
+                    postings[gram].append(document_number)
+                except KeyError:
+                    postings[gram] = array('i', [document_number])
+
+    def remove(self, item_id):
+        document_number = self._document_numbers.pop(item_id, None)
+
+        if document_number is None:
+            return
+
+        del self._summaries[document_number]
+        normalised_values = self._normalised_values.pop(document_number)
+
+        for field, value in zip(self._fields, normalised_values):
+            postings = self._postings[field]
+
+            for gram in _get_indexed_grams(value):
+                document_numbers = postings[gram]
+                document_numbers.remove(document_number)
+
+                if len(document_numbers) == 0:
+                    del postings[gram]
+
+    # Results come in the order the items were added to the index
+    def search(self, query, fields=None, folder=None):
+        fields = fields or self._fields
+        query = _normalise(query)
+        document_numbers = set()
+
+        for field in fields:
+            if field not in self._postings:
+                raise UnknownSearchFieldException(field)
+
+            document_numbers.update(self._search_field(query, field))
+
+        summaries = (self._summaries[document_number] for document_number in sorted(document_numbers))
+
+        return [dict(summary) for summary in summaries if folder is None or summary['folderUuid'] == folder]
+
+    def _search_field(self, query, field):
+        if len(query) == 0:
+            return self._summaries.keys()
+
+        postings = self._postings[field]
+
+        if len(query) < GRAM_LENGTH:
+            return postings.get(PADDING * (GRAM_LENGTH - len(query)) + query, ())
+
+        # Only the items holding the rarest gram of the query can match, checking those directly is cheaper
+        # than intersecting the postings of every gram
+        document_numbers = min((postings.get(gram, ()) for gram in _get_grams(query)), key=len)
+        field_index = self._fields.index(field)
+
+        return [document_number for document_number in document_numbers
+                if query in self._normalised_values[document_number][field_index]]
+
+
+def _get_grams(value):
+    return {value[index:index + GRAM_LENGTH] for index in range(len(value) - GRAM_LENGTH + 1)}
+
+
+def _get_indexed_grams(value):
+    grams = _get_grams(value)
+
+    for word in WORD_SEPARATOR.split(value):
+        for length in range(1, min(len(word), GRAM_LENGTH - 1) + 1):
+            grams.add(PADDING * (GRAM_LENGTH - length) + word[:length])
+
+    return grams
+
+
+def _normalise(value):
+    if not isinstance(value, str):
+        return ''
+
+    return value.lower()
@@ -0,0 +1,27 @@
+import os
+
+
+# Picking one of several interchangeable implementations, such as the crypto backends or the JSON codecs. Each
+# one has a name and tells whether the packages it needs are installed, candidates are listed by preference.
+def get_available_names(candidates):
+    return [candidate.name for candidate in candidates if candidate.is_available()]
+
+
+def create(candidates, name, exception_class):
+    for candidate in candidates:
+        if candidate.name == name and candidate.is_available():
+            return candidate()
+
+    raise exception_class(name)
+
+
+# An explicit name wins over the environment variable, which wins over the preferred available candidate
+def select_name(candidates, environment_variable, name=None):
+    if name is None:
+        name = os.environ.get(environment_variable)
+
+    if name is None:
+        available_names = get_available_names(candidates)
+        name = available_names[0] if len(available_names) > 0 else None
+
+    return name
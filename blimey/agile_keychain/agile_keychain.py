@@ -3,5 +3,33 @@ from blimey.agile_keychain import DataSource
 
 
 class AgileKeychain(Keychain):
-    def __init__(self, path):
-        super(AgileKeychain, self).__init__(DataSource(path))
+    def __init__(self, path, config=None):
+        super(AgileKeychain, self).__init__(DataSource(path, config))
+
+    # Hits, misses, entries and bytes of the item cache, None unless the cache is configured
+    def get_item_cache_statistics(self):
+        return self._data_source.get_item_cache_statistics()
+
+    # Forces writes still waiting for their group commit to disk, only needed with the group durability level
+    def flush(self):
+        self._data_source.flush()
+
+    # Removes tombstones older than retention seconds, 90 days by default, and temporary files left by interrupted
+    # writes, then rewrites contents.js once. Reports the removed item ids, the number of temporary files removed
+    # and the bytes reclaimed. Tombstones are moved to archive_path instead, when it is given.
+    def vacuum(self, retention=None, archive_path=None):
+        return self._data_source.vacuum(retention, archive_path)
+
+    # Rewrites contents.js from the item files, for when it went stale or corrupt. Saves only ever update the rows
+    # of the items they write, so a broken file stays broken until it is rebuilt.
+    def rebuild_contents_file(self):
+        self._data_source.rebuild_contents_file()
+
+    # Items added, changed and removed on disk since the previous call, by this process or any other, along with
+    # whether contents.js and 1password.keys changed. The first call reports every item as added.
+    def get_changes(self):
+        return self._data_source.get_changes()
+
+    # A ChangeWatcher whose wait method blocks until there are changes, using inotify on Linux
+    def watch_changes(self):
+        return self._data_source.watch_changes()
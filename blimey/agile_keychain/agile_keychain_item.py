@@ -21,3 +21,8 @@ class AgileKeychainItem(defaultdict):
 
     def __repr__(self):
         return '{0}({1})'.format(self.__class__.__name__, repr(dict(self)))
+
+
+# Tombstones record deletions for sync clients, files 1Password emptied out have no uuid left
+def is_deleted(item):
+    return item['uuid'] is None or item['typeName'] == 'system.Tombstone'
@@ -1,34 +1,63 @@
 import gc
 from time import time
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
 
 from blimey import abstract
 from blimey.exceptions import UnauthenticatedDataSourceException, ItemNotFoundException
-from blimey.agile_keychain._manager import FileSystemManager, KeyManager, ItemManager
+from blimey.agile_keychain._manager import FileSystemManager, KeyManager, ItemManager, IndexManager, \
+    ContentIndexManager
 from blimey.agile_keychain import _crypto as crypto
+from blimey.agile_keychain._config import read_option
+from blimey.agile_keychain._decryption_pool import DecryptionPool
 from blimey.agile_keychain.agile_keychain_item import AgileKeychainItem
 
 DEFAULT_ITERATIONS = 25000
+KEY_LEVELS = ['SL3', 'SL5']
+
+# Stored iteration counts below this fraction of the calibrated count are raised when the password is changed
+ITERATION_UPGRADE_THRESHOLD = 0.5
+DEFAULT_SECURITY_LEVEL = 'SL5'
+TOMBSTONE_TYPE_NAME = 'system.Tombstone'
 
 
 class DataSource(abstract.DataSource):
-    def __init__(self, path):
+    def __init__(self, path, config=None):
+        self._config = config
         self._file_system_manager = FileSystemManager(path)
-        self._key_manager = KeyManager(path)
-        self._item_manager = ItemManager(path)
+        self._key_manager = KeyManager(path, config)
+        self._item_manager = ItemManager(path, config)
         self._keys = []
+        self._pending_keys = []
+        self._pending_password = None
+        self._pending_keys_lock = Lock()
+        self._index_manager = IndexManager(path, config)
+        self._content_index_manager = ContentIndexManager(self._item_manager, self._index_manager,
+                                                          self._decrypt_items, self._get_default_key, config)
 
     def initialise(self, password, config=None):
         self._file_system_manager.initialise()
 
         iterations = self._read_iterations_from_config(config)
-        self._key_manager.save_key(crypto.create_key(password, 'SL3', iterations))
-        self._key_manager.save_key(crypto.create_key(password, 'SL5', iterations))
+        keys = self._derive_concurrently(lambda level: crypto.create_key(password, level, iterations), KEY_LEVELS)
+
+        for key in keys:
+            self._key_manager.save_key(key)
 
     def is_initialised(self):
         return self._file_system_manager.is_initialised()
 
     def authenticate(self, password):
-        self._keys = [crypto.decrypt_key(key, password) for key in self._key_manager.get_keys()]
+        encrypted_keys = self._key_manager.get_keys()
+        keys_to_derive = self._select_keys_to_derive_on_authentication(encrypted_keys)
+
+        # Keys are only replaced once every one of them has been derived, so a failure leaves no partial state
+        keys = self._derive_concurrently(lambda key: crypto.decrypt_key(key, password), keys_to_derive)
+
+        with self._pending_keys_lock:
+            self._keys = keys
+            self._pending_keys = [key for key in encrypted_keys if key not in keys_to_derive]
+            self._pending_password = password if len(self._pending_keys) > 0 else None
 
     def is_authenticated(self):
         if len(self._keys) == 0:
@@ -41,12 +70,25 @@ class DataSource(abstract.DataSource):
         return True
 
     def deauthenticate(self):
-        self._keys = []
+        # Changes to the persisted content index are saved while the keys are still around
+        self._content_index_manager.save_changes(self.is_authenticated)
+
+        with self._pending_keys_lock:
+            self._keys = []
+            self._pending_keys = []
+            self._pending_password = None
+
+        self._content_index_manager.clear()
         gc.collect()
 
-    def set_password(self, password):
-        for key in self._keys:
-            self._key_manager.save_key(crypto.encrypt_key(key, password))
+    def set_password(self, password, config=None):
+        self._derive_pending_keys()
+        target_iterations = self._read_target_iterations_from_config(config)
+        keys = self._derive_concurrently(lambda key: self._re_encrypt_key(key, password, target_iterations),
+                                         self._keys)
+
+        for key in keys:
+            self._key_manager.save_key(key)
 
     def create_item(self, data=None):
         item = self._initialise_new_item(data)
@@ -56,32 +98,152 @@ class DataSource(abstract.DataSource):
         return AgileKeychainItem(item)
 
     def save_item(self, decrypted_item):
+        self.save_items([decrypted_item])
+
+    def save_items(self, decrypted_items):
         self._assert_data_source_is_authenticated()
-        self._item_manager.save_item(self._encrypt_item(decrypted_item))
+
+        # Everything is encrypted before the first file is written, so a failing item leaves the keychain untouched
+        decrypted_items = list(decrypted_items)
+        encrypted_items = [self._encrypt_item(item) for item in decrypted_items]
+        self._save_encrypted_items(encrypted_items, decrypted_items)
+
+    # Deleted items are replaced by tombstones, the way 1Password records deletions for syncing
+    def delete_items(self, item_ids):
+        self._assert_data_source_is_authenticated()
+
+        tombstones = [self._create_tombstone(self._item_manager.get_by_id(item_id)) for item_id in item_ids]
+        self._save_encrypted_items(tombstones, [])
+
+    # Searches the decrypted contents of the items, with the exception of passwords and other concealed fields,
+    # see ContentIndexManager. Without the content_search option, every search decrypts the whole keychain.
+    def search_contents(self, query, folder=None):
+        self._assert_data_source_is_authenticated()
+
+        return self._content_index_manager.search(query, folder)
 
     def get_item_by_id(self, item_id):
         self._assert_data_source_is_authenticated()
         return self._decrypt_item(self._item_manager.get_by_id(item_id))
 
     def get_all_items(self):
+        return list(self.iter_items())
+
+    # Only the items on the page are decrypted, the page is picked from their open fields
+    def list_items(self, order_by='updatedAt', offset=0, limit=None, folder=None, type_name=None, reverse=False):
         self._assert_data_source_is_authenticated()
-        return [self._decrypt_item(item) for item in self._item_manager.get_all_items()]
+        items = []
+
+        for item_id in self._item_manager.list_item_ids(order_by, offset, limit, folder, type_name, reverse):
+            try:
+                items.append(self._decrypt_item(self._item_manager.get_by_id(item_id)))
+            except ItemNotFoundException:
+                # Deleted since the page was picked
+                continue
+
+        return items
+
+    def iter_items(self):
+        self._assert_data_source_is_authenticated()
+        items = self._item_manager.iter_items()
+
+        if read_option(self._config, 'decryption_workers') is None:
+            return (self._decrypt_item(item) for item in items)
+
+        return self._decrypt_items_in_parallel(items)
+
+    # Summaries only hold the unencrypted fields, so listing them needs no keys
+    def list_summaries(self):
+        return self._item_manager.get_summaries()
+
+    # Only unencrypted fields are searched, so no keys are needed
+    def search(self, query, fields=None, folder=None):
+        return self._item_manager.search(query, fields, folder)
+
+    def flush(self):
+        self._key_manager.flush()
+        self._item_manager.flush()
+        self._index_manager.flush()
+
+    def get_changes(self):
+        return self._item_manager.get_changes()
+
+    # Only open fields are read, so it does not take authentication
+    def vacuum(self, retention=None, archive_path=None):
+        return self._item_manager.vacuum(retention, archive_path)
+
+    # Like vacuum, contents.js only holds open fields
+    def rebuild_contents_file(self):
+        self._item_manager.rebuild_contents_file()
+
+    def watch_changes(self):
+        return self._item_manager.watch_changes()
+
+    def get_item_cache_statistics(self):
+        return self._item_manager.get_cache_statistics()
+
+    def _save_encrypted_items(self, encrypted_items, decrypted_items):
+        is_indexed = self._content_index_manager.is_built()
+        stamp = self._item_manager.get_item_files_stamp() if is_indexed else None
+        self._item_manager.save_items(encrypted_items)
+
+        self._content_index_manager.update(encrypted_items, decrypted_items, stamp)
+
+    def _decrypt_items(self, items):
+        if read_option(self._config, 'decryption_workers') is None or len(items) == 0:
+            return (self._decrypt_item(item) for item in items)
+
+        return self._decrypt_items_in_parallel(items)
+
+    def _derive_concurrently(self, derive, arguments):
+        arguments = list(arguments)
+
+        # Threads only pay off when the key derivation function releases the GIL
+        if len(arguments) < 2 or crypto.kdf_releases_gil() is False:
+            return [derive(argument) for argument in arguments]
+
+        with ThreadPoolExecutor(max_workers=len(arguments)) as executor:
+            return list(executor.map(derive, arguments))
 
     def _create_unique_item_id(self):
         item_id = crypto.generate_id()
 
-        try:
-            self._item_manager.get_by_id(item_id)
-            return self._create_unique_item_id()
-        except ItemNotFoundException:
-            return item_id
+        while self._item_manager.reserve_item_id(item_id) is False:
+            item_id = crypto.generate_id()
+
+        return item_id
 
     def _encrypt_item(self, item):
         return crypto.encrypt_item(item, self._get_key_for_item(item))
 
+    def _create_tombstone(self, item):
+        tombstone = AgileKeychainItem({
+            'uuid': item['uuid'],
+            'typeName': TOMBSTONE_TYPE_NAME,
+            'title': '',
+            'location': '',
+            'locationKey': '',
+            'createdAt': item['createdAt'],
+            'keyID': self._get_default_key().identifier,
+            'trashed': True,
+            'encrypted': {}
+        })
+
+        return self._encrypt_item(tombstone)
+
     def _decrypt_item(self, item):
         return crypto.decrypt_item(item, self._get_key_for_item(item))
 
+    def _decrypt_items_in_parallel(self, items):
+        # The workers receive their keys up front, so every lazily unlocked key has to be derived first
+        self._derive_pending_keys()
+
+        pool = DecryptionPool(read_option(self._config, 'decryption_workers'),
+                              read_option(self._config, 'decryption_chunk_size'))
+        keyed_items = ((item, self._get_key_for_item(item)) for item in items)
+
+        return (AgileKeychainItem(item) for item in pool.iter_decrypted_items(keyed_items, self._keys))
+
     def _assert_data_source_is_authenticated(self):
         if self.is_authenticated() is False:
             raise UnauthenticatedDataSourceException()
@@ -93,17 +255,82 @@ class DataSource(abstract.DataSource):
             return self._get_default_key()
 
     def _get_key_by_security_level(self, security_level):
-        return [key for key in self._keys if key.level == security_level][0]
+        keys = [key for key in self._keys if key.level == security_level]
+
+        if len(keys) == 0:
+            keys = self._derive_pending_keys(security_level)
+
+        # Locked since the caller checked, such as part way through iterating over the items
+        if len(keys) == 0:
+            raise UnauthenticatedDataSourceException()
+
+        return keys[0]
 
     def _get_default_key(self):
-        return self._get_key_by_security_level('SL5')
+        return self._get_key_by_security_level(DEFAULT_SECURITY_LEVEL)
+
+    def _select_keys_to_derive_on_authentication(self, encrypted_keys):
+        if read_option(self._config, 'lazy_unlock', False) is False:
+            return encrypted_keys
+
+        default_keys = [key for key in encrypted_keys if key.level == DEFAULT_SECURITY_LEVEL]
+
+        # Without a default key there is nothing to verify the password against, so derive everything
+        if len(default_keys) == 0:
+            return encrypted_keys
+
+        return default_keys
+
+    def _derive_pending_keys(self, security_level=None):
+        # Holding the lock for the whole derivation guarantees a pending key is only ever derived once
+        with self._pending_keys_lock:
+            keys_to_derive = [key for key in self._pending_keys
+                              if security_level is None or key.level == security_level]
+
+            keys = self._derive_concurrently(lambda key: crypto.decrypt_key(key, self._pending_password),
+                                             keys_to_derive)
+
+            self._keys = self._keys + keys
+            self._pending_keys = [key for key in self._pending_keys if key not in keys_to_derive]
+
+            if len(self._pending_keys) == 0:
+                self._pending_password = None
+
+            return [key for key in self._keys if security_level is None or key.level == security_level]
 
     def _read_iterations_from_config(self, config):
         try:
             return config['iterations']
+        except (KeyError, TypeError):
+            pass
+
+        try:
+            target_unlock_time = config['target_unlock_time']
         except (KeyError, TypeError):
             return DEFAULT_ITERATIONS
 
+        return self._calibrate_iterations(target_unlock_time)
+
+    def _read_target_iterations_from_config(self, config):
+        if config is None or ('iterations' not in config and 'target_unlock_time' not in config):
+            return None
+
+        return self._read_iterations_from_config(config)
+
+    def _calibrate_iterations(self, target_unlock_time):
+        # Unlocking derives every key, one after another unless the derivations can run concurrently
+        if crypto.kdf_releases_gil() is False:
+            target_unlock_time = target_unlock_time / len(KEY_LEVELS)
+
+        return crypto.calibrate_iterations(target_unlock_time)
+
+    # Iterations are only ever raised, and only when the stored count is far below the target
+    def _re_encrypt_key(self, key, password, target_iterations):
+        if target_iterations is None or key.iterations >= target_iterations * ITERATION_UPGRADE_THRESHOLD:
+            return crypto.encrypt_key(key, password)
+
+        return crypto.encrypt_key(key, password, target_iterations)
+
     def _initialise_new_item(self, data=None):
         if type(data) is not dict:
             data = {}
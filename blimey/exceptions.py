@@ -32,3 +32,35 @@ class UnauthenticatedDataSourceException(Exception):
 
 class ItemNotFoundException(Exception):
     pass
+
+
+class UnavailableCryptoBackendException(Exception):
+    pass
+
+
+class UnavailableJsonCodecException(Exception):
+    pass
+
+
+class UnknownDurabilityException(Exception):
+    pass
+
+
+class UnknownSearchFieldException(Exception):
+    pass
+
+
+class InvalidEncryptedDataException(Exception):
+    pass
+
+
+class UnknownLayoutException(Exception):
+    pass
+
+
+class MismatchedLayoutException(Exception):
+    pass
+
+
+class UnknownListingOrderException(Exception):
+    pass
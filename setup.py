@@ -16,11 +16,17 @@ setup(
         'Topic :: Security',
         'Topic :: Security :: Cryptography',
         'License :: OSI Approved :: MIT License',
-        'Programming Language :: Python :: 3.3',
-        'Programming Language :: Python :: 3.4'
+        'Programming Language :: Python :: 3',
+        'Programming Language :: Python :: 3 :: Only',
+        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11'
     ],
+    python_requires='>=3.7',
     keywords='password management 1password agilekeychain',
-    packages=find_packages(exclude=['specs*']),
+    packages=find_packages(exclude=['specs*', 'benchmarks*']),
     package_data={
         'blimey': ['agile_keychain/template/*.template']
     },
@@ -28,5 +34,9 @@ setup(
         'pbkdf2',
         'pycrypto',
         'jinja2'
-    ]
+    ],
+    extras_require={
+        'cryptography': ['cryptography'],
+        'orjson': ['orjson']
+    }
 )
@@ -0,0 +1,92 @@
+import os
+from unittest.mock import patch
+from nose.tools import raises
+
+from blimey.agile_keychain import _crypto as crypto
+from blimey.agile_keychain import _crypto_backend as crypto_backend
+from blimey.agile_keychain._crypto_backend import PyCryptoBackend
+from blimey.agile_keychain.agile_keychain_item import AgileKeychainItem
+from blimey.exceptions import UnavailableCryptoBackendException
+
+
+class CryptoBackendSpec:
+    def it_selects_the_fastest_available_backend_by_default(self):
+        with patch.dict(os.environ, clear=True):
+            backend = crypto_backend.set_backend()
+
+        assert backend.name == crypto_backend.get_available_backend_names()[0]
+
+    def it_can_be_forced_to_a_backend(self):
+        backend = crypto_backend.set_backend('pycrypto')
+
+        assert crypto_backend.get_backend() is backend
+        assert backend.name == 'pycrypto'
+
+        crypto_backend.set_backend()
+
+    def it_can_be_forced_to_a_backend_through_the_environment(self):
+        with patch.dict(os.environ, {crypto_backend.BACKEND_ENVIRONMENT_VARIABLE: 'hashlib'}):
+            backend = crypto_backend.set_backend()
+
+        assert backend.name == 'hashlib'
+
+        crypto_backend.set_backend()
+
+    @raises(UnavailableCryptoBackendException)
+    def it_throws_on_unknown_backends(self):
+        crypto_backend.set_backend('rot13')
+
+    def it_derives_identical_password_keys_with_every_backend(self):
+        expected = PyCryptoBackend().pbkdf2('masterpassword123', b'saltsalt', 1000)
+
+        for backend in self._get_backends():
+            assert backend.pbkdf2('masterpassword123', b'saltsalt', 1000) == expected
+            assert backend.pbkdf2('pässwörd', b'saltsalt', 10) == PyCryptoBackend().pbkdf2('pässwörd', b'saltsalt', 10)
+
+    def it_hashes_identically_with_every_backend(self):
+        expected = PyCryptoBackend().md5(b'some data').digest()
+
+        for backend in self._get_backends():
+            assert backend.md5(b'some data').digest() == expected
+
+    def it_encrypts_and_decrypts_identically_with_every_backend(self):
+        key, init_vector, data = b'k' * 16, b'i' * 16, b'd' * 64
+        expected = PyCryptoBackend().aes_encrypt(key, init_vector, data)
+
+        for backend in self._get_backends():
+            assert backend.aes_encrypt(key, init_vector, data) == expected
+            assert backend.aes_decrypt(key, init_vector, expected) == data
+
+    def it_creates_byte_identical_keys_and_items_with_every_backend(self):
+        expected_key, expected_item = self._create_key_and_item(PyCryptoBackend())
+
+        for backend in self._get_backends():
+            encrypted_key, encrypted_item = self._create_key_and_item(backend)
+
+            assert encrypted_key.data == expected_key.data
+            assert encrypted_key.validation == expected_key.validation
+            assert encrypted_item['encrypted'] == expected_item['encrypted']
+
+    def it_decrypts_existing_keys_with_every_backend(self):
+        expected_key, _ = self._create_key_and_item(PyCryptoBackend())
+
+        for backend in self._get_backends():
+            with patch('blimey.agile_keychain._crypto.get_backend', return_value=backend):
+                decrypted_key = crypto.decrypt_key(expected_key, 'password')
+
+            assert len(decrypted_key.key) == 1024
+
+    def _create_key_and_item(self, backend):
+        random_bytes = [bytes([index]) * 1024 for index in range(1, 6)]
+
+        with patch('blimey.agile_keychain._crypto.get_backend', return_value=backend), \
+                patch('blimey.agile_keychain._crypto.os.urandom', side_effect=lambda n: random_bytes.pop(0)[:n]):
+            encrypted_key = crypto.create_key('password', 'SL5', 100)
+            decrypted_key = crypto.decrypt_key(encrypted_key, 'password')
+            item = AgileKeychainItem({'uuid': 'abc', 'encrypted': {'password': 'secret', 'ball': '⚽'}})
+            encrypted_item = crypto.encrypt_item(item, decrypted_key)
+
+        return encrypted_key, encrypted_item
+
+    def _get_backends(self):
+        return [crypto_backend.create_backend(name) for name in crypto_backend.get_available_backend_names()]
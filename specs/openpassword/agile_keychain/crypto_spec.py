@@ -1,9 +1,11 @@
+import pickle
+from unittest.mock import patch
 from nose.tools import raises
 
 from blimey.agile_keychain import _crypto as crypto
 from blimey.agile_keychain._key import EncryptedKey, DecryptedKey
 from blimey.agile_keychain.agile_keychain_item import EncryptedAgileKeychainItem, AgileKeychainItem
-from blimey.exceptions import IncorrectPasswordException
+from blimey.exceptions import IncorrectPasswordException, InvalidEncryptedDataException
 
 
 class CryptoSpec:
@@ -29,6 +31,20 @@ class CryptoSpec:
         assert encrypted_key.level == 'SL4'
         assert encrypted_key.iterations == 10
 
+    @patch("blimey.agile_keychain._crypto._measure_seconds_per_iteration")
+    def it_calibrates_iterations_to_a_target_time(self, measure_seconds_per_iteration):
+        measure_seconds_per_iteration.return_value = 0.00001
+
+        assert crypto.calibrate_iterations(0.25) == 25000
+        assert crypto.calibrate_iterations(0.2555) == 25000
+        assert crypto.calibrate_iterations(0.001) == crypto.MINIMUM_ITERATIONS
+
+    def it_measures_the_active_backend_when_calibrating(self):
+        iterations = crypto.calibrate_iterations(0.01)
+
+        assert iterations >= crypto.MINIMUM_ITERATIONS
+        assert iterations % crypto.MINIMUM_ITERATIONS == 0
+
     def it_decrypts_items(self):
         encrypted_key = self.get_key()
         decrypted_key = crypto.decrypt_key(encrypted_key, 'masterpassword123')
@@ -50,8 +66,47 @@ class CryptoSpec:
         assert redecrypted_item['encrypted']['fields'][0]['value'] == 'foo'
         assert redecrypted_item['encrypted']['fields'][1]['value'] == 'bar'
 
+    def it_derives_item_keys_identically_to_the_openssl_key_derivation(self):
+        key = bytes(range(256)) * 4
+        decrypted_key = DecryptedKey({'identifier': 'abc', 'level': 'SL5', 'iterations': 10, 'key': key})
+
+        assert crypto._derive_item_key(decrypted_key, b'saltsalt') == crypto._derive_openssl_key(key, b'saltsalt')
+        assert crypto._derive_item_key(decrypted_key, b'tlastlas') == crypto._derive_openssl_key(key, b'tlastlas')
+
+    def it_pickles_decrypted_keys_without_their_hash_context(self):
+        decrypted_key = DecryptedKey({'identifier': 'abc', 'level': 'SL5', 'iterations': 10, 'key': b'k' * 1024})
+        crypto._derive_item_key(decrypted_key, b'saltsalt')
+
+        unpickled_key = pickle.loads(pickle.dumps(decrypted_key))
+
+        assert unpickled_key.key == decrypted_key.key
+        assert unpickled_key.hash_context is None
+
+    def it_encrypts_data_for_a_purpose(self):
+        decrypted_key = DecryptedKey({'identifier': 'abc', 'level': 'SL5', 'iterations': 10, 'key': b'k' * 1024})
+
+        for data in [b'', b'a', b'x' * 16, b'some data' * 100]:
+            encrypted_data = crypto.encrypt_data(data, decrypted_key, 'index')
+
+            assert crypto.decrypt_data(encrypted_data, decrypted_key, 'index') == data
+
+    @raises(InvalidEncryptedDataException)
+    def it_throws_when_decrypting_data_for_another_purpose(self):
+        decrypted_key = DecryptedKey({'identifier': 'abc', 'level': 'SL5', 'iterations': 10, 'key': b'k' * 1024})
+
+        crypto.decrypt_data(crypto.encrypt_data(b'some data', decrypted_key, 'index'), decrypted_key, 'other')
+
+    @raises(InvalidEncryptedDataException)
+    def it_throws_when_decrypting_tampered_data(self):
+        decrypted_key = DecryptedKey({'identifier': 'abc', 'level': 'SL5', 'iterations': 10, 'key': b'k' * 1024})
+        data = bytearray(crypto.encrypt_data(b'some data', decrypted_key, 'index'))
+        data[20] ^= 1
+
+        crypto.decrypt_data(bytes(data), decrypted_key, 'index')
+
     def it_byte_pads_to_specified_length(self):
         assert crypto.byte_pad(b'', 6) == b''
+        assert crypto.byte_pad(b'a', 16) == b'a' + b'\x0f' * 15
         assert crypto.byte_pad(b'abcd', 6) == b'abcd\x02\x02'
         assert crypto.byte_pad(b'abcdef', 6) == b'abcdef'
 
@@ -1,3 +1,4 @@
+from threading import Barrier, Thread
 from unittest.mock import patch, Mock, MagicMock, call
 from nose.tools import raises
 
@@ -19,8 +20,8 @@ class DataSourceSpec:
         DataSource('some_path')
 
         file_system_manager.assert_called_once_with('some_path')
-        key_manager.assert_called_once_with('some_path')
-        item_manager.assert_called_once_with('some_path')
+        key_manager.assert_called_once_with('some_path', None)
+        item_manager.assert_called_once_with('some_path', None)
 
     @patch.object(KeyManager, 'save_key')
     @patch.object(FileSystemManager, 'initialise')
@@ -42,6 +43,23 @@ class DataSourceSpec:
         assert second_key.level == 'SL5'
         assert first_key.iterations == 2
 
+    @patch("blimey.agile_keychain.data_source.crypto.calibrate_iterations")
+    @patch("blimey.agile_keychain.data_source.crypto.kdf_releases_gil")
+    @patch.object(KeyManager, 'save_key')
+    @patch.object(FileSystemManager, 'initialise')
+    def it_calibrates_iterations_to_a_target_unlock_time(self, initialise_file_system, save_key, kdf_releases_gil,
+                                                         calibrate_iterations):
+        kdf_releases_gil.return_value = False
+        calibrate_iterations.return_value = 3
+
+        data_source = DataSource('some_path')
+        data_source.initialise('password', {'target_unlock_time': 0.25})
+
+        # Without concurrent derivation both keys have to fit in the target time
+        calibrate_iterations.assert_called_once_with(0.125)
+        assert save_key.call_args_list[0][0][0].iterations == 3
+        assert save_key.call_args_list[1][0][0].iterations == 3
+
     @patch.object(FileSystemManager, 'is_initialised')
     def it_delegates_initialisation_check_to_file_system_manager(self, is_initialised):
         data_source = DataSource('some_path')
@@ -59,9 +77,43 @@ class DataSourceSpec:
         data_source = DataSource('some_path')
         data_source.authenticate('password')
 
-        decrypt_key.assert_has_calls([call(key3, 'password'), call(key5, 'password')])
+        decrypt_key.assert_has_calls([call(key3, 'password'), call(key5, 'password')], any_order=True)
         assert data_source.is_authenticated() is True
 
+    @patch("blimey.agile_keychain.data_source.crypto.kdf_releases_gil")
+    @patch("blimey.agile_keychain.data_source.crypto.decrypt_key")
+    @patch.object(KeyManager, 'get_keys')
+    def it_derives_keys_concurrently_if_the_kdf_releases_the_gil(self, get_keys, decrypt_key, kdf_releases_gil):
+        barrier = Barrier(2, timeout=5)
+        get_keys.return_value = [Mock(), Mock()]
+        decrypt_key.side_effect = lambda key, password: barrier.wait()
+        kdf_releases_gil.return_value = True
+
+        data_source = DataSource('some_path')
+        data_source.authenticate('password')
+
+        assert sorted(data_source._keys) == [0, 1]
+
+    @patch("blimey.agile_keychain.data_source.crypto.kdf_releases_gil")
+    @patch("blimey.agile_keychain.data_source.crypto.decrypt_key")
+    @patch.object(KeyManager, 'get_keys')
+    def it_leaves_no_keys_behind_if_any_key_can_not_be_validated(self, get_keys, decrypt_key, kdf_releases_gil):
+        key3 = Mock()
+        key5 = Mock()
+        get_keys.return_value = [key3, key5]
+        decrypt_key.side_effect = lambda key, password: self._raise_if(key is key5, IncorrectPasswordException)
+        kdf_releases_gil.return_value = True
+
+        data_source = DataSource('some_path')
+
+        try:
+            data_source.authenticate('password')
+        except IncorrectPasswordException:
+            pass
+
+        assert data_source._keys == []
+        assert data_source.is_authenticated() is False
+
     @patch("blimey.agile_keychain.data_source.crypto.decrypt_key")
     @patch.object(KeyManager, 'get_keys')
     @raises(IncorrectPasswordException)
@@ -74,6 +126,72 @@ class DataSourceSpec:
 
         assert data_source.is_authenticated() is False
 
+    @patch("blimey.agile_keychain.data_source.crypto.decrypt_key")
+    @patch.object(KeyManager, 'get_keys')
+    def it_only_authenticates_against_the_default_key_when_unlocking_lazily(self, get_keys, decrypt_key):
+        key3, key5 = self._get_encrypted_keys()
+        get_keys.return_value = [key3, key5]
+        decrypt_key.side_effect = self._decrypt_key
+
+        data_source = DataSource('some_path', {'lazy_unlock': True})
+        data_source.authenticate('password')
+
+        decrypt_key.assert_called_once_with(key5, 'password')
+        assert data_source.is_authenticated() is True
+
+    @patch("blimey.agile_keychain.data_source.crypto.decrypt_key")
+    @patch.object(KeyManager, 'get_keys')
+    def it_derives_lazily_unlocked_keys_on_first_use(self, get_keys, decrypt_key):
+        key3, key5 = self._get_encrypted_keys()
+        get_keys.return_value = [key3, key5]
+        decrypt_key.side_effect = self._decrypt_key
+
+        data_source = DataSource('some_path', {'lazy_unlock': True})
+        data_source.authenticate('password')
+
+        key = data_source._get_key_for_item({'openContents': {'securityLevel': 'SL3'}})
+        data_source._get_key_for_item({'openContents': {'securityLevel': 'SL3'}})
+
+        assert key.level == 'SL3'
+        decrypt_key.assert_has_calls([call(key5, 'password'), call(key3, 'password')])
+        assert decrypt_key.call_count == 2
+
+    @patch("blimey.agile_keychain.data_source.crypto.decrypt_key")
+    @patch.object(KeyManager, 'get_keys')
+    def it_derives_lazily_unlocked_keys_only_once_when_accessed_concurrently(self, get_keys, decrypt_key):
+        key3, key5 = self._get_encrypted_keys()
+        get_keys.return_value = [key3, key5]
+        decrypt_key.side_effect = self._decrypt_key
+
+        data_source = DataSource('some_path', {'lazy_unlock': True})
+        data_source.authenticate('password')
+
+        item = {'openContents': {'securityLevel': 'SL3'}}
+        threads = [Thread(target=data_source._get_key_for_item, args=(item,)) for _ in range(8)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        assert decrypt_key.call_count == 2
+
+    @patch("blimey.agile_keychain.data_source.crypto.decrypt_key")
+    @patch.object(KeyManager, 'get_keys')
+    def it_forgets_lazily_unlocked_keys_on_deauthentication(self, get_keys, decrypt_key):
+        key3, key5 = self._get_encrypted_keys()
+        get_keys.return_value = [key3, key5]
+        decrypt_key.side_effect = self._decrypt_key
+
+        data_source = DataSource('some_path', {'lazy_unlock': True})
+        data_source.authenticate('password')
+        data_source.deauthenticate()
+
+        assert data_source._pending_keys == []
+        assert data_source._pending_password is None
+        assert data_source.is_authenticated() is False
+
     @patch("blimey.agile_keychain.data_source.gc")
     def it_unsets_keys_and_triggers_garbage_collection_on_deauthentication(self, gc):
         data_source = DataSource('some_path')
@@ -134,10 +252,10 @@ class DataSourceSpec:
         assert type(item) is AgileKeychainItem
         assert item['title'] == 'Thing'
 
-    @patch.object(ItemManager, 'get_by_id')
+    @patch.object(ItemManager, '_get_item_ids')
     @patch("blimey.agile_keychain.data_source.crypto.generate_id")
-    def it_guarantees_generated_item_id_is_unique(self, generate_id, get_item_by_id):
-        get_item_by_id.side_effect = [Mock(), ItemNotFoundException]
+    def it_guarantees_generated_item_id_is_unique(self, generate_id, get_item_ids):
+        get_item_ids.return_value = ['123']
         generate_id.side_effect = ['123', '567']
 
         key3 = Mock()
@@ -155,11 +273,171 @@ class DataSourceSpec:
 
         assert item['uuid'] == '567'
 
+    @patch.object(ItemManager, 'get_by_id')
+    @patch.object(ItemManager, '_get_item_ids')
+    @patch("blimey.agile_keychain.data_source.crypto.generate_id")
+    def it_never_hands_out_the_same_item_id_twice(self, generate_id, get_item_ids, get_by_id):
+        get_item_ids.return_value = []
+        generate_id.side_effect = ['123', '123', '567']
+
+        data_source = DataSource('some_path')
+        data_source._keys = list(self._get_encrypted_keys())
+
+        assert data_source.create_item()['uuid'] == '123'
+        assert data_source.create_item()['uuid'] == '567'
+        assert get_item_ids.call_count == 1
+        assert get_by_id.call_count == 0
+
+    @patch.object(ItemManager, 'iter_items')
+    @patch("blimey.agile_keychain.data_source.crypto.decrypt_item")
+    def it_decrypts_items_one_at_a_time_when_iterating(self, decrypt_item, iter_items):
+        iter_items.return_value = iter([{'uuid': '1'}, {'uuid': '2'}])
+        decrypt_item.side_effect = lambda item, key: item
+
+        data_source = DataSource('some_path')
+        data_source._keys = list(self._get_encrypted_keys())
+        items = data_source.iter_items()
+
+        assert decrypt_item.call_count == 0
+        assert next(items) == {'uuid': '1'}
+        assert decrypt_item.call_count == 1
+
+    @patch.object(ItemManager, 'iter_items')
+    @patch("blimey.agile_keychain.data_source.crypto.decrypt_item")
+    @raises(UnauthenticatedDataSourceException)
+    def it_throws_if_deauthenticated_while_iterating_items(self, decrypt_item, iter_items):
+        iter_items.return_value = iter([{'uuid': '1'}, {'uuid': '2'}])
+        decrypt_item.side_effect = lambda item, key: item
+
+        data_source = DataSource('some_path')
+        data_source._keys = list(self._get_encrypted_keys())
+        items = data_source.iter_items()
+        next(items)
+
+        data_source.deauthenticate()
+        next(items)
+
+    @patch.object(ItemManager, 'get_by_id')
+    @patch.object(ItemManager, 'get_item_file_stamps')
+    @patch.object(ItemManager, 'get_item_files_stamp')
+    @patch("blimey.agile_keychain.data_source.crypto.decrypt_item")
+    def it_leaves_concealed_section_fields_out_of_content_search(self, decrypt_item, get_item_files_stamp,
+                                                                 get_item_file_stamps, get_by_id):
+        get_item_files_stamp.return_value = (1, 2, 3)
+        get_item_file_stamps.return_value = {'ABC': (1, 2, 3)}
+        get_by_id.return_value = {'uuid': 'ABC', 'updatedAt': 100}
+        decrypt_item.return_value = AgileKeychainItem({
+            'uuid': 'ABC',
+            'typeName': 'wallet.computer.Router',
+            'title': 'Router',
+            'locationKey': '',
+            'folderUuid': None,
+            'encrypted': {'sections': [{'name': 'network', 'title': 'Network', 'fields': [
+                {'k': 'string', 'n': 'ssid', 't': 'network name', 'v': 'Homenet'},
+                {'k': 'concealed', 'n': 'password', 't': 'wireless password', 'v': 'hunter2'}
+            ]}]}
+        })
+
+        data_source = DataSource('some_path', {'content_search': True})
+        data_source._keys = list(self._get_encrypted_keys())
+
+        assert [result['uuid'] for result in data_source.search_contents('homenet')] == ['ABC']
+        assert data_source.search_contents('hunter2') == []
+        assert data_source.search_contents('concealed') == []
+        assert data_source.search_contents('wireless') == []
+
+    @raises(UnauthenticatedDataSourceException)
+    def it_throws_if_iterating_items_with_deauthenticated_data_source(self):
+        data_source = DataSource('some_path')
+        data_source.iter_items()
+
     @raises(UnauthenticatedDataSourceException)
     def it_throws_if_saving_an_item_with_deauthenticated_data_source(self):
         data_source = DataSource('some_path')
         data_source.save_item(Mock())
 
+    @patch.object(ItemManager, 'get_summaries')
+    def it_lists_item_summaries_without_being_authenticated(self, get_summaries):
+        get_summaries.return_value = [{'uuid': 'ABC'}]
+
+        data_source = DataSource('some_path')
+
+        assert data_source.list_summaries() == [{'uuid': 'ABC'}]
+
+    @patch.object(ItemManager, 'rebuild_contents_file')
+    def it_rebuilds_the_contents_file_without_being_authenticated(self, rebuild_contents_file):
+        data_source = DataSource('some_path')
+        data_source.rebuild_contents_file()
+
+        rebuild_contents_file.assert_called_once_with()
+
+    @patch.object(ItemManager, 'save_items')
+    @patch("blimey.agile_keychain.data_source.crypto.encrypt_item")
+    def it_encrypts_every_item_before_saving_them_together(self, encrypt_item, save_items):
+        encrypt_item.side_effect = lambda item, key: {'encrypted': item['uuid']}
+
+        data_source = DataSource('some_path')
+        data_source._keys = list(self._get_encrypted_keys())
+        data_source.save_items([{'uuid': '1'}, {'uuid': '2'}])
+
+        save_items.assert_called_once_with([{'encrypted': '1'}, {'encrypted': '2'}])
+
+    @patch.object(ItemManager, 'save_items')
+    @patch("blimey.agile_keychain.data_source.crypto.encrypt_item")
+    def it_saves_nothing_when_encrypting_any_of_the_items_fails(self, encrypt_item, save_items):
+        encrypt_item.side_effect = lambda item, key: self._raise_if(item['uuid'] == '2', ValueError) or item
+
+        data_source = DataSource('some_path')
+        data_source._keys = list(self._get_encrypted_keys())
+
+        try:
+            data_source.save_items([{'uuid': '1'}, {'uuid': '2'}, {'uuid': '3'}])
+        except ValueError:
+            pass
+
+        assert save_items.call_count == 0
+
+    @raises(UnauthenticatedDataSourceException)
+    def it_throws_if_saving_items_with_deauthenticated_data_source(self):
+        data_source = DataSource('some_path')
+        data_source.save_items([Mock()])
+
+    @patch.object(ItemManager, 'save_items')
+    @patch.object(ItemManager, 'get_by_id')
+    @patch("blimey.agile_keychain.data_source.crypto.encrypt_item")
+    def it_replaces_deleted_items_with_tombstones(self, encrypt_item, get_by_id, save_items):
+        get_by_id.side_effect = lambda item_id: {'uuid': item_id, 'createdAt': 100, 'title': 'Secret'}
+        encrypt_item.side_effect = lambda item, key: item
+
+        data_source = DataSource('some_path')
+        data_source._keys = list(self._get_encrypted_keys())
+        data_source.delete_items(['1', '2'])
+
+        tombstones = save_items.call_args[0][0]
+
+        assert [tombstone['uuid'] for tombstone in tombstones] == ['1', '2']
+        assert tombstones[0]['typeName'] == 'system.Tombstone'
+        assert tombstones[0]['title'] == ''
+        assert tombstones[0]['createdAt'] == 100
+
+    @patch.object(ItemManager, 'save_items')
+    @patch.object(ItemManager, 'get_by_id')
+    @patch("blimey.agile_keychain.data_source.crypto.encrypt_item")
+    def it_deletes_nothing_when_any_of_the_items_does_not_exist(self, encrypt_item, get_by_id, save_items):
+        get_by_id.side_effect = lambda item_id: \
+            self._raise_if(item_id == '2', ItemNotFoundException) or {'uuid': item_id, 'createdAt': 100}
+        encrypt_item.side_effect = lambda item, key: item
+
+        data_source = DataSource('some_path')
+        data_source._keys = list(self._get_encrypted_keys())
+
+        try:
+            data_source.delete_items(['1', '2'])
+        except ItemNotFoundException:
+            pass
+
+        assert save_items.call_count == 0
+
     @patch.object(KeyManager, 'get_keys')
     @patch.object(KeyManager, 'save_key')
     @patch("blimey.agile_keychain.data_source.crypto.encrypt_key")
@@ -173,14 +451,71 @@ class DataSourceSpec:
         key5_reencrypted = Mock()
 
         get_keys.return_value = [key3_encrypted, key5_encrypted]
-        decrypt_key.side_effect = [key3_decrypted, key5_decrypted]
-        encrypt_key.side_effect = [key3_reencrypted, key5_reencrypted]
+        decrypt_key.side_effect = lambda key, password: {
+            key3_encrypted: key3_decrypted,
+            key5_encrypted: key5_decrypted
+        }[key]
+        encrypt_key.side_effect = lambda key, password: {
+            key3_decrypted: key3_reencrypted,
+            key5_decrypted: key5_reencrypted
+        }[key]
 
         data_source = DataSource('some_path')
         data_source.authenticate('old_password')
         data_source.set_password('new_password')
 
-        decrypt_key.assert_has_calls([call(key3_encrypted, 'old_password'), call(key5_encrypted, 'old_password')])
-        encrypt_key.assert_has_calls([call(key3_decrypted, 'new_password'), call(key5_decrypted, 'new_password')])
+        decrypt_key.assert_has_calls([call(key3_encrypted, 'old_password'), call(key5_encrypted, 'old_password')],
+                                     any_order=True)
+        encrypt_key.assert_has_calls([call(key3_decrypted, 'new_password'), call(key5_decrypted, 'new_password')],
+                                     any_order=True)
 
         save_keys.assert_has_calls([call(key3_reencrypted), call(key5_reencrypted)])
+
+    @patch.object(KeyManager, 'save_key')
+    @patch("blimey.agile_keychain.data_source.crypto.encrypt_key")
+    def it_raises_iterations_far_below_the_target_when_password_is_changed(self, encrypt_key, save_key):
+        key3, key5 = self._get_encrypted_keys()
+        key3.iterations = 1000
+        key5.iterations = 20000
+
+        data_source = DataSource('some_path')
+        data_source._keys = [key3, key5]
+        data_source.set_password('new_password', {'iterations': 25000})
+
+        encrypt_key.assert_has_calls([call(key3, 'new_password', 25000), call(key5, 'new_password')], any_order=True)
+
+    @patch.object(KeyManager, 'save_key')
+    @patch("blimey.agile_keychain.data_source.crypto.calibrate_iterations")
+    @patch("blimey.agile_keychain.data_source.crypto.encrypt_key")
+    def it_raises_iterations_to_a_calibrated_target_on_password_change(self, encrypt_key, calibrate_iterations,
+                                                                       save_key):
+        key3, key5 = self._get_encrypted_keys()
+        key3.iterations = 1000
+        key5.iterations = 1000
+        calibrate_iterations.return_value = 40000
+
+        data_source = DataSource('some_path')
+        data_source._keys = [key3, key5]
+        data_source.set_password('new_password', {'target_unlock_time': 0.25})
+
+        encrypt_key.assert_has_calls([call(key3, 'new_password', 40000), call(key5, 'new_password', 40000)],
+                                     any_order=True)
+
+    def _raise_if(self, condition, exception):
+        if condition:
+            raise exception
+
+    def _get_encrypted_keys(self):
+        key3 = Mock()
+        key3.level = 'SL3'
+
+        key5 = Mock()
+        key5.level = 'SL5'
+
+        return key3, key5
+
+    def _decrypt_key(self, key, password):
+        decrypted_key = Mock()
+        decrypted_key.level = key.level
+
+        return decrypted_key
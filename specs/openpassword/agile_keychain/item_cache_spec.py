@@ -0,0 +1,62 @@
+from blimey.agile_keychain._manager._item_cache import ItemCache
+
+
+class ItemCacheSpec:
+    def it_returns_cached_items_for_an_unchanged_stamp(self):
+        cache = ItemCache(max_entries=2)
+        cache.put('ABC', (1, 10, 100), {'uuid': 'ABC'}, 10)
+
+        assert cache.get('ABC', (1, 10, 100)) == {'uuid': 'ABC'}
+
+    def it_drops_items_whose_stamp_changed(self):
+        cache = ItemCache(max_entries=2)
+        cache.put('ABC', (1, 10, 100), {'uuid': 'ABC'}, 10)
+
+        assert cache.get('ABC', (2, 10, 100)) is None
+        assert cache.get_statistics()['entries'] == 0
+
+    def it_evicts_the_least_recently_used_item_when_full(self):
+        cache = ItemCache(max_entries=2)
+        cache.put('A', 1, {}, 10)
+        cache.put('B', 1, {}, 10)
+        cache.get('A', 1)
+        cache.put('C', 1, {}, 10)
+
+        assert cache.get('B', 1) is None
+        assert cache.get('A', 1) == {}
+        assert cache.get('C', 1) == {}
+
+    def it_evicts_items_to_stay_within_its_size_in_bytes(self):
+        cache = ItemCache(max_bytes=25)
+        cache.put('A', 1, {}, 10)
+        cache.put('B', 1, {}, 10)
+        cache.put('C', 1, {}, 10)
+
+        assert cache.get('A', 1) is None
+        assert cache.get_statistics()['bytes'] == 20
+
+    def it_does_not_cache_items_larger_than_its_size_in_bytes(self):
+        cache = ItemCache(max_bytes=5)
+        cache.put('A', 1, {}, 10)
+
+        assert cache.get_statistics()['entries'] == 0
+
+    def it_counts_hits_and_misses(self):
+        cache = ItemCache(max_entries=2)
+        cache.get('A', 1)
+        cache.put('A', 1, {}, 10)
+        cache.get('A', 1)
+        cache.get('A', 1)
+
+        statistics = cache.get_statistics()
+
+        assert statistics['hits'] == 2
+        assert statistics['misses'] == 1
+
+    def it_hands_out_copies_that_can_be_changed_safely(self):
+        cache = ItemCache(max_entries=2)
+        cache.put('A', 1, {'openContents': {'tags': ['one']}}, 10)
+
+        cache.get('A', 1)['openContents']['tags'].append('two')
+
+        assert cache.get('A', 1) == {'openContents': {'tags': ['one']}}
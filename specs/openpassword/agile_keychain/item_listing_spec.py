@@ -0,0 +1,95 @@
+from nose.tools import raises
+
+from blimey.agile_keychain._manager._item_listing import ItemListing
+from blimey.exceptions import UnknownListingOrderException
+
+
+class ItemListingSpec:
+    def it_orders_items_by_their_open_fields(self):
+        listing = self._create_listing()
+
+        assert listing.get_page('updatedAt') == ['2', '3', '1']
+        assert listing.get_page('createdAt') == ['1', '2', '3']
+        assert listing.get_page('title') == ['1', '3', '2']
+
+    def it_orders_items_in_reverse(self):
+        listing = self._create_listing()
+
+        assert listing.get_page('updatedAt', reverse=True) == ['1', '3', '2']
+        assert listing.get_page('updatedAt', offset=1, limit=1, reverse=True) == ['3']
+        assert listing.get_page('updatedAt', offset=2, limit=5, reverse=True) == ['2']
+        assert listing.get_page('updatedAt', offset=5, reverse=True) == []
+
+    def it_pages_through_items(self):
+        listing = self._create_listing()
+
+        assert listing.get_page('createdAt', offset=0, limit=2) == ['1', '2']
+        assert listing.get_page('createdAt', offset=2, limit=2) == ['3']
+
+    def it_breaks_ties_by_uuid(self):
+        listing = ItemListing()
+
+        for item_id in ['C', 'A', 'B']:
+            listing.add(self._item(item_id, 'Same', 10, 10))
+
+        assert listing.get_page('updatedAt') == ['A', 'B', 'C']
+
+    def it_filters_items_by_folder_and_type(self):
+        listing = self._create_listing()
+
+        assert listing.get_page('title', folder='F1') == ['1', '3']
+        assert listing.get_page('title', type_name='wallet.financial.CreditCard') == ['2']
+        assert listing.get_page('title', folder='F1', type_name='wallet.financial.CreditCard') == []
+
+    def it_keeps_orderings_sorted_as_items_change(self):
+        listing = self._create_listing()
+        listing.get_page('updatedAt')
+        listing.get_page('title', folder='F1')
+
+        listing.add(self._item('2', 'Renamed', 2, 400, 'F1'))
+        listing.remove('3')
+        listing.add(self._item('4', 'Another', 4, 50))
+
+        assert listing.get_page('updatedAt') == ['4', '1', '2']
+        assert listing.get_page('title', folder='F1') == ['1', '2']
+
+    def it_drops_the_least_recently_used_orderings(self):
+        listing = ItemListing(max_orders=2)
+        listing.get_page('updatedAt')
+        listing.get_page('title')
+        listing.get_page('updatedAt')
+        listing.get_page('title', folder='F1')
+
+        assert list(listing._orders) == [('updatedAt', None, None), ('title', 'F1', None)]
+
+    def it_rebuilds_dropped_orderings_when_they_are_requested_again(self):
+        listing = self._create_listing()
+        listing._max_orders = 1
+        listing.get_page('updatedAt')
+        listing.get_page('title')
+
+        listing.add(self._item('4', 'Another', 4, 50))
+
+        assert listing.get_page('updatedAt') == ['4', '2', '3', '1']
+
+    @raises(UnknownListingOrderException)
+    def it_throws_on_unknown_orderings(self):
+        self._create_listing().get_page('password')
+
+    def _create_listing(self):
+        listing = ItemListing()
+        listing.add(self._item('1', 'alpha', 1, 300, 'F1'))
+        listing.add(self._item('2', 'Gamma', 2, 100, 'F2', 'wallet.financial.CreditCard'))
+        listing.add(self._item('3', 'Beta', 3, 200, 'F1'))
+
+        return listing
+
+    def _item(self, item_id, title, created_at, updated_at, folder_id=None, type_name='webforms.WebForm'):
+        return {
+            'uuid': item_id,
+            'title': title,
+            'createdAt': created_at,
+            'updatedAt': updated_at,
+            'folderUuid': folder_id,
+            'typeName': type_name
+        }
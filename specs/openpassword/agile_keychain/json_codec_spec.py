@@ -0,0 +1,96 @@
+import os
+import json
+from unittest.mock import patch
+from nose.tools import raises
+
+from blimey.agile_keychain import _crypto as crypto
+from blimey.agile_keychain import _json_codec as json_codec
+from blimey.agile_keychain._json_codec import StandardCodec
+from blimey.agile_keychain._key import DecryptedKey
+from blimey.agile_keychain.agile_keychain_item import AgileKeychainItem
+from blimey.exceptions import UnavailableJsonCodecException
+
+
+class JsonCodecSpec:
+    _item = {
+        'uuid': '9E7673CCBB5B4AC9A7A8838835CB7E83',
+        'title': 'Säkerhet ⚽',
+        'createdAt': 1383517434,
+        'trashed': False,
+        'folderUuid': None,
+        'openContents': {'tags': ['tag1'], 'score': 0.5},
+        'encrypted': {'fields': [{'name': 'password', 'value': 'päss"\\\n'}]}
+    }
+
+    def it_selects_the_fastest_available_codec_by_default(self):
+        with patch.dict(os.environ, clear=True):
+            codec = json_codec.set_codec()
+
+        assert codec.name == json_codec.get_available_codec_names()[0]
+
+    def it_can_be_forced_to_a_codec(self):
+        codec = json_codec.set_codec('json')
+
+        assert json_codec.get_codec() is codec
+        assert codec.name == 'json'
+
+        json_codec.set_codec()
+
+    def it_can_be_forced_to_a_codec_through_the_environment(self):
+        with patch.dict(os.environ, {json_codec.CODEC_ENVIRONMENT_VARIABLE: 'json'}):
+            codec = json_codec.set_codec()
+
+        assert codec.name == 'json'
+
+        json_codec.set_codec()
+
+    @raises(UnavailableJsonCodecException)
+    def it_throws_on_unknown_codecs(self):
+        json_codec.set_codec('yaml')
+
+    def it_writes_what_the_standard_library_always_wrote(self):
+        assert StandardCodec().dumps(self._item) == json.dumps(self._item).encode('utf8')
+
+    def it_reads_what_every_codec_writes(self):
+        for writer in self._get_codecs():
+            data = writer.dumps(self._item)
+
+            for reader in self._get_codecs():
+                assert reader.loads(data) == self._item
+                assert reader.loads(data.decode('utf8')) == self._item
+
+    def it_writes_utf8_any_json_parser_reads(self):
+        for codec in self._get_codecs():
+            assert json.loads(codec.dumps(self._item).decode('utf8')) == self._item
+
+    def it_handles_values_outside_the_range_of_faster_codecs(self):
+        for codec in self._get_codecs():
+            assert json.loads(codec.dumps([2 ** 70 + 1]).decode('utf8')) == [2 ** 70 + 1]
+            assert codec.loads(codec.dumps(['\ud800'])) == ['\ud800']
+            assert str(codec.loads(b'[NaN]')[0]) == 'nan'
+
+    def it_throws_value_errors_on_invalid_json(self):
+        for codec in self._get_codecs():
+            try:
+                codec.loads(b'{"uuid": ')
+                assert False
+            except ValueError:
+                pass
+
+    def it_decrypts_items_encrypted_with_every_codec(self):
+        key = DecryptedKey({'identifier': 'ABC', 'level': 'SL5', 'iterations': 1000, 'key': os.urandom(1024)})
+        item = AgileKeychainItem(self._item)
+
+        for writer_name in json_codec.get_available_codec_names():
+            json_codec.set_codec(writer_name)
+            encrypted_item = crypto.encrypt_item(item, key)
+
+            for reader_name in json_codec.get_available_codec_names():
+                json_codec.set_codec(reader_name)
+
+                assert crypto.decrypt_item(encrypted_item, key)['encrypted'] == self._item['encrypted']
+
+        json_codec.set_codec()
+
+    def _get_codecs(self):
+        return [json_codec.create_codec(name) for name in json_codec.get_available_codec_names()]
@@ -0,0 +1,87 @@
+import json
+from nose.tools import raises
+
+from blimey.agile_keychain._search_index import SearchIndex
+from blimey.exceptions import UnknownSearchFieldException
+
+
+class SearchIndexSpec:
+    def it_finds_items_by_substrings_of_their_title(self):
+        index = self._create_index()
+
+        assert self._search(index, 'bank') == ['1', '3']
+        assert self._search(index, 'ANK LOG') == ['1']
+
+    def it_finds_items_by_the_start_of_words_for_short_queries(self):
+        index = self._create_index()
+
+        assert self._search(index, 'lo', fields=['title']) == ['1']
+        assert self._search(index, 'og', fields=['title']) == []
+
+    def it_does_not_match_items_holding_the_query_grams_in_another_order(self):
+        index = SearchIndex([self._summary('1', 'abcdbc')])
+
+        assert self._search(index, 'bcbc') == []
+
+    def it_finds_items_by_location(self):
+        index = self._create_index()
+
+        assert self._search(index, 'example.org', fields=['locationKey']) == ['3']
+
+    def it_limits_results_to_a_folder(self):
+        index = self._create_index()
+
+        assert self._search(index, 'bank', folder='F1') == ['3']
+
+    def it_returns_every_item_for_an_empty_query(self):
+        index = self._create_index()
+
+        assert self._search(index, '') == ['1', '2', '3']
+
+    def it_updates_items(self):
+        index = self._create_index()
+        index.add(self._summary('1', 'Renamed'))
+
+        assert self._search(index, 'bank') == ['3']
+        assert self._search(index, 'renamed') == ['1']
+
+    def it_removes_items(self):
+        index = self._create_index()
+        index.remove('3')
+
+        assert self._search(index, 'bank') == ['1']
+
+    def it_restores_itself_from_its_state(self):
+        index = self._create_index()
+        index.remove('2')
+
+        restored_index = SearchIndex.from_state(json.loads(json.dumps(index.get_state())))
+        restored_index.add(self._summary('4', 'Bank card'))
+
+        assert self._search(restored_index, 'bank') == ['1', '3', '4']
+        assert self._search(restored_index, 'sho') == []
+        assert self._search(restored_index, 'sa', fields=['title']) == ['3']
+
+    @raises(UnknownSearchFieldException)
+    def it_throws_on_unknown_fields(self):
+        self._create_index().search('bank', fields=['password'])
+
+    def _create_index(self):
+        return SearchIndex([
+            self._summary('1', 'Bank login', 'bank.example.com'),
+            self._summary('2', 'Shopping', 'shop.example.com'),
+            self._summary('3', 'Savings bank', 'savings.example.org', 'F1')
+        ])
+
+    def _search(self, index, query, fields=None, folder=None):
+        return [summary['uuid'] for summary in index.search(query, fields, folder)]
+
+    def _summary(self, item_id, title, location_key='', folder_id=''):
+        return {
+            'uuid': item_id,
+            'typeName': 'webforms.WebForm',
+            'title': title,
+            'locationKey': location_key,
+            'folderUuid': folder_id,
+            'trashed': False
+        }
@@ -0,0 +1,143 @@
+import asyncio
+from threading import Event
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from nose.tools import raises
+
+from blimey._keychain import Keychain
+from blimey._async_keychain import AsyncKeychain
+from blimey.exceptions import KeychainLockedException, ItemNotFoundException, IncorrectPasswordException
+
+
+class AsyncKeychainSpec:
+    @patch("blimey.abstract.DataSource")
+    def it_unlocks_the_keychain_on_the_executor(self, data_source):
+        data_source.is_initialised.return_value = True
+        executor = ThreadPoolExecutor(1)
+
+        with patch.object(executor, 'submit', wraps=executor.submit) as submit:
+            asyncio.run(AsyncKeychain(Keychain(data_source), executor).unlock('somepassword'))
+
+        data_source.authenticate.assert_called_with('somepassword')
+        assert submit.call_count == 1
+
+    @patch("blimey.abstract.DataSource")
+    def it_deletes_items_on_the_executor(self, data_source):
+        data_source.is_initialised.return_value = True
+        executor = ThreadPoolExecutor(1)
+
+        with patch.object(executor, 'submit', wraps=executor.submit) as submit:
+            asyncio.run(AsyncKeychain(Keychain(data_source), executor).delete_items(['someid']))
+
+        data_source.delete_items.assert_called_with(['someid'])
+        assert submit.call_count == 1
+
+    @patch("blimey.abstract.DataSource")
+    @raises(IncorrectPasswordException)
+    def it_throws_if_unlocking_with_incorrect_password(self, data_source):
+        data_source.is_initialised.return_value = True
+        data_source.authenticate.side_effect = IncorrectPasswordException
+
+        asyncio.run(AsyncKeychain(Keychain(data_source)).unlock('wrongpassword'))
+
+    @patch("blimey.abstract.DataSource")
+    def it_gets_items_by_id(self, data_source):
+        data_source.is_authenticated.return_value = True
+        data_source.get_item_by_id.return_value = {'uuid': 'someid'}
+
+        assert asyncio.run(AsyncKeychain(Keychain(data_source)).get('someid')) == {'uuid': 'someid'}
+
+    @patch("blimey.abstract.DataSource")
+    @raises(KeychainLockedException)
+    def it_throws_if_getting_items_from_a_locked_keychain(self, data_source):
+        data_source.is_authenticated.return_value = False
+
+        asyncio.run(AsyncKeychain(Keychain(data_source)).get('someid'))
+
+    @patch("blimey.abstract.DataSource")
+    @raises(ItemNotFoundException)
+    def it_throws_if_getting_items_that_do_not_exist(self, data_source):
+        data_source.is_authenticated.return_value = True
+        data_source.get_item_by_id.side_effect = ItemNotFoundException
+
+        asyncio.run(AsyncKeychain(Keychain(data_source)).get('someid'))
+
+    @patch("blimey.abstract.DataSource")
+    def it_iterates_over_items_asynchronously(self, data_source):
+        data_source.is_authenticated.return_value = True
+        data_source.iter_items.return_value = iter(range(150))
+
+        async def collect():
+            return [item async for item in AsyncKeychain(Keychain(data_source))]
+
+        assert asyncio.run(collect()) == list(range(150))
+
+    @patch("blimey.abstract.DataSource")
+    @raises(KeychainLockedException)
+    def it_throws_when_iterating_on_after_being_locked(self, data_source):
+        data_source.is_authenticated.return_value = True
+        data_source.iter_items.return_value = iter(range(150))
+        keychain = AsyncKeychain(Keychain(data_source))
+
+        async def iterate():
+            async for _ in keychain:
+                data_source.is_authenticated.return_value = False
+
+        asyncio.run(iterate())
+
+    @patch("blimey.abstract.DataSource")
+    def it_waits_for_running_reads_before_locking(self, data_source):
+        data_source.is_authenticated.return_value = True
+        item_requested = Event()
+        item_released = Event()
+        events = []
+
+        def get_item_by_id(item_id):
+            item_requested.set()
+            item_released.wait(5)
+            events.append('get')
+
+            return {'uuid': item_id}
+
+        data_source.get_item_by_id.side_effect = get_item_by_id
+        data_source.deauthenticate.side_effect = lambda: events.append('lock')
+        keychain = AsyncKeychain(Keychain(data_source))
+
+        async def get_and_lock():
+            get = asyncio.ensure_future(keychain.get('someid'))
+            await asyncio.get_running_loop().run_in_executor(None, item_requested.wait, 5)
+            lock = asyncio.ensure_future(keychain.lock())
+            await asyncio.sleep(0.01)
+
+            assert events == []
+            item_released.set()
+            await asyncio.gather(get, lock)
+
+        asyncio.run(get_and_lock())
+
+        assert events == ['get', 'lock']
+
+    @patch("blimey.abstract.DataSource")
+    def it_runs_reads_concurrently(self, data_source):
+        data_source.is_authenticated.return_value = True
+        requests = []
+        released = Event()
+
+        def get_item_by_id(item_id):
+            requests.append(item_id)
+
+            # Only returns once both reads are running side by side
+            if len(requests) == 2:
+                released.set()
+
+            assert released.wait(5)
+
+            return {'uuid': item_id}
+
+        data_source.get_item_by_id.side_effect = get_item_by_id
+        keychain = AsyncKeychain(Keychain(data_source), ThreadPoolExecutor(2))
+
+        async def get_both():
+            return await asyncio.gather(keychain.get('first'), keychain.get('second'))
+
+        assert asyncio.run(get_both()) == [{'uuid': 'first'}, {'uuid': 'second'}]
@@ -119,6 +119,28 @@ class KeychainSpec:
         except TypeError:
             raise AssertionError("Keychain is not iterable")
 
+    @patch("blimey.abstract.DataSource")
+    def it_streams_items_from_the_data_source_when_iterated(self, data_source):
+        data_source.is_authenticated.return_value = True
+        data_source.iter_items.return_value = iter(['item1', 'item2'])
+        keychain = Keychain(data_source)
+
+        assert list(keychain) == ['item1', 'item2']
+        assert data_source.get_all_items.called is False
+
+    @patch("blimey.abstract.DataSource")
+    @raises(KeychainLockedException)
+    def it_throws_when_locked_while_iterating(self, data_source):
+        def iter_items():
+            yield 'item1'
+            raise UnauthenticatedDataSourceException
+
+        data_source.is_authenticated.return_value = True
+        data_source.iter_items.return_value = iter_items()
+        keychain = Keychain(data_source)
+
+        list(keychain)
+
     @patch("blimey.abstract.DataSource")
     @raises(KeychainLockedException)
     def it_is_not_iterable_as_list_of_items_when_locked(self, data_source):
@@ -183,6 +205,98 @@ class KeychainSpec:
 
         data_source.save_item.assert_called_with(item)
 
+    @patch("blimey.abstract.DataSource")
+    def it_delegates_saving_several_items_to_the_data_source(self, data_source):
+        items = [{"id": "first_item_id"}, {"id": "second_item_id"}]
+
+        keychain = Keychain(data_source)
+        keychain.save_items(items)
+
+        data_source.save_items.assert_called_with(items)
+
+    @patch("blimey.abstract.DataSource")
+    @raises(KeychainLockedException)
+    def it_throws_if_saving_several_items_to_a_locked_keychain(self, data_source):
+        data_source.save_items.side_effect = UnauthenticatedDataSourceException
+
+        keychain = Keychain(data_source)
+        keychain.save_items([{"id": "someitem_id"}])
+
+    @patch("blimey.abstract.DataSource")
+    def it_delegates_deleting_items_to_the_data_source(self, data_source):
+        keychain = Keychain(data_source)
+        keychain.delete_items(['ABC', 'DEF'])
+
+        data_source.delete_items.assert_called_with(['ABC', 'DEF'])
+
+    @patch("blimey.abstract.DataSource")
+    @raises(KeychainLockedException)
+    def it_throws_if_deleting_items_from_a_locked_keychain(self, data_source):
+        data_source.delete_items.side_effect = UnauthenticatedDataSourceException
+
+        keychain = Keychain(data_source)
+        keychain.delete_items(['ABC'])
+
+    @patch("blimey.abstract.DataSource")
+    def it_delegates_listing_pages_of_items_to_the_data_source(self, data_source):
+        data_source.is_authenticated.return_value = True
+        data_source.list_items.return_value = [{'uuid': 'ABC'}]
+
+        keychain = Keychain(data_source)
+
+        assert keychain.list('title', 20, 10, 'F1', 'webforms.WebForm', True) == [{'uuid': 'ABC'}]
+        data_source.list_items.assert_called_with('title', 20, 10, 'F1', 'webforms.WebForm', True)
+
+    @patch("blimey.abstract.DataSource")
+    @raises(KeychainLockedException)
+    def it_throws_if_listing_pages_of_items_of_a_locked_keychain(self, data_source):
+        data_source.is_authenticated.return_value = False
+
+        keychain = Keychain(data_source)
+        keychain.list()
+
+    @patch("blimey.abstract.DataSource")
+    def it_lists_item_summaries_without_being_unlocked(self, data_source):
+        data_source.is_authenticated.return_value = False
+        data_source.list_summaries.return_value = [{'uuid': 'ABC'}]
+
+        keychain = Keychain(data_source)
+
+        assert keychain.list_summaries() == [{'uuid': 'ABC'}]
+
+    @patch("blimey.abstract.DataSource")
+    @raises(NonInitialisedKeychainException)
+    def it_throws_if_listing_item_summaries_of_an_uninitialised_keychain(self, data_source):
+        data_source.is_initialised.return_value = False
+
+        keychain = Keychain(data_source)
+        keychain.list_summaries()
+
+    @patch("blimey.abstract.DataSource")
+    def it_searches_items_without_being_unlocked(self, data_source):
+        data_source.is_authenticated.return_value = False
+        data_source.search.return_value = [{'uuid': 'ABC'}]
+
+        keychain = Keychain(data_source)
+
+        assert keychain.search('bank', fields=['title'], folder='DEF') == [{'uuid': 'ABC'}]
+        data_source.search.assert_called_with('bank', ['title'], 'DEF')
+
+    @patch("blimey.abstract.DataSource")
+    @raises(KeychainLockedException)
+    def it_throws_if_searching_the_contents_of_a_locked_keychain(self, data_source):
+        data_source.is_authenticated.return_value = False
+
+        keychain = Keychain(data_source)
+        keychain.search_contents('bank')
+
+    @patch("blimey.abstract.DataSource")
+    def it_delegates_searching_contents_to_the_data_source(self, data_source):
+        keychain = Keychain(data_source)
+        keychain.search_contents('bank', folder='DEF')
+
+        data_source.search_contents.assert_called_with('bank', 'DEF')
+
     # Changing password
 
     @patch("blimey.abstract.DataSource")
@@ -202,4 +316,11 @@ class KeychainSpec:
         keychain.unlock("password")
         keychain.set_password("foobar")
 
-        data_source.set_password.assert_called_with("foobar")
+        data_source.set_password.assert_called_with("foobar", None)
+
+    @patch("blimey.abstract.DataSource")
+    def it_passes_password_change_configuration_to_data_source(self, data_source):
+        keychain = Keychain(data_source)
+        keychain.set_password("foobar", {"target_unlock_time": 0.25})
+
+        data_source.set_password.assert_called_with("foobar", {"target_unlock_time": 0.25})
@@ -0,0 +1,118 @@
+import os
+import shutil
+from threading import Timer
+from unittest.mock import patch
+
+from blimey.agile_keychain._manager._item_manager import ItemManager
+from blimey.agile_keychain._manager._change_feed import ChangeFeed
+
+
+class ChangeFeedTest:
+    _fixture_path = os.path.join('tests', 'fixtures', 'test.agilekeychain')
+    _temporary_path = os.path.join('tests', 'fixtures', 'temp.agilekeychain')
+
+    def setup(self):
+        shutil.copytree(self._fixture_path, self._temporary_path)
+
+    def teardown(self):
+        shutil.rmtree(self._temporary_path)
+
+    def it_reports_every_item_as_added_at_first(self):
+        changes = ChangeFeed(self._temporary_path).get_changes()
+
+        assert len(changes['added']) == len(self._get_item_file_names())
+        assert changes['changed'] == changes['removed'] == []
+        assert changes['contents_changed'] is True
+        assert changes['keys_changed'] is True
+
+    def it_reports_added_changed_and_removed_items(self):
+        feed = ChangeFeed(self._temporary_path)
+        feed.get_changes()
+
+        self._copy_item_file('5F7210FD2F3F460692B7083C60854A02', '00000000000000000000000000000000')
+        self._append_to_item_file('B851D6E3232842B0858BC10968632A9C')
+        os.remove(self._get_path('data', 'default', '9E7673CCBB5B4AC9A7A8838835CB7E83.1password'))
+
+        assert feed.get_changes() == {
+            'added': ['00000000000000000000000000000000'],
+            'changed': ['B851D6E3232842B0858BC10968632A9C'],
+            'removed': ['9E7673CCBB5B4AC9A7A8838835CB7E83'],
+            'contents_changed': False,
+            'keys_changed': False
+        }
+
+    def it_reports_nothing_when_nothing_changed(self):
+        feed = ChangeFeed(self._temporary_path)
+        feed.get_changes()
+
+        changes = feed.get_changes()
+
+        assert not any(changes.values())
+
+    def it_reports_changes_to_the_contents_and_keys_files(self):
+        feed = ChangeFeed(self._temporary_path)
+        feed.get_changes()
+
+        for file_name in ['contents.js', '1password.keys']:
+            with open(self._get_path('data', 'default', file_name), 'a') as file:
+                file.write('\n')
+
+        changes = feed.get_changes()
+
+        assert changes['contents_changed'] is True
+        assert changes['keys_changed'] is True
+
+    def it_drops_changed_items_from_the_item_cache(self):
+        item_manager = ItemManager(self._temporary_path, {'item_cache_entries': 10})
+        item_manager.get_changes()
+        item_manager.get_by_id('B851D6E3232842B0858BC10968632A9C')
+
+        self._append_to_item_file('B851D6E3232842B0858BC10968632A9C')
+        item_manager.get_changes()
+
+        assert item_manager.get_cache_statistics()['entries'] == 0
+
+    def it_waits_for_changes(self):
+        item_manager = ItemManager(self._temporary_path)
+        timer = Timer(0.05, self._append_to_item_file, ['B851D6E3232842B0858BC10968632A9C'])
+        timer.start()
+
+        with item_manager.watch_changes() as watcher:
+            changes = watcher.wait(timeout=5)
+
+        timer.join()
+
+        assert changes['changed'] == ['B851D6E3232842B0858BC10968632A9C']
+
+    def it_polls_for_changes_without_inotify(self):
+        item_manager = ItemManager(self._temporary_path, {'change_poll_interval': 0.01})
+        timer = Timer(0.05, self._append_to_item_file, ['B851D6E3232842B0858BC10968632A9C'])
+        timer.start()
+
+        with patch('blimey.agile_keychain._manager._change_watcher._create_inotify',
+                   return_value=(None, None)):
+            with item_manager.watch_changes() as watcher:
+                changes = watcher.wait(timeout=5)
+
+        timer.join()
+
+        assert watcher.is_using_inotify() is False
+        assert changes['changed'] == ['B851D6E3232842B0858BC10968632A9C']
+
+    def it_returns_none_when_nothing_changed_in_time(self):
+        with ItemManager(self._temporary_path).watch_changes() as watcher:
+            assert watcher.wait(timeout=0.05) is None
+
+    def _copy_item_file(self, item_id, new_item_id):
+        shutil.copy(self._get_path('data', 'default', item_id + '.1password'),
+                    self._get_path('data', 'default', new_item_id + '.1password'))
+
+    def _append_to_item_file(self, item_id):
+        with open(self._get_path('data', 'default', item_id + '.1password'), 'a') as file:
+            file.write('\n')
+
+    def _get_item_file_names(self):
+        return [name for name in os.listdir(self._get_path('data', 'default')) if name.endswith('.1password')]
+
+    def _get_path(self, *names):
+        return os.path.join(self._temporary_path, *names)
@@ -0,0 +1,148 @@
+import os
+import shutil
+from unittest.mock import patch
+from nose.tools import raises
+
+from blimey.agile_keychain.data_source import DataSource
+from blimey.exceptions import UnauthenticatedDataSourceException
+
+
+class ContentSearchTest:
+    _fixture_path = os.path.join('tests', 'fixtures', 'test.agilekeychain')
+    _temporary_path = os.path.join('tests', 'fixtures', 'temp.agilekeychain')
+    _password = 'masterpassword123'
+
+    def it_finds_items_by_their_decrypted_contents(self):
+        data_source = self._create_data_source(self._fixture_path)
+
+        results = data_source.search_contents('someuser')
+
+        assert sorted(result['title'] for result in results) == ['Some FTP Account', 'Some Website']
+        assert 'contents' not in results[0]
+
+    def it_does_not_find_items_by_their_passwords(self):
+        data_source = self._create_data_source(self._fixture_path)
+
+        assert data_source.search_contents('password123') == []
+        assert data_source.search_contents('testpassword') == []
+
+    def it_keeps_the_index_between_searches_only_when_configured(self):
+        data_source = self._create_data_source(self._fixture_path)
+        data_source.search_contents('someuser')
+
+        with patch.object(data_source, '_decrypt_item', wraps=data_source._decrypt_item) as decrypt_item:
+            data_source.search_contents('secrets')
+
+        assert decrypt_item.call_count == 0
+
+        data_source = self._create_data_source(self._fixture_path, {})
+        data_source.search_contents('someuser')
+
+        assert not data_source._content_index_manager.is_built()
+
+    def it_drops_the_index_when_deauthenticated(self):
+        data_source = self._create_data_source(self._fixture_path)
+        data_source.search_contents('someuser')
+
+        data_source.deauthenticate()
+
+        assert not data_source._content_index_manager.is_built()
+
+    @raises(UnauthenticatedDataSourceException)
+    def it_throws_when_searching_without_being_authenticated(self):
+        DataSource(self._fixture_path, {'content_search': True}).search_contents('someuser')
+
+    def it_updates_the_index_when_items_are_saved(self):
+        self._copy_fixture()
+
+        data_source = self._create_data_source(self._temporary_path)
+        data_source.search_contents('secrets')
+
+        item = data_source.get_item_by_id('B851D6E3232842B0858BC10968632A9C')
+        item['encrypted']['notesPlain'] = 'Nothing to see'
+        data_source.save_item(item)
+
+        with patch.object(data_source, '_decrypt_item', wraps=data_source._decrypt_item) as decrypt_item:
+            assert data_source.search_contents('secrets') == []
+            assert [result['uuid'] for result in data_source.search_contents('nothing to')] == [item['uuid']]
+
+        assert decrypt_item.call_count == 0
+
+    def it_persists_the_index_between_unlocks(self):
+        self._copy_fixture()
+
+        data_source = self._create_data_source(self._temporary_path, {'persistent_content_search': True})
+        data_source.search_contents('someuser')
+
+        assert os.path.isfile(os.path.join(self._temporary_path, 'blimey.index'))
+
+        data_source = self._create_data_source(self._temporary_path, {'persistent_content_search': True})
+
+        with patch.object(data_source, '_decrypt_item', wraps=data_source._decrypt_item) as decrypt_item:
+            results = data_source.search_contents('someuser')
+
+        assert sorted(result['title'] for result in results) == ['Some FTP Account', 'Some Website']
+        assert decrypt_item.call_count == 0
+
+    def it_reindexes_items_changed_while_locked(self):
+        self._copy_fixture()
+
+        data_source = self._create_data_source(self._temporary_path, {'persistent_content_search': True})
+        data_source.search_contents('secrets')
+        data_source.deauthenticate()
+
+        other_data_source = self._create_data_source(self._temporary_path)
+        item = other_data_source.get_item_by_id('B851D6E3232842B0858BC10968632A9C')
+        item['encrypted']['notesPlain'] = 'Nothing to see'
+        item['updatedAt'] += 1
+        other_data_source.save_item(item)
+
+        data_source.authenticate(self._password)
+
+        with patch.object(data_source, '_decrypt_item', wraps=data_source._decrypt_item) as decrypt_item:
+            assert data_source.search_contents('secrets') == []
+            assert [result['uuid'] for result in data_source.search_contents('nothing to')] == [item['uuid']]
+
+        assert decrypt_item.call_count == 1
+
+    def it_saves_changes_to_the_index_when_locking(self):
+        self._copy_fixture()
+
+        data_source = self._create_data_source(self._temporary_path, {'persistent_content_search': True})
+        data_source.search_contents('secrets')
+
+        item = data_source.get_item_by_id('B851D6E3232842B0858BC10968632A9C')
+        item['encrypted']['notesPlain'] = 'Nothing to see'
+        data_source.save_item(item)
+        data_source.deauthenticate()
+
+        data_source = self._create_data_source(self._temporary_path, {'persistent_content_search': True})
+
+        with patch.object(data_source, '_decrypt_item', wraps=data_source._decrypt_item) as decrypt_item:
+            assert [result['uuid'] for result in data_source.search_contents('nothing to')] == [item['uuid']]
+
+        assert decrypt_item.call_count == 0
+
+    def it_rebuilds_an_index_it_can_not_decrypt(self):
+        self._copy_fixture()
+
+        with open(os.path.join(self._temporary_path, 'blimey.index'), 'wb') as file:
+            file.write(os.urandom(256))
+
+        data_source = self._create_data_source(self._temporary_path, {'persistent_content_search': True})
+        results = data_source.search_contents('someuser')
+
+        assert sorted(result['title'] for result in results) == ['Some FTP Account', 'Some Website']
+
+    def _create_data_source(self, path, config=None):
+        data_source = DataSource(path, config if config is not None else {'content_search': True})
+        data_source.authenticate(self._password)
+
+        return data_source
+
+    def _copy_fixture(self):
+        shutil.copytree(self._fixture_path, self._temporary_path)
+        self.teardown = self._path_clean
+
+    def _path_clean(self):
+        shutil.rmtree(self._temporary_path)
@@ -0,0 +1,44 @@
+import os
+
+from blimey.agile_keychain._decryption_pool import DecryptionPool
+from blimey.agile_keychain._manager._item_manager import ItemManager
+from blimey.agile_keychain._manager._key_manager import KeyManager
+from blimey.agile_keychain._crypto import decrypt_key, decrypt_item
+from blimey.agile_keychain.data_source import DataSource
+
+
+class DecryptionPoolTest:
+    _fixture_path = os.path.join('tests', 'fixtures', 'test.agilekeychain')
+    _password = 'masterpassword123'
+
+    def it_decrypts_items_identically_to_the_serial_path(self):
+        items = ItemManager(self._fixture_path).get_all_items()
+        keys = self._get_keys_by_level()
+        item_keys = [keys[self._get_security_level(item)] for item in items]
+
+        pool = DecryptionPool(2, chunk_size=3)
+        decrypted_items = pool.decrypt_items(items, item_keys)
+
+        assert decrypted_items == [dict(decrypt_item(item, key)) for item, key in zip(items, item_keys)]
+
+    def it_decrypts_nothing_without_items(self):
+        assert DecryptionPool(2).decrypt_items([], []) == []
+
+    def it_is_used_by_the_data_source_when_decryption_workers_are_configured(self):
+        serial_data_source = DataSource(self._fixture_path)
+        serial_data_source.authenticate(self._password)
+
+        parallel_data_source = DataSource(self._fixture_path, {'decryption_workers': 2, 'decryption_chunk_size': 4})
+        parallel_data_source.authenticate(self._password)
+
+        assert parallel_data_source.get_all_items() == serial_data_source.get_all_items()
+
+    def _get_keys_by_level(self):
+        keys = [decrypt_key(key, self._password) for key in KeyManager(self._fixture_path).get_keys()]
+        return {key.level: key for key in keys}
+
+    def _get_security_level(self, item):
+        try:
+            return item['openContents']['securityLevel']
+        except (KeyError, TypeError):
+            return 'SL5'
@@ -0,0 +1,113 @@
+import os
+import shutil
+from unittest.mock import patch, Mock
+from nose.tools import raises
+
+from blimey.agile_keychain._manager._file_writer import FileWriter
+from blimey.exceptions import UnknownDurabilityException
+
+
+class FileWriterTest:
+    _temporary_path = os.path.join('tests', 'fixtures', 'temp.writer')
+
+    def setup(self):
+        os.makedirs(self._temporary_path)
+
+    def teardown(self):
+        shutil.rmtree(self._temporary_path)
+
+    def it_replaces_the_contents_of_a_file(self):
+        path = self._write_original_file()
+
+        FileWriter().write(path, 'replaced')
+
+        assert self._read(path) == 'replaced'
+        assert os.listdir(self._temporary_path) == ['file.js']
+
+    def it_leaves_the_original_file_intact_when_writing_fails(self):
+        path = self._write_original_file()
+
+        with patch('blimey.agile_keychain._manager._file_writer.os.replace', side_effect=OSError):
+            try:
+                FileWriter().write(path, 'replaced')
+            except OSError:
+                pass
+
+        assert self._read(path) == 'original'
+        assert os.listdir(self._temporary_path) == ['file.js']
+
+    def it_keeps_the_permissions_of_the_replaced_file(self):
+        path = self._write_original_file()
+        os.chmod(path, 0o600)
+
+        FileWriter().write(path, 'replaced')
+
+        assert os.stat(path).st_mode & 0o777 == 0o600
+
+    def it_syncs_every_write_with_fsync_durability(self):
+        with patch('blimey.agile_keychain._manager._file_writer.os.fsync', wraps=os.fsync) as fsync:
+            FileWriter('fsync').write(os.path.join(self._temporary_path, 'file.js'), 'written')
+
+        # The file, then the directory holding it
+        assert fsync.call_count == 2
+
+    def it_does_not_sync_without_durability(self):
+        with patch('blimey.agile_keychain._manager._file_writer.os.fsync', wraps=os.fsync) as fsync:
+            FileWriter('none').write(os.path.join(self._temporary_path, 'file.js'), 'written')
+
+        assert fsync.call_count == 0
+
+    def it_syncs_the_directory_once_for_a_group_of_writes(self):
+        writer = FileWriter('group', group_commit_window=60)
+
+        with patch('blimey.agile_keychain._manager._file_writer.os.fsync', wraps=os.fsync) as fsync:
+            for name in ['first.js', 'second.js', 'third.js']:
+                writer.write(os.path.join(self._temporary_path, name), 'written')
+
+            # One call per file as it is written
+            assert fsync.call_count == 3
+
+            writer.flush()
+
+        # And a single one for the directory
+        assert fsync.call_count == 4
+
+    def it_syncs_the_data_before_the_rename_with_group_durability(self):
+        writer = FileWriter('group', group_commit_window=60)
+        calls = Mock()
+        calls.fsync.side_effect = os.fsync
+        calls.replace.side_effect = os.replace
+
+        with patch('blimey.agile_keychain._manager._file_writer.os.fsync', calls.fsync), \
+                patch('blimey.agile_keychain._manager._file_writer.os.replace', calls.replace):
+            writer.write(os.path.join(self._temporary_path, 'file.js'), 'written')
+            writer.flush()
+
+        # The data, the rename, then the directory holding it
+        assert [call[0] for call in calls.mock_calls] == ['fsync', 'replace', 'fsync']
+
+    def it_commits_a_group_of_writes_when_its_window_ends(self):
+        writer = FileWriter('group', group_commit_window=0.05)
+
+        with patch.object(writer, 'flush', wraps=writer.flush) as flush:
+            writer.write(os.path.join(self._temporary_path, 'file.js'), 'written')
+            timer = writer._timer
+            timer.join()
+
+        assert flush.call_count == 1
+
+    @raises(UnknownDurabilityException)
+    def it_throws_on_unknown_durability_levels(self):
+        FileWriter('sometimes')
+
+    def _write_original_file(self):
+        path = os.path.join(self._temporary_path, 'file.js')
+
+        with open(path, 'w') as file:
+            file.write('original')
+
+        return path
+
+    def _read(self, path):
+        with open(path, 'r') as file:
+            return file.read()
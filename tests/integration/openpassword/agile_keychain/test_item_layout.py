@@ -0,0 +1,153 @@
+import os
+import shutil
+from unittest.mock import patch
+from nose.tools import raises
+
+from blimey.agile_keychain import migrate_to_sharded_layout, migrate_to_flat_layout, export_to_flat_layout
+from blimey.agile_keychain._manager._item_manager import ItemManager
+from blimey.agile_keychain._manager._item_layout import FlatLayout, ShardedLayout
+from blimey.agile_keychain.data_source import DataSource
+from blimey.exceptions import UnknownLayoutException, MismatchedLayoutException
+
+
+class ItemLayoutTest:
+    _fixture_path = os.path.join('tests', 'fixtures', 'test.agilekeychain')
+    _temporary_path = os.path.join('tests', 'fixtures', 'temp.agilekeychain')
+    _export_path = os.path.join('tests', 'fixtures', 'temp.export.agilekeychain')
+    _password = 'masterpassword123'
+
+    def setup(self):
+        shutil.copytree(self._fixture_path, self._temporary_path)
+
+    def teardown(self):
+        shutil.rmtree(self._temporary_path)
+
+        if os.path.exists(self._export_path):
+            shutil.rmtree(self._export_path)
+
+    def it_moves_item_files_into_shards(self):
+        item_ids = self._get_item_ids(self._fixture_path)
+
+        migrate_to_sharded_layout(self._temporary_path)
+
+        assert FlatLayout(self._temporary_path).get_item_ids() == []
+        assert os.path.isfile(self._get_path('data', 'default', '5F', '5F7210FD2F3F460692B7083C60854A02.1password'))
+        assert ItemManager(self._temporary_path, {'layout': 'sharded'})._get_item_ids() == item_ids
+
+    def it_reads_and_writes_items_in_the_sharded_layout(self):
+        migrate_to_sharded_layout(self._temporary_path)
+        item_manager = ItemManager(self._temporary_path, {'layout': 'sharded'})
+
+        item = item_manager.get_by_id('5F7210FD2F3F460692B7083C60854A02')
+        item['uuid'] = '00000000000000000000000000000000'
+        item_manager.save_item(item)
+
+        assert os.path.isfile(self._get_path('data', 'default', '00', '00000000000000000000000000000000.1password'))
+        assert len(item_manager.get_all_items()) == len(ItemManager(self._fixture_path).get_all_items()) + 1
+
+    def it_moves_item_files_back_out_of_shards(self):
+        migrate_to_sharded_layout(self._temporary_path)
+        migrate_to_flat_layout(self._temporary_path)
+
+        assert sorted(os.listdir(self._get_path('data', 'default'))) == \
+            sorted(os.listdir(os.path.join(self._fixture_path, 'data', 'default')))
+
+    def it_finishes_an_interrupted_migration(self):
+        item_ids = self._get_item_ids(self._fixture_path)
+        flat_layout = FlatLayout(self._temporary_path)
+        sharded_layout = ShardedLayout(self._temporary_path)
+
+        # As if the migration stopped half way through
+        for item_id in item_ids[:3]:
+            os.rename(flat_layout.get_item_file_path(item_id), sharded_layout.get_item_file_path_for_writing(item_id))
+
+        migrate_to_sharded_layout(self._temporary_path)
+
+        assert ItemManager(self._temporary_path, {'layout': 'sharded'})._get_item_ids() == item_ids
+
+    def it_opens_keychains_in_the_layout_they_were_migrated_to(self):
+        item_ids = self._get_item_ids(self._fixture_path)
+
+        migrate_to_sharded_layout(self._temporary_path)
+
+        assert ItemManager(self._temporary_path)._get_item_ids() == item_ids
+
+        migrate_to_flat_layout(self._temporary_path)
+
+        assert ItemManager(self._temporary_path)._get_item_ids() == item_ids
+
+    def it_opens_sharded_keychains_never_migrated_in_the_sharded_layout(self):
+        item_ids = self._get_item_ids(self._fixture_path)
+        flat_layout = FlatLayout(self._temporary_path)
+        sharded_layout = ShardedLayout(self._temporary_path)
+
+        for item_id in item_ids:
+            os.rename(flat_layout.get_item_file_path(item_id), sharded_layout.get_item_file_path_for_writing(item_id))
+
+        assert ItemManager(self._temporary_path)._get_item_ids() == item_ids
+
+    @raises(MismatchedLayoutException)
+    def it_refuses_a_layout_a_migrated_keychain_is_not_in(self):
+        migrate_to_sharded_layout(self._temporary_path)
+
+        ItemManager(self._temporary_path, {'layout': 'flat'})
+
+    @raises(MismatchedLayoutException)
+    def it_refuses_the_sharded_layout_for_keychains_that_were_not_migrated(self):
+        DataSource(self._temporary_path, {'layout': 'sharded'})
+
+    def it_accepts_either_layout_for_keychains_without_items(self):
+        for name in os.listdir(self._get_path('data', 'default')):
+            if name.endswith('.1password'):
+                os.remove(self._get_path('data', 'default', name))
+
+        ItemManager(self._temporary_path, {'layout': 'sharded'})
+        ItemManager(self._temporary_path, {'layout': 'flat'})
+
+    def it_exports_to_the_flat_layout(self):
+        migrate_to_sharded_layout(self._temporary_path)
+        data_source = DataSource(self._temporary_path, {'layout': 'sharded', 'persistent_content_search': True})
+        data_source.authenticate(self._password)
+        data_source.search_contents('someuser')
+
+        export_to_flat_layout(self._temporary_path, self._export_path)
+
+        assert not os.path.exists(os.path.join(self._export_path, 'blimey.index'))
+        assert not os.path.exists(os.path.join(self._export_path, 'blimey.layout'))
+        assert sorted(os.listdir(os.path.join(self._export_path, 'data', 'default'))) == \
+            sorted(os.listdir(os.path.join(self._fixture_path, 'data', 'default')))
+
+    def it_leaves_temporary_and_vacuumed_files_out_of_exports(self):
+        for name in ['5F7210FD2F3F460692B7083C60854A02.1password.1234.tmp',
+                     '320BE3D1B490458F82314E1A2B99552A.1password.1234.vacuum']:
+            with open(self._get_path('data', 'default', name), 'w') as file:
+                file.write('{}')
+
+        export_to_flat_layout(self._temporary_path, self._export_path)
+
+        assert sorted(os.listdir(os.path.join(self._export_path, 'data', 'default'))) == \
+            sorted(os.listdir(os.path.join(self._fixture_path, 'data', 'default')))
+
+    def it_keeps_the_persisted_content_index_across_migrations(self):
+        data_source = DataSource(self._temporary_path, {'persistent_content_search': True})
+        data_source.authenticate(self._password)
+        data_source.search_contents('someuser')
+
+        migrate_to_sharded_layout(self._temporary_path)
+        data_source = DataSource(self._temporary_path, {'layout': 'sharded', 'persistent_content_search': True})
+        data_source.authenticate(self._password)
+
+        with patch.object(data_source, '_decrypt_item', wraps=data_source._decrypt_item) as decrypt_item:
+            assert len(data_source.search_contents('someuser')) == 2
+
+        assert decrypt_item.call_count == 0
+
+    @raises(UnknownLayoutException)
+    def it_throws_on_unknown_layouts(self):
+        ItemManager(self._temporary_path, {'layout': 'nested'})
+
+    def _get_item_ids(self, path):
+        return ItemManager(path)._get_item_ids()
+
+    def _get_path(self, *names):
+        return os.path.join(self._temporary_path, *names)
@@ -0,0 +1,97 @@
+import os
+import shutil
+from unittest.mock import patch
+
+from blimey.agile_keychain.data_source import DataSource
+from blimey.agile_keychain._manager._item_manager import ItemManager
+
+
+class ItemListingTest:
+    _fixture_path = os.path.join('tests', 'fixtures', 'test.agilekeychain')
+    _temporary_path = os.path.join('tests', 'fixtures', 'temp.agilekeychain')
+    _password = 'masterpassword123'
+
+    def it_lists_pages_of_items(self):
+        data_source = self._create_data_source(self._fixture_path)
+        items = sorted(data_source.get_all_items(), key=lambda item: (item['updatedAt'], item['uuid']))
+
+        first_page = data_source.list_items('updatedAt', 0, 3)
+        second_page = data_source.list_items('updatedAt', 3, 3)
+
+        assert [item['uuid'] for item in first_page + second_page] == [item['uuid'] for item in items[:6]]
+        assert first_page[0]['encrypted'] == items[0]['encrypted']
+
+    def it_only_decrypts_the_items_on_the_page(self):
+        data_source = self._create_data_source(self._fixture_path)
+
+        with patch.object(data_source, '_decrypt_item', wraps=data_source._decrypt_item) as decrypt_item:
+            data_source.list_items('title', 0, 2)
+
+        assert decrypt_item.call_count == 2
+
+    def it_lists_items_changed_by_others(self):
+        shutil.copytree(self._fixture_path, self._temporary_path)
+        self.teardown = self._path_clean
+
+        data_source = self._create_data_source(self._temporary_path)
+        data_source.list_items('updatedAt')
+
+        other_data_source = self._create_data_source(self._temporary_path)
+        item = other_data_source.get_item_by_id('B851D6E3232842B0858BC10968632A9C')
+        other_data_source.save_item(item)
+
+        assert data_source.list_items('updatedAt', reverse=True, limit=1)[0]['uuid'] == item['uuid']
+
+    def it_lists_items_it_saved_itself(self):
+        shutil.copytree(self._fixture_path, self._temporary_path)
+        self.teardown = self._path_clean
+
+        data_source = self._create_data_source(self._temporary_path)
+        data_source.list_items('title')
+
+        item = data_source.create_item({'title': 'AAA first of all', 'typeName': 'webforms.WebForm'})
+        data_source.save_item(item)
+
+        assert data_source.list_items('title', limit=1)[0]['uuid'] == item['uuid']
+
+    def it_lists_items_from_the_contents_file_without_opening_item_files(self):
+        self._copy_fixture()
+        os.utime(self._get_contents_path())
+        item_manager = ItemManager(self._temporary_path)
+        item_ids = ItemManager(self._fixture_path).list_item_ids('updatedAt')
+
+        with patch.object(item_manager, 'get_by_id', wraps=item_manager.get_by_id) as read:
+            assert item_manager.list_item_ids('updatedAt') == item_ids
+
+            # Only the deleted items, which have no row
+            assert sorted(call[0][0] for call in read.call_args_list) == \
+                ['320BE3D1B490458F82314E1A2B99552A', 'CAF7A781A71E44CFBB63F9356B46A0C9']
+
+            assert item_manager.list_item_ids('createdAt') == ItemManager(self._fixture_path).list_item_ids('createdAt')
+            assert read.call_count == len(item_manager.get_item_file_stamps())
+
+    def it_reads_item_files_written_after_the_contents_file(self):
+        self._copy_fixture()
+        os.utime(self._get_contents_path(), (0, 0))
+        item_manager = ItemManager(self._temporary_path)
+
+        with patch.object(item_manager, 'get_by_id', wraps=item_manager.get_by_id) as read:
+            item_manager.list_item_ids('updatedAt')
+
+        assert read.call_count == len(item_manager.get_item_file_stamps())
+
+    def _copy_fixture(self):
+        shutil.copytree(self._fixture_path, self._temporary_path)
+        self.teardown = self._path_clean
+
+    def _get_contents_path(self):
+        return os.path.join(self._temporary_path, 'data', 'default', 'contents.js')
+
+    def _create_data_source(self, path):
+        data_source = DataSource(path)
+        data_source.authenticate(self._password)
+
+        return data_source
+
+    def _path_clean(self):
+        shutil.rmtree(self._temporary_path)
@@ -2,6 +2,7 @@ import os
 import shutil
 import time
 import json
+from unittest.mock import patch
 from nose.tools import raises
 
 from blimey.agile_keychain._manager._item_manager import ItemManager
@@ -62,6 +63,19 @@ class ItemManagerTest:
         for item in items:
             assert item['uuid'] in expected_item_uuids
 
+    def it_reads_ahead_items_in_the_same_order_as_serial_reads(self):
+        serial_items = ItemManager(self._fixture_path).get_all_items()
+        read_ahead_items = ItemManager(self._fixture_path, {'read_ahead_workers': 2}).get_all_items()
+
+        assert [item['uuid'] for item in read_ahead_items] == [item['uuid'] for item in serial_items]
+        assert read_ahead_items == serial_items
+
+    def it_streams_items(self):
+        items = ItemManager(self._fixture_path).iter_items()
+
+        assert next(items)['uuid'] == '2E21D652E0754BD59F6B94B0323D0142'
+        assert len(list(items)) == 9
+
     def it_saves_items(self):
         self._init_default_data_dir()
         item_manager = ItemManager(self._temporary_path)
@@ -104,6 +118,241 @@ class ItemManagerTest:
         assert contents[0][5] == 0  # No idea what this value is
         assert contents[0][6] == 'Y'  # Corresponds to 'trashed'
 
+    def it_patches_only_the_saved_item_row_in_the_contents_file(self):
+        self._init_default_data_dir()
+        self._write_contents([['fedcba', 'typename', 'Unrelated', '', 'undefined', 0, 'N']])
+
+        item_manager = ItemManager(self._temporary_path)
+
+        item = self._get_item()
+        item_manager.save_item(item)
+        item['title'] = 'New Title'
+        item_manager.save_item(item)
+
+        contents = self._read_contents()
+
+        assert len(contents) == 2
+        assert contents[0][0] == 'fedcba'
+        assert contents[1][0] == item['uuid']
+        assert contents[1][2] == 'New Title'
+
+    def it_leaves_the_contents_file_alone_when_the_item_row_did_not_change(self):
+        self._init_default_data_dir()
+
+        item_manager = ItemManager(self._temporary_path)
+        item = self._get_item()
+        item_manager.save_item(item)
+        os.utime(self._get_contents_path(), ns=(0, 0))
+
+        item_manager.save_item(item)
+
+        assert os.stat(self._get_contents_path()).st_mtime_ns == 0
+
+    def it_picks_up_external_changes_to_the_contents_file(self):
+        self._init_default_data_dir()
+
+        item_manager = ItemManager(self._temporary_path)
+        item_manager.save_item(self._get_item())
+
+        self._write_contents([['fedcba', 'typename', 'Added elsewhere', '', 'undefined', 0, 'N', 'extra column']])
+        item_manager.save_item(self._get_item())
+
+        assert [row[0] for row in self._read_contents()] == ['fedcba', 'abcdef']
+
+    def it_rebuilds_the_contents_file_from_the_item_files(self):
+        self._init_default_data_dir()
+        self._write_contents([['fedcba', 'typename', 'Stale', '', 'undefined', 0, 'N']])
+
+        item_manager = ItemManager(self._temporary_path)
+        item_manager.save_item(self._get_item())
+        item_manager.rebuild_contents_file()
+
+        assert [row[0] for row in self._read_contents()] == ['abcdef']
+
+    def it_saves_several_items_with_a_single_contents_file_update(self):
+        self._init_default_data_dir()
+
+        first_item = self._get_item()
+        second_item = self._get_item()
+        second_item['uuid'] = 'fedcba'
+
+        item_manager = ItemManager(self._temporary_path)
+
+        with patch.object(item_manager, '_write_contents_file', wraps=item_manager._write_contents_file) as write:
+            item_manager.save_items([first_item, second_item])
+
+        assert write.call_count == 1
+        assert [row[0] for row in self._read_contents()] == ['abcdef', 'fedcba']
+        assert item_manager.get_by_id('fedcba')['uuid'] == 'fedcba'
+
+    def it_drops_tombstones_from_the_contents_file(self):
+        self._init_default_data_dir()
+
+        item = self._get_item()
+        item_manager = ItemManager(self._temporary_path)
+        item_manager.save_item(item)
+
+        item['typeName'] = 'system.Tombstone'
+        item_manager.save_items([item])
+
+        assert self._read_contents() == []
+
+    def it_lists_summaries_of_the_same_items_it_iterates(self):
+        item_manager = ItemManager(self._fixture_path)
+
+        summaries = item_manager.get_summaries()
+        items = item_manager.get_all_items()
+
+        assert sorted(summary['uuid'] for summary in summaries) == sorted(item['uuid'] for item in items)
+
+    def it_lists_summaries_from_the_contents_file_alone(self):
+        item_manager = ItemManager(self._fixture_path)
+
+        # The only item file missing from contents.js is a tombstone, which is remembered once it was read
+        item_manager.get_summaries()
+
+        with patch.object(item_manager, 'get_by_id') as get_by_id:
+            summaries = item_manager.get_summaries()
+
+        assert get_by_id.call_count == 0
+        assert summaries[0] == {
+            'uuid': 'ECE79F0A4BDF44CE8E7986897D84D1EC',
+            'typeName': 'securenotes.SecureNote',
+            'title': 'Trashed Note',
+            'locationKey': '',
+            'folderUuid': '',
+            'trashed': True
+        }
+
+    def it_lists_summaries_of_items_missing_from_a_stale_contents_file(self):
+        self._init_default_data_dir()
+
+        item_manager = ItemManager(self._temporary_path)
+        item_manager.save_item(self._get_item())
+        self._write_contents([['fedcba', 'typename', 'Removed elsewhere', '', 'undefined', 0, 'N']])
+
+        summaries = item_manager.get_summaries()
+
+        assert [summary['uuid'] for summary in summaries] == ['abcdef']
+        assert summaries[0]['title'] == 'Title'
+
+    def it_serves_repeated_reads_from_the_item_cache(self):
+        item_manager = ItemManager(self._fixture_path, {'item_cache_entries': 10})
+
+        first_item = item_manager.get_by_id('5F7210FD2F3F460692B7083C60854A02')
+        second_item = item_manager.get_by_id('5F7210FD2F3F460692B7083C60854A02')
+
+        assert first_item == second_item
+        assert item_manager.get_cache_statistics()['hits'] == 1
+        assert item_manager.get_cache_statistics()['misses'] == 1
+
+    def it_sees_changes_made_outside_the_process_through_the_item_cache(self):
+        self._init_default_data_dir()
+
+        item_manager = ItemManager(self._temporary_path, {'item_cache_entries': 10})
+        item_manager.save_item(self._get_item())
+        item_manager.get_by_id('abcdef')
+
+        item_path = os.path.join(self._temporary_path, 'data', 'default', 'abcdef.1password')
+
+        with open(item_path, 'r') as file:
+            item = json.load(file)
+
+        item['title'] = 'Changed elsewhere'
+
+        with open(item_path, 'w') as file:
+            json.dump(item, file)
+
+        os.utime(item_path, ns=(0, 0))
+
+        assert item_manager.get_by_id('abcdef')['title'] == 'Changed elsewhere'
+
+    def it_does_not_cache_items_unless_configured(self):
+        assert ItemManager(self._fixture_path).get_cache_statistics() is None
+
+    def it_does_not_reserve_ids_of_existing_items_or_tombstones(self):
+        item_manager = ItemManager(self._fixture_path)
+
+        assert item_manager.reserve_item_id('5F7210FD2F3F460692B7083C60854A02') is False
+        assert item_manager.reserve_item_id('320BE3D1B490458F82314E1A2B99552A') is False
+        assert item_manager.reserve_item_id('ABCDEF') is True
+        assert item_manager.reserve_item_id('ABCDEF') is False
+
+    def it_does_not_reserve_ids_of_items_it_saved(self):
+        self._init_default_data_dir()
+
+        item_manager = ItemManager(self._temporary_path)
+        item_manager.reserve_item_id('ABCDEF')
+        item_manager.save_item(self._get_item())
+
+        assert item_manager.reserve_item_id('abcdef') is False
+
+    def it_searches_the_unencrypted_fields_of_items(self):
+        item_manager = ItemManager(self._fixture_path)
+
+        results = item_manager.search('website', fields=['title'])
+
+        assert [result['title'] for result in results] == ['Some Other Website', 'Some Website']
+
+    def it_updates_search_results_when_items_are_saved(self):
+        self._init_default_data_dir()
+
+        item_manager = ItemManager(self._temporary_path)
+        item = self._get_item()
+        item_manager.save_item(item)
+        item_manager.search('title')
+
+        item['title'] = 'Renamed'
+        item_manager.save_item(item)
+
+        assert item_manager.search('title') == []
+        assert [result['uuid'] for result in item_manager.search('renamed')] == ['abcdef']
+
+    def it_updates_search_results_when_the_contents_file_changes_elsewhere(self):
+        self._init_default_data_dir()
+
+        item_manager = ItemManager(self._temporary_path)
+        item_manager.save_item(self._get_item())
+        item_manager.search('title')
+
+        self._write_contents([['abcdef', 'typename', 'Renamed elsewhere', '', 'undefined', 0, 'N']])
+
+        assert [result['title'] for result in item_manager.search('elsewhere')] == ['Renamed elsewhere']
+
+    def it_updates_search_results_when_item_files_are_added_or_removed_elsewhere(self):
+        self._init_default_data_dir()
+
+        item_manager = ItemManager(self._temporary_path)
+        item_manager.save_item(self._get_item())
+        item_manager.search('title')
+
+        item = self._get_item()
+        item['uuid'] = 'fedcba'
+        item['title'] = 'Added elsewhere'
+
+        with open(os.path.join(self._temporary_path, 'data', 'default', 'fedcba.1password'), 'w') as file:
+            json.dump(item, file)
+
+        os.remove(os.path.join(self._temporary_path, 'data', 'default', 'abcdef.1password'))
+
+        assert [result['uuid'] for result in item_manager.search('elsewhere')] == ['fedcba']
+        assert item_manager.search('title') == []
+
+    def it_keeps_the_search_index_across_saves(self):
+        self._init_default_data_dir()
+
+        item_manager = ItemManager(self._temporary_path)
+        item = self._get_item()
+        item_manager.save_item(item)
+        item_manager.search('title')
+
+        item_manager.save_item(item)
+
+        with patch.object(item_manager, 'get_summaries', wraps=item_manager.get_summaries) as get_summaries:
+            assert [result['uuid'] for result in item_manager.search('title')] == ['abcdef']
+
+        assert get_summaries.call_count == 0
+
     def _get_item(self):
         return AgileKeychainItem({
             'uuid': 'abcdef',
@@ -114,6 +363,17 @@ class ItemManagerTest:
             'trashed': True
         })
 
+    def _write_contents(self, contents):
+        with open(self._get_contents_path(), 'w') as file:
+            json.dump(contents, file)
+
+    def _read_contents(self):
+        with open(self._get_contents_path()) as file:
+            return json.load(file)
+
+    def _get_contents_path(self):
+        return os.path.join(self._temporary_path, 'data', 'default', 'contents.js')
+
     def _init_default_data_dir(self):
         os.makedirs(os.path.join(self._temporary_path, 'data', 'default'))
         self.teardown = self._path_clean
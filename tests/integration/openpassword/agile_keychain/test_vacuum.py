@@ -0,0 +1,119 @@
+import os
+import json
+import time
+import shutil
+from unittest.mock import patch
+
+from blimey.agile_keychain._manager._item_manager import ItemManager
+from blimey.agile_keychain.data_source import DataSource
+
+
+class VacuumTest:
+    _fixture_path = os.path.join('tests', 'fixtures', 'test.agilekeychain')
+    _temporary_path = os.path.join('tests', 'fixtures', 'temp.agilekeychain')
+    _archive_path = os.path.join('tests', 'fixtures', 'temp.archive')
+    _password = 'masterpassword123'
+    _tombstone_id = '320BE3D1B490458F82314E1A2B99552A'
+    _emptied_item_id = 'CAF7A781A71E44CFBB63F9356B46A0C9'
+
+    def setup(self):
+        shutil.copytree(self._fixture_path, self._temporary_path)
+
+        # Emptied files are aged by their modification time, which the copy keeps from the checkout
+        os.utime(self._get_item_file_path(self._emptied_item_id))
+
+    def teardown(self):
+        shutil.rmtree(self._temporary_path)
+
+        if os.path.exists(self._archive_path):
+            shutil.rmtree(self._archive_path)
+
+    def it_removes_old_tombstones(self):
+        size = os.path.getsize(self._get_item_file_path(self._tombstone_id))
+
+        report = ItemManager(self._temporary_path).vacuum()
+
+        assert report == {'removed_item_ids': [self._tombstone_id], 'removed_temporary_files': 0,
+                          'reclaimed_bytes': size}
+        assert not os.path.exists(self._get_item_file_path(self._tombstone_id))
+
+    def it_keeps_recent_tombstones(self):
+        data_source = DataSource(self._temporary_path)
+        data_source.authenticate(self._password)
+        data_source.delete_items(['9E7673CCBB5B4AC9A7A8838835CB7E83'])
+
+        report = data_source.vacuum()
+
+        assert report['removed_item_ids'] == [self._tombstone_id]
+        assert os.path.exists(self._get_item_file_path('9E7673CCBB5B4AC9A7A8838835CB7E83'))
+
+    def it_removes_item_files_emptied_by_1password(self):
+        report = ItemManager(self._temporary_path).vacuum(retention=0)
+
+        assert report['removed_item_ids'] == [self._tombstone_id, self._emptied_item_id]
+
+    def it_keeps_items_that_are_not_deleted(self):
+        item_ids = ItemManager(self._fixture_path)._get_item_ids()
+
+        ItemManager(self._temporary_path).vacuum(retention=0)
+
+        assert ItemManager(self._temporary_path)._get_item_ids() == \
+            [item_id for item_id in item_ids if item_id not in [self._tombstone_id, self._emptied_item_id]]
+
+    def it_moves_tombstones_to_the_archive(self):
+        ItemManager(self._temporary_path).vacuum(archive_path=self._archive_path)
+
+        assert os.listdir(self._archive_path) == [self._tombstone_id + '.1password']
+
+    def it_drops_the_rows_of_vacuumed_items_from_contents(self):
+        with open(self._get_path('contents.js')) as file:
+            rows = json.load(file)
+
+        rows.append([self._tombstone_id, 'system.Tombstone', '', '', 0, 'Y'])
+
+        with open(self._get_path('contents.js'), 'w') as file:
+            json.dump(rows, file)
+
+        ItemManager(self._temporary_path).vacuum()
+
+        with open(self._get_path('contents.js')) as file:
+            assert self._tombstone_id not in [row[0] for row in json.load(file)]
+
+    def it_removes_old_temporary_files(self):
+        old_path = self._get_path('0000.1password.1234.tmp')
+        recent_path = self._get_path('0001.1password.1234.tmp')
+
+        for path in [old_path, recent_path]:
+            with open(path, 'w') as file:
+                file.write('{}')
+
+        os.utime(old_path, (time.time() - 2 * 60 * 60,) * 2)
+
+        report = ItemManager(self._temporary_path).vacuum()
+
+        assert report['removed_temporary_files'] == 1
+        assert not os.path.exists(old_path)
+        assert os.path.exists(recent_path)
+
+    def it_keeps_tombstones_written_again_while_vacuuming(self):
+        item_manager = ItemManager(self._temporary_path)
+        remove_file = item_manager._vacuum._remove_file
+
+        def rewrite_then_remove_file(path, stamp, archive_path):
+            with open(path, 'a') as file:
+                file.write('\n')
+
+            return remove_file(path, stamp, archive_path)
+
+        with patch.object(item_manager._vacuum, '_remove_file', side_effect=rewrite_then_remove_file):
+            report = item_manager.vacuum()
+
+        assert report['removed_item_ids'] == []
+        assert os.path.exists(self._get_item_file_path(self._tombstone_id))
+        assert [name for name in os.listdir(self._get_path()) if name.endswith('.vacuum')] == []
+
+    def _get_item_file_path(self, item_id):
+        return self._get_path(item_id + '.1password')
+
+    def _get_path(self, *names):
+        return os.path.join(self._temporary_path, 'data', 'default', *names)